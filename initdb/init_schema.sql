@@ -37,3 +37,128 @@ CREATE TRIGGER trg_update_timestamp_on_meta_change
 BEFORE UPDATE ON standup_raw.process_video
 FOR EACH ROW
 EXECUTE FUNCTION update_timestamp_on_meta_change();
+
+-- 4) Distributed work queue: one row per video x stage, leased by workers
+CREATE TABLE IF NOT EXISTS standup_raw.pipeline_task (
+    video_id TEXT NOT NULL REFERENCES standup_raw.process_video (video_id),
+    stage TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker_id TEXT,
+    attempts INT NOT NULL DEFAULT 0,
+    lease_expires_at TIMESTAMPTZ,
+    heartbeat_at TIMESTAMPTZ,
+    last_error TEXT,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    updated_at TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (video_id, stage)
+);
+
+CREATE INDEX IF NOT EXISTS pipeline_task_lease_idx
+    ON standup_raw.pipeline_task (stage, status, lease_expires_at);
+
+-- 5) Per-stage pipeline telemetry
+CREATE TABLE IF NOT EXISTS standup_raw.stage_runs (
+    stage_run_id BIGSERIAL PRIMARY KEY,
+    pipeline_run_id TEXT NOT NULL,
+    worker_id TEXT,
+    video_id TEXT,
+    stage TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started_at TIMESTAMPTZ NOT NULL,
+    wall_seconds DOUBLE PRECISION NOT NULL,
+    cpu_seconds DOUBLE PRECISION NOT NULL,
+    peak_rss_bytes BIGINT,
+    bytes_moved BIGINT,
+    audio_seconds DOUBLE PRECISION,
+    error TEXT
+);
+
+CREATE INDEX IF NOT EXISTS stage_runs_stage_started_idx
+    ON standup_raw.stage_runs (stage, started_at);
+
+-- 6) Transcript segments, one typed row per segment (COPY-loaded by the pipeline)
+CREATE TABLE IF NOT EXISTS standup_raw.transcript_segment (
+    video_id TEXT NOT NULL REFERENCES standup_raw.process_video (video_id) ON DELETE CASCADE,
+    idx INT NOT NULL,
+    start_s DOUBLE PRECISION NOT NULL,
+    end_s DOUBLE PRECISION NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (video_id, idx)
+);
+
+CREATE INDEX IF NOT EXISTS transcript_segment_video_start_idx
+    ON standup_raw.transcript_segment (video_id, start_s);
+
+-- 7) Chapter summaries, one typed row per LLM chapter
+CREATE TABLE IF NOT EXISTS standup_raw.chapter_summary (
+    video_id TEXT NOT NULL REFERENCES standup_raw.process_video (video_id) ON DELETE CASCADE,
+    start_idx INT NOT NULL,
+    end_idx INT,
+    theme TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    PRIMARY KEY (video_id, start_idx)
+);
+
+-- 8) Full-text search; generated columns keep the vectors current on every write.
+-- Transcripts are Russian, LLM themes and summaries are English (see src/search.py).
+ALTER TABLE standup_raw.transcript_segment
+    ADD COLUMN IF NOT EXISTS text_tsv TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('russian', text)) STORED;
+
+ALTER TABLE standup_raw.chapter_summary
+    ADD COLUMN IF NOT EXISTS search_tsv TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', theme), 'A')
+        || setweight(to_tsvector('english', summary), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS transcript_segment_text_tsv_idx
+    ON standup_raw.transcript_segment USING GIN (text_tsv);
+
+CREATE INDEX IF NOT EXISTS chapter_summary_search_tsv_idx
+    ON standup_raw.chapter_summary USING GIN (search_tsv);
+
+-- 9) Daily metric history, one row per video and day, partitioned by month
+CREATE TABLE IF NOT EXISTS standup_raw.video_metrics_daily (
+    video_id TEXT NOT NULL REFERENCES standup_raw.process_video (video_id) ON DELETE CASCADE,
+    snapshot_date DATE NOT NULL,
+    view_count BIGINT,
+    like_count BIGINT,
+    comment_count BIGINT,
+    -- Change since the video's previous snapshot; NULL for the first one
+    view_delta BIGINT,
+    like_delta BIGINT,
+    comment_delta BIGINT,
+    recorded_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (video_id, snapshot_date)
+) PARTITION BY RANGE (snapshot_date);
+
+CREATE OR REPLACE FUNCTION standup_raw.ensure_video_metrics_partition(day DATE)
+RETURNS VOID AS $$
+DECLARE
+    month_start DATE := date_trunc('month', day)::DATE;
+    partition_name TEXT := 'video_metrics_daily_' || to_char(day, 'YYYY_MM');
+BEGIN
+    IF to_regclass('standup_raw.' || partition_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS standup_raw.%I PARTITION OF standup_raw.video_metrics_daily
+         FOR VALUES FROM (%L) TO (%L)',
+        partition_name,
+        month_start,
+        (month_start + INTERVAL '1 month')::DATE
+    );
+EXCEPTION
+    -- Another worker created the partition first
+    WHEN duplicate_table OR unique_violation THEN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 10) Playlist listing state for incremental sync
+CREATE TABLE IF NOT EXISTS standup_raw.playlist_sync (
+    playlist_id TEXT PRIMARY KEY,
+    entry_count INT,
+    last_synced_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    last_full_sync_at TIMESTAMPTZ
+);
@@ -0,0 +1,21 @@
+{#
+    Boolean predicate restricting an incremental build to the videos passed in
+    the `changed_video_ids` var, e.g.
+        dbt run --vars '{"changed_video_ids": ["abc123"]}'
+    Evaluates to `true` on full refreshes or when the var is not set, so the
+    model falls back to scanning every finished video.
+#}
+{% macro changed_videos_filter(column) -%}
+    {%- set changed_video_ids = var('changed_video_ids', none) -%}
+    {%- if changed_video_ids is none or not is_incremental() -%}
+        true
+    {%- elif changed_video_ids | length == 0 -%}
+        false
+    {%- else -%}
+        {{ column }} in (
+            {%- for video_id in changed_video_ids -%}
+                '{{ video_id | replace("'", "''") }}'{{ ", " if not loop.last }}
+            {%- endfor -%}
+        )
+    {%- endif -%}
+{%- endmacro %}
@@ -9,7 +9,9 @@ with stg_classifications as (
         main_category,
         subcategory
     from {{ ref("stg_classifications") }}
-    where is_valid is TRUE
+    where
+        is_valid is TRUE
+        and {{ changed_videos_filter('video_id') }}
 )
 
 select
@@ -27,9 +29,11 @@ inner join {{ ref('core_subcategories') }} as sub
     on
         stg_cl.subcategory = sub.subcategory
 {% if is_incremental() %}
-    where not exists (
-        select 1
-        from {{ this }} as existing
-        where existing.video_id = stg_ch.video_id
-    )
+    where
+        {{ changed_videos_filter('stg_ch.video_id') }}
+        and not exists (
+            select 1
+            from {{ this }} as existing
+            where existing.video_id = stg_ch.video_id
+        )
 {% endif %}
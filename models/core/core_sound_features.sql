@@ -15,6 +15,7 @@ from {{ ref("stg_sound_features") }} as stg_sf
 where
     stg_sf.is_valid is TRUE
     {% if is_incremental() %}
+        and {{ changed_videos_filter('stg_sf.video_id') }}
         and not exists (
             select 1
             from {{ this }} as existing
@@ -1,5 +1,9 @@
 {{ config (
-    unique_key=['video_id', 'segment_id']
+    unique_key=['video_id', 'segment_id'],
+    post_hook=[
+        "create index if not exists core_transcript_segments_video_start_idx
+            on {{ this }} (video_id, start_s)"
+    ]
 ) }}
 
 select
@@ -12,6 +16,7 @@ from {{ ref("stg_transcripts") }} as stg_tr
 where
     stg_tr.is_valid is TRUE
     {% if is_incremental() %}
+        and {{ changed_videos_filter('stg_tr.video_id') }}
         and not exists (
             select 1
             from {{ this }} as existing
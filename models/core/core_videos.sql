@@ -14,6 +14,7 @@ from {{ ref("stg_videos_base") }} as stg_v
 where
     stg_v.is_valid is true
     {% if is_incremental() %}
+        and {{ changed_videos_filter('stg_v.video_id') }}
         and not exists (
             select 1
             from {{ this }} as existing
@@ -6,3 +6,4 @@ SELECT
     video_id,
     video_title
 FROM {{ ref('core_videos') }}
+WHERE {{ changed_videos_filter('video_id') }}
@@ -0,0 +1,38 @@
+{{ config(
+    unique_key=['video_id', 'start_segment_id']
+) }}
+
+with chapter_segments as (
+    select
+        sl.video_id,
+        sl.chapter_start_segment_id as start_segment_id,
+        min(sl.start_s) as start_s,
+        max(sl.end_s) as end_s,
+        sum(sl.laugh_count) as laugh_count,
+        sum(sl.laugh_seconds) as laugh_seconds
+    from {{ ref("fact_segment_laughter") }} as sl
+    where
+        sl.chapter_start_segment_id is not null
+        and {{ changed_videos_filter('sl.video_id') }}
+    group by sl.video_id, sl.chapter_start_segment_id
+)
+
+select
+    cs.video_id,
+    cs.start_segment_id,
+    ch.subcategory_id,
+    sub.category_id,
+    cs.start_s,
+    cs.end_s,
+    cs.laugh_count::int as laugh_count,
+    cs.laugh_seconds,
+    round(
+        (cs.laugh_count / nullif((cs.end_s - cs.start_s) / 60, 0))::numeric, 2
+    ) as laughs_per_minute
+from chapter_segments as cs
+inner join {{ ref("core_chapters") }} as ch
+    on
+        cs.video_id = ch.video_id
+        and cs.start_segment_id = ch.start_segment_id
+inner join {{ ref('core_subcategories') }} as sub
+    on ch.subcategory_id = sub.subcategory_id
@@ -0,0 +1,67 @@
+{{ config(
+    unique_key=['video_id', 'segment_id'],
+    indexes=[{'columns': ['video_id', 'chapter_start_segment_id']}]
+) }}
+
+-- Each laughter episode is attributed to the last segment that starts at or
+-- before it: the audience reacts to the line that was just delivered, often
+-- in the pause before the next segment. The lookup is a top-1 index scan on
+-- core_transcript_segments (video_id, start_s) per episode.
+with segments as (
+    select
+        tr.video_id,
+        tr.segment_id,
+        tr.start_s,
+        tr.end_s
+    from {{ ref("core_transcript_segments") }} as tr
+    where {{ changed_videos_filter('tr.video_id') }}
+),
+
+laugh_segments as (
+    select
+        sf.video_id,
+        seg.segment_id,
+        sf.duration_seconds,
+        sf.max_confidence
+    from {{ ref("core_sound_features") }} as sf
+    cross join lateral (
+        select tr.segment_id
+        from {{ ref("core_transcript_segments") }} as tr
+        where
+            tr.video_id = sf.video_id
+            and tr.start_s <= sf.start_seconds
+        order by tr.start_s desc
+        limit 1
+    ) as seg
+    where {{ changed_videos_filter('sf.video_id') }}
+),
+
+segment_laughs as (
+    select
+        video_id,
+        segment_id,
+        count(*) as laugh_count,
+        sum(duration_seconds) as laugh_seconds,
+        max(max_confidence) as max_confidence
+    from laugh_segments
+    group by video_id, segment_id
+)
+
+select
+    seg.video_id,
+    seg.segment_id,
+    ch.start_segment_id as chapter_start_segment_id,
+    seg.start_s,
+    seg.end_s,
+    coalesce(sl.laugh_count, 0)::int as laugh_count,
+    round(coalesce(sl.laugh_seconds, 0)::numeric, 2) as laugh_seconds,
+    sl.max_confidence
+from segments as seg
+left join segment_laughs as sl
+    on
+        seg.video_id = sl.video_id
+        and seg.segment_id = sl.segment_id
+left join {{ ref("core_chapters") }} as ch
+    on
+        seg.video_id = ch.video_id
+        and seg.segment_id between ch.start_segment_id and ch.end_segment_id
@@ -22,6 +22,7 @@ with chapters as (
         join {{ ref("core_transcript_segments") }} as tr2 on
         ch.video_id = tr2.video_id
         and ch.end_segment_id = tr2.segment_id
+    where {{ changed_videos_filter('ch.video_id') }}
 )
 
 select
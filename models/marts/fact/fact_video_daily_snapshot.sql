@@ -2,27 +2,34 @@
     unique_key=['video_id', 'date_id']
 ) }}
 
+-- Deltas are computed by the pipeline when it records each day's metrics,
+-- so incremental runs only read the newest snapshot dates.
 with videos_meta as (
     select
         vm.video_id,
         vm.snapshot_date,
-        (vm.view_count - lag(vm.view_count) over (
-            partition by vm.video_id
-            order by
-                vm.snapshot_date
-        )) as prev_day_view,
-        (vm.like_count - lag(vm.like_count) over (
-            partition by vm.video_id
-            order by
-                vm.snapshot_date
-        )) as prev_day_like,
-        (vm.comment_count - lag(vm.comment_count) over (
-            partition by vm.video_id
-            order by
-                vm.snapshot_date
-        )) as prev_day_comment
+        vm.view_delta as prev_day_view,
+        vm.like_delta as prev_day_like,
+        vm.comment_delta as prev_day_comment
     from
-        {{ ref("core_videos_meta") }} as vm
+        {{ ref("stg_video_metrics_daily") }} as vm
+    where {{ changed_videos_filter('vm.video_id') }}
+    {% if is_incremental() %}
+        and (
+            vm.snapshot_date >= (
+                select coalesce(max(dd.date), '1900-01-01'::date)
+                from {{ this }} as existing
+                inner join {{ ref("dim_date") }} as dd
+                    on existing.date_id = dd.date_id
+            )
+            -- Videos that just finished bring their whole history
+            or not exists (
+                select 1
+                from {{ this }} as existing
+                where existing.video_id = vm.video_id
+            )
+        )
+    {% endif %}
 )
 
 select
@@ -30,17 +37,12 @@ select
     dd.date_id,
     v.channel_id,
     v.playlist_id,
-    sum(vm.prev_day_view) as prev_day_view,
-    sum(vm.prev_day_like) as prev_day_like,
-    sum(vm.prev_day_comment) as prev_day_comment
+    vm.prev_day_view,
+    vm.prev_day_like,
+    vm.prev_day_comment
 from
     videos_meta as vm
 inner join {{ ref("core_videos") }} as v
     on
         vm.video_id = v.video_id
 inner join {{ ref("dim_date") }} as dd on vm.snapshot_date = dd.date
-group by
-    dd.date_id,
-    vm.video_id,
-    v.channel_id,
-    v.playlist_id
@@ -10,6 +10,7 @@ with video_meta as (
         vm.comment_count,
         vm.snapshot_date
     from {{ ref("core_videos_meta") }} as vm
+    where {{ changed_videos_filter('vm.video_id') }}
     order by vm.video_id asc, vm.snapshot_date desc
 ),
 
@@ -20,7 +21,9 @@ laughter as (
             as laughter_percent
     from {{ ref("core_sound_features") }} as sf
     inner join {{ ref("core_videos") }} as cv on sf.video_id = cv.video_id
-    where sf.duration_seconds > 1
+    where
+        sf.duration_seconds > 1
+        and {{ changed_videos_filter('sf.video_id') }}
     group by sf.video_id, cv.duration
 )
 
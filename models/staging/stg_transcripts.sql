@@ -2,26 +2,22 @@
     materialized='view',
 ) }}
 
-WITH raw_transcripts AS (
-    SELECT
-        pr.video_id,
-        pr.transcribe_json
+WITH finished_videos AS (
+    SELECT pr.video_id
     FROM {{ source('standup_raw', 'process_video') }} AS pr
-    WHERE pr.process_status = 'finished' AND pr.transcribe_json IS NOT NULL
+    WHERE pr.process_status = 'finished'
 ),
 
 parsed_segments AS (
     SELECT
-        video_id::TEXT,
-
-        -- JSON extract with type
-        (segment.key)::INT AS segment_id,
-        (segment.value ->> 'text')::TEXT AS segment_text,
-        (segment.value ->> 'start')::FLOAT AS start_s,
-        (segment.value ->> 'end')::FLOAT AS end_s
+        ts.video_id,
+        ts.idx AS segment_id,
+        ts.text AS segment_text,
+        ts.start_s,
+        ts.end_s
 
-    FROM raw_transcripts
-    CROSS JOIN LATERAL jsonb_each(transcribe_json) AS segment
+    FROM {{ source('standup_raw', 'transcript_segment') }} AS ts
+    INNER JOIN finished_videos AS fv ON ts.video_id = fv.video_id
 )
 
 SELECT
@@ -0,0 +1,14 @@
+{{ config(
+    materialized='view',
+) }}
+
+SELECT
+    video_id::TEXT AS video_id,
+    snapshot_date,
+    view_count,
+    like_count,
+    comment_count,
+    view_delta,
+    like_delta,
+    comment_delta
+FROM {{ source('standup_raw', 'video_metrics_daily') }}
@@ -0,0 +1,25 @@
+{{ config(
+    schema='superset',
+    indexes=[
+        {'columns': ['video_id']},
+        {'columns': ['main_category', 'laughs_per_minute']},
+    ],
+) }}
+
+select
+    cl.video_id,
+    cat.main_category,
+    sub.subcategory,
+    v.video_title,
+    cl.start_s,
+    cl.end_s,
+    cl.laugh_count,
+    cl.laugh_seconds,
+    cl.laughs_per_minute
+from {{ ref("fact_chapter_laughter") }} as cl
+inner join {{ ref("dim_category") }} as cat on cl.category_id = cat.category_id
+inner join
+    {{ ref("dim_subcategory") }} as sub
+    on cl.subcategory_id = sub.subcategory_id
+inner join {{ ref("dim_videos") }} as v on cl.video_id = v.video_id
+where {{ changed_videos_filter('cl.video_id') }}
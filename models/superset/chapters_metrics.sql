@@ -1,9 +1,14 @@
 {{ config(
     schema='superset',
-    materialized='view',
+    indexes=[
+        {'columns': ['video_id']},
+        {'columns': ['date']},
+        {'columns': ['main_category', 'subcategory']},
+    ],
 ) }}
 
 select
+    ch.video_id,
     cat.main_category,
     sub.subcategory,
     v.video_title,
@@ -29,3 +34,4 @@ inner join {{ ref("dim_date") }} as d on ch.date_id = d.date_id
 inner join {{ ref("dim_videos") }} as v on ch.video_id = v.video_id
 inner join {{ ref("dim_channels") }} as chan on ch.channel_id = chan.channel_id
 inner join {{ ref("dim_playlists") }} as pl on ch.playlist_id = pl.playlist_id
+where {{ changed_videos_filter('ch.video_id') }}
@@ -1,6 +1,6 @@
 {{ config(
     schema='superset',
-    materialized='view',
+    materialized='table',
 ) }}
 
 select
@@ -1,9 +1,15 @@
 {{ config(
     schema='superset',
-    materialized='view',
+    unique_key=['video_id', 'date_id'],
+    indexes=[
+        {'columns': ['video_id', 'date_id'], 'unique': True},
+        {'columns': ['date']},
+        {'columns': ['channel_name']},
+    ],
 ) }}
 
 select
+    sn.video_id,
     dd.*,
     v.video_title,
     ch.channel_name,
@@ -16,3 +22,15 @@ inner join {{ ref("dim_date") }} as dd on sn.date_id = dd.date_id
 inner join {{ ref("dim_videos") }} as v on sn.video_id = v.video_id
 inner join {{ ref("dim_channels") }} as ch on sn.channel_id = ch.channel_id
 inner join {{ ref("dim_playlists") }} as pl on sn.playlist_id = pl.playlist_id
+where {{ changed_videos_filter('sn.video_id') }}
+{% if is_incremental() %}
+    -- History is append-only: only the newest days and newly finished videos
+    and (
+        sn.date_id >= (select coalesce(max(date_id), 0) from {{ this }})
+        or not exists (
+            select 1
+            from {{ this }} as existing
+            where existing.video_id = sn.video_id
+        )
+    )
+{% endif %}
@@ -1,9 +1,15 @@
 {{ config(
     schema='superset',
-    materialized='view',
+    indexes=[
+        {'columns': ['video_id']},
+        {'columns': ['date']},
+        {'columns': ['channel_name']},
+        {'columns': ['main_category', 'subcategory']},
+    ],
 ) }}
 
 select
+    vm.video_id,
     ch.channel_name,
     pl.playlist_title,
     v.video_title,
@@ -34,3 +40,4 @@ inner join
     {{ ref("dim_subcategory") }} as sub
     on chap.subcategory_id = sub.subcategory_id
 inner join {{ ref("dim_category") }} as cat on chap.category_id = cat.category_id
+where {{ changed_videos_filter('vm.video_id') }}
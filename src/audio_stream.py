@@ -0,0 +1,181 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, Mapping
+
+from minio import Minio
+from minio.error import S3Error
+
+CONTENT_RANGE_PATTERN = re.compile(r"bytes \d+-\d+/(\d+)")
+USER_METADATA_PREFIX = "x-amz-meta-"
+
+
+class ChecksumMismatchError(ValueError):
+    """Raised when a streamed object does not match its recorded sha256."""
+
+
+def extract_user_metadata(headers: Mapping[str, str]) -> dict[str, str]:
+    """Return S3 user metadata from response headers without the amz prefix."""
+    return {
+        key.lower().removeprefix(USER_METADATA_PREFIX): value
+        for key, value in headers.items()
+        if key.lower().startswith(USER_METADATA_PREFIX)
+    }
+
+
+@dataclass
+class AudioInput:
+    """Path handed to an audio engine, optionally backed by a live stream."""
+
+    path: Path
+    _pump: threading.Thread | None = field(default=None, repr=False)
+    _errors: list[BaseException] = field(default_factory=list, repr=False)
+
+    @property
+    def streamed(self) -> bool:
+        return self._pump is not None
+
+    def ensure_complete(self) -> None:
+        """Raise when the streamed bytes did not reach the decoder intact."""
+        if self._pump is not None:
+            self._pump.join()
+        if self._errors and isinstance(self._errors[0], ChecksumMismatchError):
+            raise self._errors[0]
+        if self._errors:
+            raise RuntimeError(
+                f"Audio stream for {self.path.name} was interrupted"
+            ) from self._errors[0]
+
+
+class ObjectRangeReader:
+    """Iterate over a MinIO object through sequential HTTP range requests."""
+
+    def __init__(
+        self,
+        storage_client: Minio,
+        bucket_name: str,
+        object_name: str,
+        *,
+        chunk_size: int,
+    ) -> None:
+        self._storage_client = storage_client
+        self._bucket_name = bucket_name
+        self._object_name = object_name
+        self._chunk_size = chunk_size
+        self._first_chunk: bytes | None = None
+        self.size: int | None = None
+        self.metadata: dict[str, str] = {}
+
+    def _read_range(self, offset: int) -> bytes:
+        response = self._storage_client.get_object(
+            self._bucket_name,
+            self._object_name,
+            offset=offset,
+            length=self._chunk_size,
+        )
+        try:
+            if self.size is None:
+                match = CONTENT_RANGE_PATTERN.match(
+                    response.headers.get("Content-Range", "")
+                )
+                if match:
+                    self.size = int(match.group(1))
+                self.metadata = extract_user_metadata(response.headers)
+            chunk = response.read()
+        finally:
+            response.close()
+            response.release_conn()
+        if self.size is None:
+            # Server ignored the range header and returned the whole object.
+            self.size = offset + len(chunk)
+        return chunk
+
+    def exists(self) -> bool:
+        """Fetch the first range, doubling as the existence check."""
+        try:
+            self._first_chunk = self._read_range(0)
+        except S3Error as error:
+            if error.code != "NoSuchKey":
+                raise
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[bytes]:
+        chunk = self._first_chunk
+        self._first_chunk = None
+        if chunk is None:
+            chunk = self._read_range(0)
+
+        digest = hashlib.sha256()
+        offset = 0
+        while chunk:
+            digest.update(chunk)
+            yield chunk
+            offset += len(chunk)
+            if self.size is not None and offset >= self.size:
+                break
+            chunk = self._read_range(offset)
+
+        expected = self.metadata.get("sha256")
+        if expected and digest.hexdigest() != expected:
+            raise ChecksumMismatchError(
+                f"Checksum mismatch for {self._object_name}: "
+                f"expected {expected}, got {digest.hexdigest()}"
+            )
+
+    def write_to(self, local_path: Path) -> Path:
+        """Persist the object to ``local_path`` atomically."""
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        partial_path = local_path.with_name(local_path.name + ".part")
+        try:
+            with partial_path.open("wb") as file:
+                for chunk in self:
+                    file.write(chunk)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+        partial_path.replace(local_path)
+        return local_path
+
+
+@contextmanager
+def stream_to_fifo(chunks: Iterable[bytes], fifo_path: Path) -> Iterator[AudioInput]:
+    """
+    Expose ``chunks`` to a path-based decoder through a named pipe.
+
+    A background thread writes the chunks into a FIFO so that tools which
+    only accept a file path (ffmpeg inside parakeet-mlx) can read the object
+    without it ever being written to disk. The FIFO is single-use.
+    """
+    fifo_path.parent.mkdir(parents=True, exist_ok=True)
+    fifo_path.unlink(missing_ok=True)
+    os.mkfifo(fifo_path)
+    errors: list[BaseException] = []
+
+    def _pump() -> None:
+        try:
+            with fifo_path.open("wb") as fifo:
+                for chunk in chunks:
+                    fifo.write(chunk)
+        except BrokenPipeError as exc:
+            errors.append(exc)
+        except Exception as exc:  # noqa: BLE001
+            logging.warning("Audio stream to %s failed: %s", fifo_path, exc)
+            errors.append(exc)
+
+    pump = threading.Thread(target=_pump, name="audio-stream", daemon=True)
+    pump.start()
+    try:
+        yield AudioInput(fifo_path, pump, errors)
+    finally:
+        # Unblock the writer if the reader never opened (or abandoned) the pipe.
+        while pump.is_alive():
+            descriptor = os.open(fifo_path, os.O_RDONLY | os.O_NONBLOCK)
+            os.close(descriptor)
+            pump.join(timeout=0.1)
+        fifo_path.unlink(missing_ok=True)
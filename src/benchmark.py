@@ -0,0 +1,1394 @@
+import argparse
+import json
+import logging
+import math
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from difflib import SequenceMatcher
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Iterator, Sequence
+
+import psycopg
+from minio.error import S3Error
+from psycopg.types.json import set_json_loads
+
+from config import Settings, get_settings
+from data_pipeliine import process_playlist
+from database import ProcessVideoRepository, get_db_connection
+from json_codec import EncodedJsonb
+from dbt_run import DbtRunScheduler
+from llm import SUMMARY_PROMPT_TEMPLATE, GeminiClient
+from models import ProcessVideo
+from sound_classifier import SoundClassifierClient
+from telemetry import get_telemetry
+from transcribe import ChunkPlan, ParakeetTranscriber
+from vad import VoiceActivity, decode_pcm, detect_voice_activity
+from youtube_downloader import (
+    AudioDownloadEngine,
+    AudioInventory,
+    DownloadedAudio,
+    YoutubeDownloader,
+)
+
+BENCHMARK_PLAYLIST_ID = "benchmark-playlist"
+BENCHMARK_PLAYLIST_URL = (
+    "https://www.youtube.com/playlist?list=" + BENCHMARK_PLAYLIST_ID
+)
+
+# Telemetry stages that run on the caller's thread. Downloads are excluded
+# because prefetching overlaps them with the previous video.
+SYNCHRONOUS_STAGES = (
+    "metadata",
+    "transcribe",
+    "sound_classify",
+    "laugh_events",
+    "llm_summary",
+    "llm_classify",
+)
+
+
+@dataclass
+class SimulatedLatency:
+    """Latencies the fake engines sleep for instead of doing real work."""
+
+    audio_seconds: float = 1200.0  # duration of every synthetic video
+    audio_bitrate: int = 64_000  # bits per second of the synthetic .opus files
+    playlist_seconds: float = 0.2  # yt-dlp playlist extraction
+    metadata_seconds: float = 0.05  # yt-dlp metadata request per video
+    download_seconds: float = 0.5  # yt-dlp audio download per video
+    storage_seconds: float = 0.005  # per MinIO request
+    transcribe_rtf: float = 0.002  # Parakeet seconds per second of audio
+    classify_rtf: float = 0.001  # Swift classifier seconds per second of audio
+    llm_seconds: float = 0.3  # Gemini CLI call
+
+
+class TimeLedger:
+    """Thread-safe totals of seconds and calls per named bucket."""
+
+    def __init__(self) -> None:
+        self._seconds: dict[str, float] = defaultdict(float)
+        self._calls: dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._seconds[name] += seconds
+            self._calls[name] += 1
+
+    def simulate(self, name: str, seconds: float) -> None:
+        time.sleep(seconds)
+        self.add(name, seconds)
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def wrap(self, name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        def _timed(*args: Any, **kwargs: Any) -> Any:
+            with self.measure(name):
+                return func(*args, **kwargs)
+
+        return _timed
+
+    def reset(self) -> None:
+        with self._lock:
+            self._seconds.clear()
+            self._calls.clear()
+
+    def seconds(self, name: str) -> float:
+        with self._lock:
+            return self._seconds.get(name, 0.0)
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {
+                name: {"seconds": round(seconds, 4), "calls": self._calls[name]}
+                for name, seconds in sorted(self._seconds.items())
+            }
+
+
+def synthetic_video_id(index: int) -> str:
+    return f"bench{index:06d}"
+
+
+class FakeYoutubeDL:
+    """Stand-in for ``yt_dlp.YoutubeDL`` serving a synthetic playlist."""
+
+    def __init__(
+        self,
+        options: dict,
+        *,
+        videos: int,
+        audio_bytes: bytes,
+        latency: SimulatedLatency,
+        engine_time: TimeLedger,
+    ) -> None:
+        self._options = options
+        self._videos = videos
+        self._audio_bytes = audio_bytes
+        self._latency = latency
+        self._engine_time = engine_time
+
+    def __enter__(self) -> "FakeYoutubeDL":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+    def extract_info(
+        self, url: str, download: bool = True, process: bool = True
+    ) -> dict[str, Any]:
+        if "list=" in url:
+            self._engine_time.simulate("playlist", self._latency.playlist_seconds)
+            return {
+                "id": BENCHMARK_PLAYLIST_ID,
+                "title": "Benchmark playlist",
+                "playlist_count": self._videos,
+                # A generator, like the lazily paged entries yt-dlp returns.
+                "entries": (
+                    {
+                        "id": synthetic_video_id(index),
+                        "title": f"Benchmark special #{index}",
+                        "url": "https://www.youtube.com/watch?v="
+                        + synthetic_video_id(index),
+                        "channel_id": "benchmark-channel",
+                        "channel": "Benchmark Channel",
+                    }
+                    for index in range(self._videos)
+                ),
+            }
+
+        if not download:
+            self._engine_time.simulate("metadata", self._latency.metadata_seconds)
+            return {
+                "duration": int(self._latency.audio_seconds),
+                "like_count": 1_000,
+                "view_count": 50_000,
+                "comment_count": 120,
+                "upload_date": "20250101",
+            }
+
+        self._engine_time.simulate("download", self._latency.download_seconds)
+        Path(self._options["outtmpl"] + ".opus").write_bytes(self._audio_bytes)
+        return {"duration": self._latency.audio_seconds}
+
+
+class _StoredObjectResponse:
+    def __init__(self, data: bytes, headers: dict[str, str]) -> None:
+        self._data = data
+        self.headers = headers
+
+    def read(self) -> bytes:
+        return self._data
+
+    def close(self) -> None:
+        return None
+
+    def release_conn(self) -> None:
+        return None
+
+
+class MemoryObjectStore:
+    """In-process MinIO stand-in implementing the calls the pipeline makes."""
+
+    def __init__(self, *, latency: SimulatedLatency, engine_time: TimeLedger) -> None:
+        self._latency = latency
+        self._engine_time = engine_time
+        self._objects: dict[str, tuple[bytes, dict[str, str]]] = {}
+        self._lock = threading.Lock()
+
+    def _request(self, count: int = 1) -> None:
+        self._engine_time.simulate("storage", self._latency.storage_seconds * count)
+
+    def _get(self, object_name: str) -> tuple[bytes, dict[str, str]]:
+        with self._lock:
+            stored = self._objects.get(object_name)
+        if stored is None:
+            raise S3Error(
+                None, "NoSuchKey", "Object does not exist", object_name, "", ""
+            )
+        return stored
+
+    def stat_object(self, bucket_name: str, object_name: str) -> SimpleNamespace:
+        self._request()
+        data, metadata = self._get(object_name)
+        return SimpleNamespace(
+            object_name=object_name, size=len(data), metadata=dict(metadata)
+        )
+
+    def get_object(
+        self,
+        bucket_name: str,
+        object_name: str,
+        offset: int = 0,
+        length: int = 0,
+    ) -> _StoredObjectResponse:
+        self._request()
+        data, metadata = self._get(object_name)
+        end = offset + length if length else len(data)
+        chunk = data[offset:end]
+        headers = dict(metadata)
+        headers["Content-Range"] = (
+            f"bytes {offset}-{offset + len(chunk) - 1}/{len(data)}"
+        )
+        return _StoredObjectResponse(chunk, headers)
+
+    def fput_object(
+        self,
+        bucket_name: str,
+        object_name: str,
+        file_path: str,
+        *,
+        content_type: str = "application/octet-stream",
+        metadata: dict[str, str] | None = None,
+        part_size: int = 0,
+        num_parallel_uploads: int = 1,
+    ) -> None:
+        data = Path(file_path).read_bytes()
+        parts = math.ceil(len(data) / part_size) if part_size else 1
+        self._request(math.ceil(parts / max(num_parallel_uploads, 1)))
+        headers = {
+            f"x-amz-meta-{key}": value for key, value in (metadata or {}).items()
+        }
+        with self._lock:
+            self._objects[object_name] = (data, headers)
+
+    def list_objects(
+        self, bucket_name: str, prefix: str = "", recursive: bool = False
+    ) -> list[SimpleNamespace]:
+        self._request()
+        with self._lock:
+            names = [name for name in self._objects if name.startswith(prefix)]
+        return [SimpleNamespace(object_name=name) for name in names]
+
+
+class FakeParakeetModel:
+    """Drains the audio input and returns evenly spaced synthetic sentences."""
+
+    SENTENCE_SECONDS = 4.0
+
+    def __init__(self, *, latency: SimulatedLatency, engine_time: TimeLedger) -> None:
+        self._latency = latency
+        self._engine_time = engine_time
+
+    def transcribe(
+        self, path: str, *, chunk_duration: float, overlap_duration: float
+    ) -> SimpleNamespace:
+        # Read everything so streamed (FIFO) inputs behave like ffmpeg would.
+        with open(path, "rb") as audio:
+            while audio.read(1024 * 1024):
+                pass
+        duration = self._latency.audio_seconds
+        self._engine_time.simulate(
+            "transcribe", duration * self._latency.transcribe_rtf
+        )
+        count = int(duration // self.SENTENCE_SECONDS)
+        return SimpleNamespace(
+            sentences=[
+                SimpleNamespace(
+                    text=f"Sentence {index} about airports, family and bad dates.",
+                    start=index * self.SENTENCE_SECONDS,
+                    end=(index + 1) * self.SENTENCE_SECONDS - 0.1,
+                )
+                for index in range(count)
+            ]
+        )
+
+
+def make_classifier_runner(
+    latency: SimulatedLatency, engine_time: TimeLedger
+) -> Callable[[Sequence[str]], subprocess.CompletedProcess[str]]:
+    """Return a Swift classifier stand-in emitting a laugh burst every 30s."""
+
+    def _run(command: Sequence[str]) -> subprocess.CompletedProcess[str]:
+        Path(command[1]).stat()
+        duration = latency.audio_seconds
+        engine_time.simulate("sound_classify", duration * latency.classify_rtf)
+        payload = {
+            f"{burst + step * 0.5:.2f}": 0.9
+            for burst in range(30, int(duration), 30)
+            for step in range(6)
+        }
+        return subprocess.CompletedProcess(command, 0, json.dumps(payload), "")
+
+    return _run
+
+
+TRANSCRIPT_KEY_PATTERN = re.compile(r"'(\d+)': \{")
+CHAPTER_ID_PATTERN = re.compile(r"'id': (\d+)")
+
+
+def make_gemini_runner(
+    latency: SimulatedLatency, engine_time: TimeLedger, *, chapter_every: int = 40
+) -> Callable[[Sequence[str]], subprocess.CompletedProcess[str]]:
+    """Return a Gemini CLI stand-in answering summary and classifier prompts."""
+
+    def _run(command: Sequence[str]) -> subprocess.CompletedProcess[str]:
+        prompt = command[list(command).index("-p") + 1]
+        if prompt.startswith(SUMMARY_PROMPT_TEMPLATE):
+            engine_time.simulate("llm_summary", latency.llm_seconds)
+            ids = [int(key) for key in TRANSCRIPT_KEY_PATTERN.findall(prompt)]
+            payload: dict[str, Any] = {
+                "chapters": [
+                    {
+                        "id": chapter_id,
+                        "theme": f"Theme {position}",
+                        "summary": "A synthetic chapter summary. " * 8,
+                    }
+                    for position, chapter_id in enumerate(ids[::chapter_every])
+                ]
+            }
+        else:
+            engine_time.simulate("llm_classify", latency.llm_seconds)
+            payload = {
+                "classifications": [
+                    {
+                        "id": int(chapter_id),
+                        "main_category": "Everyday Life",
+                        "subcategory": "Travel",
+                        "reason": "Synthetic classification.",
+                    }
+                    for chapter_id in CHAPTER_ID_PATTERN.findall(prompt)
+                ]
+            }
+        return subprocess.CompletedProcess(
+            command, 0, "```json\n" + json.dumps(payload) + "\n```", ""
+        )
+
+    return _run
+
+
+class TimedRepository(ProcessVideoRepository):
+    """Repository that records the time spent on Postgres round-trips."""
+
+    def __init__(self, connection: psycopg.Connection, ledger: TimeLedger) -> None:
+        super().__init__(connection)
+        self._ledger = ledger
+
+    def get_video_by_id(self, *args: Any, **kwargs: Any) -> Any:
+        with self._ledger.measure("db_read"):
+            return super().get_video_by_id(*args, **kwargs)
+
+    def get_video_ids_needing_audio_file(self, *args: Any, **kwargs: Any) -> Any:
+        with self._ledger.measure("db_read"):
+            return super().get_video_ids_needing_audio_file(*args, **kwargs)
+
+    def create_videos(self, *args: Any, **kwargs: Any) -> Any:
+        with self._ledger.measure("db_write"):
+            return super().create_videos(*args, **kwargs)
+
+    def update_video_field(self, *args: Any, **kwargs: Any) -> Any:
+        with self._ledger.measure("db_write"):
+            return super().update_video_field(*args, **kwargs)
+
+    def replace_transcript_segments(self, *args: Any, **kwargs: Any) -> Any:
+        with self._ledger.measure("db_write"):
+            return super().replace_transcript_segments(*args, **kwargs)
+
+    def replace_chapter_summaries(self, *args: Any, **kwargs: Any) -> Any:
+        with self._ledger.measure("db_write"):
+            return super().replace_chapter_summaries(*args, **kwargs)
+
+    def record_daily_metrics(self, *args: Any, **kwargs: Any) -> Any:
+        with self._ledger.measure("db_write"):
+            return super().record_daily_metrics(*args, **kwargs)
+
+
+def delete_benchmark_rows(connection: psycopg.Connection) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            DELETE FROM standup_raw.pipeline_task
+            WHERE video_id IN (
+                SELECT video_id FROM standup_raw.process_video WHERE playlist_id = %s
+            )
+            """,
+            (BENCHMARK_PLAYLIST_ID,),
+        )
+        cursor.execute(
+            "DELETE FROM standup_raw.process_video WHERE playlist_id = %s",
+            (BENCHMARK_PLAYLIST_ID,),
+        )
+    connection.commit()
+
+
+def seed_audio_cache(
+    downloader: YoutubeDownloader,
+    storage: MemoryObjectStore,
+    *,
+    videos: int,
+    audio_bytes: bytes,
+    latency: SimulatedLatency,
+    settings: Settings,
+) -> None:
+    """Upload every synthetic video so the run exercises the cache-hit path."""
+    for index in range(videos):
+        video_id = synthetic_video_id(index)
+        local_path = settings.DATA_DIR / f"{video_id}.opus"
+        local_path.write_bytes(audio_bytes)
+        downloader.upload_audio(
+            storage, video_id, DownloadedAudio(local_path, latency.audio_seconds)
+        )
+        local_path.unlink()
+
+
+def summarise_stages(
+    runs: Sequence[Any], engine_time: TimeLedger
+) -> dict[str, dict[str, float]]:
+    walls: dict[str, float] = defaultdict(float)
+    counts: dict[str, int] = defaultdict(int)
+    for run in runs:
+        walls[run.stage] += run.wall_seconds
+        counts[run.stage] += 1
+
+    stages: dict[str, dict[str, float]] = {}
+    for stage, wall in walls.items():
+        engine = engine_time.seconds(stage)
+        stages[stage] = {
+            "runs": counts[stage],
+            "wall_seconds": round(wall, 4),
+            "engine_seconds": round(engine, 4),
+            "overhead_seconds": round(wall - engine, 4),
+            "overhead_ms_per_run": round((wall - engine) / counts[stage] * 1000, 2),
+        }
+    return stages
+
+
+def run_pipeline_benchmark(
+    videos: int,
+    latency: SimulatedLatency,
+    *,
+    warm_cache: bool = False,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Drive ``process_playlist`` over a synthetic playlist with fake engines."""
+    engine_time = TimeLedger()
+    framework_time = TimeLedger()
+    audio_size = int(latency.audio_seconds * latency.audio_bitrate / 8)
+    audio_bytes = random.Random(seed).randbytes(audio_size)
+
+    with tempfile.TemporaryDirectory(prefix="standup-benchmark-") as data_dir:
+        settings = get_settings(DATA_DIR=Path(data_dir))
+        connection = get_db_connection(settings=settings)
+        try:
+            delete_benchmark_rows(connection)
+            storage = MemoryObjectStore(latency=latency, engine_time=engine_time)
+            downloader = YoutubeDownloader(
+                settings=settings,
+                ydl_factory=partial(
+                    FakeYoutubeDL,
+                    videos=videos,
+                    audio_bytes=audio_bytes,
+                    latency=latency,
+                    engine_time=engine_time,
+                ),
+            )
+            if warm_cache:
+                seed_audio_cache(
+                    downloader,
+                    storage,
+                    videos=videos,
+                    audio_bytes=audio_bytes,
+                    latency=latency,
+                    settings=settings,
+                )
+            inventory = AudioInventory(storage, settings=settings)
+            inventory.refresh()
+            # Seeding and the inventory listing are setup, not pipeline work.
+            engine_time.reset()
+
+            telemetry = get_telemetry()
+            first_run = len(telemetry.runs)
+            # dbt is out of scope; the scheduler only records what would run.
+            dbt_scheduler = DbtRunScheduler(lambda video_ids: None, settings=settings)
+            started = time.perf_counter()
+            with AudioDownloadEngine(
+                downloader, storage, inventory=inventory, settings=settings
+            ) as audio_engine:
+                process_playlist(
+                    BENCHMARK_PLAYLIST_URL,
+                    TimedRepository(connection, framework_time),
+                    downloader=downloader,
+                    transcriber=ParakeetTranscriber(
+                        lambda: FakeParakeetModel(
+                            latency=latency, engine_time=engine_time
+                        ),
+                        settings=settings,
+                    ),
+                    sound_classifier_client=SoundClassifierClient(
+                        settings, runner=make_classifier_runner(latency, engine_time)
+                    ),
+                    llm_client=GeminiClient(
+                        run_command=make_gemini_runner(latency, engine_time)
+                    ),
+                    audio_engine=audio_engine,
+                    commit=framework_time.wrap("commit", connection.commit),
+                    settings=settings,
+                    dbt_scheduler=dbt_scheduler,
+                )
+                dbt_scheduler.flush()
+                download_metrics = audio_engine.metrics.as_dict()
+            wall_seconds = time.perf_counter() - started
+            runs = telemetry.runs[first_run:]
+        finally:
+            connection.rollback()
+            delete_benchmark_rows(connection)
+            connection.close()
+
+    stages = summarise_stages(runs, engine_time)
+    synchronous_engine = sum(engine_time.seconds(stage) for stage in SYNCHRONOUS_STAGES)
+    download_wait = stages.get("download", {}).get("wall_seconds", 0.0)
+    overhead_seconds = (
+        wall_seconds
+        - engine_time.seconds("playlist")
+        - synchronous_engine
+        - download_wait
+    )
+    return {
+        "videos": videos,
+        "warm_cache": warm_cache,
+        "wall_seconds": round(wall_seconds, 4),
+        "videos_per_hour": round(videos / wall_seconds * 3600, 1),
+        "overhead_ms_per_video": round(overhead_seconds / videos * 1000, 2),
+        "stages": stages,
+        "engine": engine_time.as_dict(),
+        "framework": framework_time.as_dict(),
+        "downloads": download_metrics,
+        "latency": asdict(latency),
+    }
+
+
+def print_pipeline_report(result: dict[str, Any]) -> None:
+    print(
+        f"videos={result['videos']} warm_cache={result['warm_cache']} "
+        f"wall={result['wall_seconds']:.2f}s "
+        f"videos/hour={result['videos_per_hour']:.1f} "
+        f"overhead/video={result['overhead_ms_per_video']:.1f}ms"
+    )
+    print(
+        f"{'stage':<16}{'runs':>6}{'wall_s':>10}{'engine_s':>10}"
+        f"{'overhead_s':>12}{'ms/run':>10}"
+    )
+    for stage, totals in sorted(result["stages"].items()):
+        print(
+            f"{stage:<16}{totals['runs']:>6}{totals['wall_seconds']:>10.3f}"
+            f"{totals['engine_seconds']:>10.3f}{totals['overhead_seconds']:>12.3f}"
+            f"{totals['overhead_ms_per_run']:>10.2f}"
+        )
+    for name, totals in result["framework"].items():
+        print(f"{name:<16}{totals['calls']:>6}{totals['seconds']:>10.3f}")
+
+
+def check_regression(
+    result: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Compare against a saved result; return human-readable regressions."""
+    regressions = []
+    if result["videos_per_hour"] < baseline["videos_per_hour"] * (1 - tolerance):
+        regressions.append(
+            f"videos/hour dropped from {baseline['videos_per_hour']} "
+            f"to {result['videos_per_hour']}"
+        )
+    if result["overhead_ms_per_video"] > baseline["overhead_ms_per_video"] * (
+        1 + tolerance
+    ):
+        regressions.append(
+            f"overhead/video grew from {baseline['overhead_ms_per_video']}ms "
+            f"to {result['overhead_ms_per_video']}ms"
+        )
+    return regressions
+
+
+def run_pipeline_command(args: argparse.Namespace) -> int:
+    latency = SimulatedLatency(
+        audio_seconds=args.audio_seconds,
+        download_seconds=args.download_seconds,
+        metadata_seconds=args.metadata_seconds,
+        storage_seconds=args.storage_seconds,
+        transcribe_rtf=args.transcribe_rtf,
+        classify_rtf=args.classify_rtf,
+        llm_seconds=args.llm_seconds,
+    )
+    result = run_pipeline_benchmark(
+        args.videos, latency, warm_cache=args.warm_cache, seed=args.seed
+    )
+    print_pipeline_report(result)
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = check_regression(result, baseline, args.tolerance)
+        for regression in regressions:
+            logging.error("Regression: %s", regression)
+        if regressions:
+            return 1
+    return 0
+
+
+# Queries shaped like the Superset charts: filters on calendar columns,
+# channel and category, grouped for bar charts and tables.
+DASHBOARD_QUERIES = {
+    "video_metrics_by_channel": """
+        SELECT channel_name, count(DISTINCT video_title), sum(view_count),
+            avg(laughter_percent)
+        FROM superset.video_metrics
+        WHERE date >= (SELECT max(date) FROM superset.video_metrics) - 365
+        GROUP BY channel_name
+        ORDER BY sum(view_count) DESC
+    """,
+    "video_metrics_top_in_category": """
+        SELECT video_title, channel_name, view_count, laughter_percent
+        FROM superset.video_metrics
+        WHERE main_category = (SELECT min(main_category) FROM superset.video_metrics)
+        ORDER BY view_count DESC
+        LIMIT 20
+    """,
+    "chapters_by_subcategory": """
+        SELECT main_category, subcategory, count(*), avg(laughter_percent),
+            sum(duration)
+        FROM superset.chapters_metrics
+        WHERE year = (SELECT max(year) FROM superset.chapters_metrics)
+        GROUP BY main_category, subcategory
+    """,
+    "daily_views_last_30_days": """
+        SELECT date, channel_name, sum(prev_day_view), sum(prev_day_like)
+        FROM superset.video_daily_snapshot
+        WHERE date > (SELECT max(date) FROM superset.video_daily_snapshot) - 30
+        GROUP BY date, channel_name
+        ORDER BY date
+    """,
+    "dwh_statistics": "SELECT label, total FROM superset.dwh_statistics",
+    "chapter_laughter_top": """
+        SELECT main_category, subcategory, video_title, laughs_per_minute
+        FROM superset.chapter_laughter
+        WHERE main_category = (SELECT min(main_category) FROM superset.chapter_laughter)
+        ORDER BY laughs_per_minute DESC
+        LIMIT 20
+    """,
+}
+
+RELATION_KINDS = {"r": "table", "v": "view", "m": "materialized view"}
+
+
+def _percentile(samples: Sequence[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def run_dashboard_benchmark(repeat: int, warmup: int = 1) -> dict[str, Any]:
+    """Time the dashboard queries against the ``superset`` schema as deployed."""
+    connection = get_db_connection(settings=get_settings())
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT c.relname, c.relkind
+                FROM pg_class AS c
+                INNER JOIN pg_namespace AS n ON c.relnamespace = n.oid
+                WHERE n.nspname = 'superset' AND c.relkind IN ('r', 'v', 'm')
+                """
+            )
+            relations = {
+                name: RELATION_KINDS.get(kind, kind) for name, kind in cursor.fetchall()
+            }
+            queries: dict[str, dict[str, Any]] = {}
+            for name, query in DASHBOARD_QUERIES.items():
+                samples = []
+                for attempt in range(warmup + repeat):
+                    started = time.perf_counter()
+                    cursor.execute(query)
+                    rows = cursor.fetchall()
+                    if attempt >= warmup:
+                        samples.append((time.perf_counter() - started) * 1000)
+                queries[name] = {
+                    "rows": len(rows),
+                    "p50_ms": round(_percentile(samples, 0.5), 3),
+                    "p95_ms": round(_percentile(samples, 0.95), 3),
+                    "max_ms": round(max(samples), 3),
+                }
+    finally:
+        connection.rollback()
+        connection.close()
+    return {"repeat": repeat, "relations": relations, "queries": queries}
+
+
+def print_dashboard_report(
+    result: dict[str, Any], baseline: dict[str, Any] | None = None
+) -> None:
+    relations = ", ".join(
+        f"{name}={kind}" for name, kind in sorted(result["relations"].items())
+    )
+    print(f"repeat={result['repeat']} relations: {relations}")
+    header = f"{'query':<32}{'rows':>7}{'p50_ms':>10}{'p95_ms':>10}{'max_ms':>10}"
+    print(header + (f"{'speedup':>10}" if baseline else ""))
+    for name, timings in result["queries"].items():
+        line = (
+            f"{name:<32}{timings['rows']:>7}{timings['p50_ms']:>10.2f}"
+            f"{timings['p95_ms']:>10.2f}{timings['max_ms']:>10.2f}"
+        )
+        before = (baseline or {}).get("queries", {}).get(name)
+        if before and timings["p50_ms"]:
+            line += f"{before['p50_ms'] / timings['p50_ms']:>9.1f}x"
+        print(line)
+
+
+def check_dashboard_regression(
+    result: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Compare p50 latencies against a saved result; return regressions."""
+    regressions = []
+    for name, timings in result["queries"].items():
+        before = baseline.get("queries", {}).get(name)
+        if before and timings["p50_ms"] > before["p50_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name} p50 grew from {before['p50_ms']}ms to {timings['p50_ms']}ms"
+            )
+    return regressions
+
+
+def run_dashboard_command(args: argparse.Namespace) -> int:
+    result = run_dashboard_benchmark(args.repeat, warmup=args.warmup)
+    baseline = (
+        json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline else None
+    )
+    print_dashboard_report(result, baseline)
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    if baseline:
+        regressions = check_dashboard_regression(result, baseline, args.tolerance)
+        for regression in regressions:
+            logging.error("Regression: %s", regression)
+        if regressions:
+            return 1
+    return 0
+
+
+def build_video_row(
+    audio_seconds: float, laugh_share: float, settings: Settings
+) -> dict[str, Any]:
+    """Return a finished process_video row as psycopg hands it over."""
+    sentence_seconds = FakeParakeetModel.SENTENCE_SECONDS
+    sentences = int(audio_seconds // sentence_seconds)
+    window_step = settings.WINDOW_DURATION_SECONDS * (1 - settings.OVERLAP_FACTOR)
+    laugh_windows = int(audio_seconds * laugh_share / window_step)
+    chapters = range(0, sentences, 40)
+    now = datetime.now(timezone.utc)
+    return {
+        "channel_id": "benchmark-channel",
+        "channel_name": "Benchmark Channel",
+        "playlist_id": BENCHMARK_PLAYLIST_ID,
+        "playlist_title": "Benchmark playlist",
+        "video_id": synthetic_video_id(0),
+        "video_title": "Benchmark special #0",
+        "video_url": "https://www.youtube.com/watch?v=" + synthetic_video_id(0),
+        "video_meta_json": {
+            "duration": int(audio_seconds),
+            "like_count": 1_000,
+            "view_count": 50_000,
+            "comment_count": 120,
+            "upload_date": "20250101",
+        },
+        "transcribe_json": {
+            str(index): {
+                "text": f"Sentence {index} about airports, family and bad dates.",
+                "start": round(index * sentence_seconds, 2),
+                "end": round((index + 1) * sentence_seconds - 0.1, 2),
+            }
+            for index in range(sentences)
+        },
+        "llm_chapter_json": {
+            "chapters": [
+                {
+                    "id": chapter_id,
+                    "end_id": min(chapter_id + 39, sentences - 1),
+                    "theme": f"Theme {chapter_id}",
+                    "summary": "A synthetic chapter summary. " * 8,
+                }
+                for chapter_id in chapters
+            ]
+        },
+        "llm_classifier_json": {
+            "classifications": [
+                {
+                    "id": chapter_id,
+                    "main_category": "Everyday life",
+                    "subcategory": "Travel",
+                    "reason": "The chapter is about airports.",
+                }
+                for chapter_id in chapters
+            ]
+        },
+        "sound_classifier_json": {
+            f"{index * window_step:.2f}": 0.5 for index in range(laugh_windows)
+        },
+        "laugh_events_json": {
+            "events": [
+                {
+                    "sequence": index,
+                    "start_seconds": index * 30.0,
+                    "end_seconds": index * 30.0 + 2.5,
+                    "duration_seconds": 2.5,
+                    "points": 50,
+                    "avg_confidence": 0.6,
+                    "max_confidence": 0.9,
+                }
+                for index in range(1, int(audio_seconds // 30))
+            ]
+        },
+        "process_status": "finished",
+        "created_at": now,
+        "meta_updated_at": now,
+    }
+
+
+def run_hydration_benchmark(
+    audio_seconds: float, laugh_share: float, repeat: int
+) -> dict[str, Any]:
+    """Time building ProcessVideo from one row, validated and trusted."""
+    row = build_video_row(audio_seconds, laugh_share, get_settings())
+    hydrators: dict[str, Callable[[dict[str, Any]], ProcessVideo]] = {
+        "model_validate": ProcessVideo.model_validate,
+        "from_row": ProcessVideo.from_row,
+    }
+    us_per_row = {}
+    for name, hydrate in hydrators.items():
+        hydrate(row)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            hydrate(row)
+        us_per_row[name] = round((time.perf_counter() - started) / repeat * 1e6, 2)
+    return {
+        "audio_seconds": audio_seconds,
+        "transcript_segments": len(row["transcribe_json"]),
+        "classifier_windows": len(row["sound_classifier_json"]),
+        "row_json_bytes": len(json.dumps(row, default=str)),
+        "repeat": repeat,
+        "us_per_row": us_per_row,
+    }
+
+
+def run_hydration_command(args: argparse.Namespace) -> int:
+    result = run_hydration_benchmark(args.audio_seconds, args.laugh_share, args.repeat)
+    print(
+        f"segments={result['transcript_segments']} "
+        f"windows={result['classifier_windows']} "
+        f"row={result['row_json_bytes'] / 1024:.0f}KiB repeat={result['repeat']}"
+    )
+    baseline = result["us_per_row"]["model_validate"]
+    for name, micros in result["us_per_row"].items():
+        print(f"{name:<16}{micros:>12.1f} us/row{baseline / micros:>9.1f}x")
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return 0
+
+
+JSONB_COLUMNS = (
+    "transcribe_json",
+    "sound_classifier_json",
+    "laugh_events_json",
+    "llm_chapter_json",
+    "llm_classifier_json",
+    "video_meta_json",
+)
+
+LARGEST_ROWS_QUERY = """
+    SELECT video_id, {columns}
+    FROM standup_raw.process_video
+    ORDER BY coalesce(pg_column_size(transcribe_json), 0)
+        + coalesce(pg_column_size(sound_classifier_json), 0) DESC
+    LIMIT %s
+"""
+
+
+def _time_per_repeat(func: Callable[[], Any], repeat: int) -> float:
+    func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def run_jsonb_benchmark(rows: int, repeat: int) -> dict[str, Any]:
+    """
+    Time the JSONB columns of the largest process_video rows through stdlib
+    json over the text protocol and through json_codec over the binary one.
+
+    Documents are copied into a temporary table, so nothing is written to
+    standup_raw. Without stored rows a synthetic one-hour show is used.
+    """
+    connection = get_db_connection(settings=get_settings())
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                LARGEST_ROWS_QUERY.format(columns=", ".join(JSONB_COLUMNS)), (rows,)
+            )
+            records = cursor.fetchall()
+            if not records:
+                row = build_video_row(3600.0, 0.15, get_settings())
+                records = [
+                    (row["video_id"], *(row[column] for column in JSONB_COLUMNS))
+                ]
+            cursor.execute(
+                "CREATE TEMP TABLE jsonb_codec_bench"
+                " (video_id TEXT, column_name TEXT, doc JSONB)"
+            )
+            documents: dict[str, list[tuple[str, Any]]] = {}
+            for video_id, *values in records:
+                for column, value in zip(JSONB_COLUMNS, values):
+                    if value is None:
+                        continue
+                    documents.setdefault(column, []).append((video_id, value))
+                    cursor.execute(
+                        "INSERT INTO jsonb_codec_bench VALUES (%s, %s, %s)",
+                        (video_id, column, EncodedJsonb.encode(value)),
+                    )
+
+        # The stdlib cursor reproduces the previous json.dumps/json.loads path.
+        stdlib_cursor = connection.cursor()
+        set_json_loads(json.loads, stdlib_cursor)
+        codec_cursor = connection.cursor(binary=True)
+        update = (
+            "UPDATE jsonb_codec_bench SET doc = %s"
+            " WHERE video_id = %s AND column_name = %s"
+        )
+        select = "SELECT doc FROM jsonb_codec_bench WHERE column_name = %s"
+
+        columns: dict[str, dict[str, Any]] = {}
+        for column, docs in documents.items():
+            timings = {
+                "stdlib_write_ms": lambda: [
+                    stdlib_cursor.execute(update, (json.dumps(doc), video_id, column))
+                    for video_id, doc in docs
+                ],
+                "codec_write_ms": lambda: [
+                    codec_cursor.execute(
+                        update, (EncodedJsonb.encode(doc), video_id, column)
+                    )
+                    for video_id, doc in docs
+                ],
+                "stdlib_read_ms": lambda: stdlib_cursor.execute(
+                    select, (column,)
+                ).fetchall(),
+                "codec_read_ms": lambda: codec_cursor.execute(
+                    select, (column,)
+                ).fetchall(),
+            }
+            columns[column] = {
+                "documents": len(docs),
+                "kib": round(
+                    sum(len(EncodedJsonb.encode(doc)) for _, doc in docs) / 1024, 1
+                ),
+                **{
+                    name: round(_time_per_repeat(func, repeat), 3)
+                    for name, func in timings.items()
+                },
+            }
+    finally:
+        connection.rollback()
+        connection.close()
+    return {"rows": len(records), "repeat": repeat, "columns": columns}
+
+
+def run_jsonb_command(args: argparse.Namespace) -> int:
+    result = run_jsonb_benchmark(args.rows, args.repeat)
+    print(f"rows={result['rows']} repeat={result['repeat']}")
+    print(
+        f"{'column':<24}{'KiB':>9}{'write_ms':>20}{'speedup':>9}"
+        f"{'read_ms':>20}{'speedup':>9}"
+    )
+    for column, timings in result["columns"].items():
+        line = f"{column:<24}{timings['kib']:>9.1f}"
+        for direction in ("write", "read"):
+            before = timings[f"stdlib_{direction}_ms"]
+            after = timings[f"codec_{direction}_ms"]
+            line += f"{before:>10.2f} ->{after:>8.2f}{before / after:>8.1f}x"
+        print(line)
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return 0
+
+
+# Fixed (chunk, overlap) settings compared with the adaptive plan.
+CHUNK_GRID = ((60.0, 15.0), (120.0, 15.0), (300.0, 15.0), (600.0, 15.0))
+# Words this close to an overlap region count towards boundary accuracy.
+BOUNDARY_WINDOW_SECONDS = 5.0
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def probe_audio_seconds(audio_path: Path) -> float:
+    completed = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "csv=p=0",
+            str(audio_path),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(completed.stdout.strip())
+
+
+def _words(
+    transcript: dict[str, dict[str, Any]],
+    windows: Sequence[tuple[float, float]] | None = None,
+) -> list[str]:
+    words = []
+    for segment in sorted(transcript.values(), key=lambda segment: segment["start"]):
+        if windows is None or any(
+            segment["start"] < end and segment["end"] > start for start, end in windows
+        ):
+            words.extend(WORD_PATTERN.findall(segment["text"].lower()))
+    return words
+
+
+def boundary_windows(plan: ChunkPlan, duration: float) -> list[tuple[float, float]]:
+    """Return the overlap regions of ``plan``, widened by the boundary window."""
+    step = plan.chunk_duration - plan.overlap_duration
+    starts = [step * index for index in range(1, math.ceil(duration / step))]
+    return [
+        (
+            start - BOUNDARY_WINDOW_SECONDS,
+            start + plan.overlap_duration + BOUNDARY_WINDOW_SECONDS,
+        )
+        for start in starts
+    ]
+
+
+def _word_accuracy(reference: list[str], hypothesis: list[str]) -> float | None:
+    if not reference and not hypothesis:
+        return None
+    return SequenceMatcher(None, reference, hypothesis, autojunk=False).ratio()
+
+
+def _mlx_peak_memory_mb() -> Callable[[], float | None]:
+    """Reset MLX's peak memory counter; the returned callable reads it."""
+    try:
+        from mlx import core
+    except ImportError:
+        return lambda: None
+    core.reset_peak_memory()
+    return lambda: core.get_peak_memory() / 2**20
+
+
+def run_chunking_benchmark(
+    audio_path: Path,
+    grid: Sequence[tuple[float, float]],
+    reference_path: Path | None,
+) -> dict[str, Any]:
+    """
+    Transcribe one file with each chunk setting and the adaptive plan.
+
+    Accuracy is the word-sequence similarity to a reference transcript, over
+    the whole show and over the words around each chunk boundary. Without
+    ``reference_path`` the reference is a single unchunked pass, which is
+    only allowed up to TRANSCRIBE_MAX_CHUNK_SECONDS: encoder memory grows
+    with the square of the chunk, so a full special would not fit.
+    """
+    duration = probe_audio_seconds(audio_path)
+    max_chunk = get_settings().TRANSCRIBE_MAX_CHUNK_SECONDS
+    if reference_path is None and duration > max_chunk:
+        raise ValueError(
+            f"{audio_path} is {duration:.0f}s long; an unchunked reference is "
+            f"limited to {max_chunk:g}s, pass --reference"
+        )
+    transcriber = ParakeetTranscriber(settings=get_settings())
+    transcriber.load_model_if_needed()
+
+    plans = {
+        f"fixed_{chunk:g}s_{overlap:g}s": ChunkPlan(chunk, overlap)
+        for chunk, overlap in grid
+    }
+    plans["adaptive"] = transcriber.plan_for(duration)
+    if reference_path is None:
+        plans = {"unchunked": ChunkPlan(math.ceil(duration) + 1.0, 0.0), **plans}
+
+    transcripts: dict[str, dict[str, Any]] = {}
+    settings: dict[str, dict[str, Any]] = {}
+    for name, plan in plans.items():
+        read_peak = _mlx_peak_memory_mb()
+        started = time.perf_counter()
+        transcripts[name] = transcriber.transcribe_audio(str(audio_path), plan=plan)
+        wall_seconds = time.perf_counter() - started
+        peak_mb = read_peak()
+        settings[name] = {
+            "chunk_seconds": plan.chunk_duration,
+            "overlap_seconds": plan.overlap_duration,
+            "redundant_share": round(plan.redundant_share, 3),
+            "wall_seconds": round(wall_seconds, 2),
+            "audio_seconds_per_second": round(duration / wall_seconds, 1),
+            "peak_memory_mb": round(peak_mb, 1) if peak_mb is not None else None,
+        }
+
+    reference = (
+        json.loads(reference_path.read_text(encoding="utf-8"))
+        if reference_path
+        else transcripts["unchunked"]
+    )
+    reference_words = _words(reference)
+    for name, plan in plans.items():
+        windows = boundary_windows(plan, duration)
+        settings[name]["word_accuracy"] = _word_accuracy(
+            reference_words, _words(transcripts[name])
+        )
+        settings[name]["boundary_accuracy"] = _word_accuracy(
+            _words(reference, windows), _words(transcripts[name], windows)
+        )
+    return {"audio": str(audio_path), "audio_seconds": duration, "settings": settings}
+
+
+def run_chunking_command(args: argparse.Namespace) -> int:
+    grid = [
+        tuple(float(value) for value in item.split(":"))
+        for item in args.grid.split(",")
+    ]
+    try:
+        result = run_chunking_benchmark(args.audio, grid, args.reference)
+    except ValueError as exc:
+        logging.error("%s", exc)
+        return 1
+    print(f"audio={result['audio']} duration={result['audio_seconds']:.0f}s")
+    print(
+        f"{'setting':<22}{'chunk':>7}{'overlap':>8}{'redundant':>10}{'x_rt':>8}"
+        f"{'peak_mb':>9}{'words':>8}{'boundary':>9}"
+    )
+
+    def _ratio(value: float | None) -> str:
+        return f"{value:.3f}" if value is not None else "-"
+
+    for name, row in result["settings"].items():
+        peak = row["peak_memory_mb"]
+        print(
+            f"{name:<22}{row['chunk_seconds']:>7.0f}{row['overlap_seconds']:>8.0f}"
+            f"{row['redundant_share']:>10.1%}{row['audio_seconds_per_second']:>8.1f}"
+            f"{peak if peak is not None else '-':>9}"
+            f"{_ratio(row['word_accuracy']):>8}{_ratio(row['boundary_accuracy']):>9}"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return 0
+
+
+def run_vad_benchmark(audio_path: Path) -> dict[str, Any]:
+    """Time the voice activity pre-pass and report how much audio each engine keeps."""
+    settings = get_settings()
+    started = time.perf_counter()
+    pcm = decode_pcm(str(audio_path))
+    decode_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    activity = detect_voice_activity(pcm, settings)
+    vad_seconds = time.perf_counter() - started
+    speech = VoiceActivity.total(activity.speech)
+    laughter = VoiceActivity.total(activity.laughter)
+    return {
+        "audio": str(audio_path),
+        "audio_seconds": round(activity.duration, 1),
+        "decode_seconds": round(decode_seconds, 2),
+        "vad_seconds": round(vad_seconds, 2),
+        "speech_seconds": round(speech, 1),
+        "laughter_seconds": round(laughter, 1),
+        "speech_regions": activity.speech,
+        "laughter_regions": activity.laughter,
+    }
+
+
+def run_vad_command(args: argparse.Namespace) -> int:
+    result = run_vad_benchmark(args.audio)
+    duration = result["audio_seconds"] or 1.0
+    print(
+        f"audio={result['audio']} duration={result['audio_seconds']:.0f}s "
+        f"decode={result['decode_seconds']:.2f}s vad={result['vad_seconds']:.2f}s"
+    )
+    print(
+        f"transcription input  {result['speech_seconds']:>8.0f}s"
+        f"{result['speech_seconds'] / duration:>8.1%}"
+    )
+    print(
+        f"laughter input       {result['laughter_seconds']:>8.0f}s"
+        f"{result['laughter_seconds'] / duration:>8.1%}"
+    )
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return 0
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the StandUP pipeline against simulated engines"
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="Show pipeline INFO logging"
+    )
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    defaults = SimulatedLatency()
+    pipeline = subparsers.add_parser(
+        "pipeline",
+        help="Run process_playlist end to end with fake yt-dlp/MinIO/Parakeet/Gemini",
+        description=(
+            "Uses the configured Postgres; rows are written under the"
+            f" '{BENCHMARK_PLAYLIST_ID}' playlist and removed afterwards."
+        ),
+    )
+    pipeline.add_argument("--videos", type=int, default=8)
+    pipeline.add_argument(
+        "--warm_cache",
+        action="store_true",
+        help="Pre-populate the fake MinIO so audio is read from the cache",
+    )
+    pipeline.add_argument("--audio_seconds", type=float, default=defaults.audio_seconds)
+    pipeline.add_argument(
+        "--download_seconds", type=float, default=defaults.download_seconds
+    )
+    pipeline.add_argument(
+        "--metadata_seconds", type=float, default=defaults.metadata_seconds
+    )
+    pipeline.add_argument(
+        "--storage_seconds", type=float, default=defaults.storage_seconds
+    )
+    pipeline.add_argument(
+        "--transcribe_rtf", type=float, default=defaults.transcribe_rtf
+    )
+    pipeline.add_argument("--classify_rtf", type=float, default=defaults.classify_rtf)
+    pipeline.add_argument("--llm_seconds", type=float, default=defaults.llm_seconds)
+    pipeline.add_argument("--seed", type=int, default=0)
+    pipeline.add_argument(
+        "--output", type=Path, help="Write the result as JSON (e.g. a new baseline)"
+    )
+    pipeline.add_argument(
+        "--baseline", type=Path, help="Fail when worse than this saved JSON result"
+    )
+    pipeline.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Allowed relative regression against --baseline",
+    )
+    pipeline.set_defaults(handler=run_pipeline_command)
+
+    dashboard = subparsers.add_parser(
+        "dashboard",
+        help="Time the Superset dashboard queries against the superset schema",
+        description=(
+            "Read-only. Save a run with --output before changing the superset"
+            " models and compare with --baseline afterwards."
+        ),
+    )
+    dashboard.add_argument("--repeat", type=int, default=20)
+    dashboard.add_argument("--warmup", type=int, default=2)
+    dashboard.add_argument("--output", type=Path, help="Write the result as JSON")
+    dashboard.add_argument(
+        "--baseline",
+        type=Path,
+        help="Report speedups and fail when slower than this saved JSON result",
+    )
+    dashboard.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative p50 regression against --baseline",
+    )
+    dashboard.set_defaults(handler=run_dashboard_command)
+
+    hydration = subparsers.add_parser(
+        "hydration",
+        help="Time building ProcessVideo from a realistic process_video row",
+    )
+    hydration.add_argument(
+        "--audio_seconds",
+        type=float,
+        default=3600.0,
+        help="Show length that sizes the transcript and classifier payloads",
+    )
+    hydration.add_argument(
+        "--laugh_share",
+        type=float,
+        default=0.15,
+        help="Share of classifier windows above the confidence threshold",
+    )
+    hydration.add_argument("--repeat", type=int, default=50)
+    hydration.add_argument("--output", type=Path, help="Write the result as JSON")
+    hydration.set_defaults(handler=run_hydration_command)
+
+    jsonb = subparsers.add_parser(
+        "jsonb",
+        help="Time JSONB writes and reads of the largest rows, stdlib vs json_codec",
+        description="Read-only for standup_raw; writes go to a temporary table.",
+    )
+    jsonb.add_argument("--rows", type=int, default=5)
+    jsonb.add_argument("--repeat", type=int, default=10)
+    jsonb.add_argument("--output", type=Path, help="Write the result as JSON")
+    jsonb.set_defaults(handler=run_jsonb_command)
+
+    chunking = subparsers.add_parser(
+        "chunking",
+        help="Compare transcription chunk/overlap settings on a real audio file",
+        description=(
+            "Runs parakeet-mlx (Apple Silicon) once per setting and reports"
+            " throughput, peak MLX memory and word accuracy overall and"
+            " around chunk boundaries."
+        ),
+    )
+    chunking.add_argument("audio", type=Path, help="Audio file to transcribe")
+    chunking.add_argument(
+        "--grid",
+        default=",".join(f"{chunk:g}:{overlap:g}" for chunk, overlap in CHUNK_GRID),
+        help="Comma-separated chunk:overlap seconds to compare",
+    )
+    chunking.add_argument(
+        "--reference",
+        type=Path,
+        help=(
+            "transcribe_json to score against instead of an unchunked pass;"
+            " required above TRANSCRIBE_MAX_CHUNK_SECONDS"
+        ),
+    )
+    chunking.add_argument("--output", type=Path, help="Write the result as JSON")
+    chunking.set_defaults(handler=run_chunking_command)
+
+    vad = subparsers.add_parser(
+        "vad",
+        help="Time the voice activity pre-pass on an audio file",
+        description=(
+            "Reports the decode and detection time and the share of the show"
+            " sent to transcription and to laughter detection."
+        ),
+    )
+    vad.add_argument("audio", type=Path, help="Audio file to analyse")
+    vad.add_argument("--output", type=Path, help="Write the result as JSON")
+    vad.set_defaults(handler=run_vad_command)
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+    sys.exit(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
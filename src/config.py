@@ -32,6 +32,10 @@ class Settings(BaseSettings):
     MINIO_DOMAIN: str
     MINIO_AUDIO_BUCKET: str = "standup-project"  # bucket name in MinIO
     MINIO_AUDIO_PATH: str = "data/audio"  # prefix (folder) inside the bucket
+    MINIO_STREAM_CHUNK_SIZE: int = 8 * 1024 * 1024  # bytes per ranged GET
+    MINIO_UPLOAD_PART_SIZE: int = 16 * 1024 * 1024  # multipart part size (>= 5 MiB)
+    MINIO_UPLOAD_PARALLEL_PARTS: int = 4  # parts uploaded concurrently per object
+    MINIO_TRUST_LEGACY_AUDIO: bool = True  # accept objects uploaded without metadata
 
     # === yt-dlp settings ===
     YDL_DOWNLOAD_OPTS: dict = {
@@ -48,9 +52,12 @@ class Settings(BaseSettings):
             "-b:a",
             "16k",  # bitrate
         ],
+        "concurrent_fragment_downloads": 4,
         "cookiesfrombrowser": ("safari", None, None, None),
         "quiet": True,
     }
+    DOWNLOAD_WORKERS: int = 2  # parallel yt-dlp downloads
+    UPLOAD_WORKERS: int = 1  # parallel MinIO uploads overlapping downloads
 
     YDL_PLAYLIST_OPTS: dict = {
         "skip_download": True,
@@ -58,6 +65,44 @@ class Settings(BaseSettings):
         "cookiesfrombrowser": ("safari", None, None, None),
         "quiet": True,
     }
+    # Playlist entries inserted per batch while a playlist is being listed
+    PLAYLIST_BATCH_SIZE: int = 100
+    # Stored playlists are listed only until their new videos are found;
+    # a full listing still runs this often to catch removals
+    PLAYLIST_FULL_SYNC_DAYS: int = 7
+
+    # === Transcription settings ===
+    # Chunks grow with the show up to the largest size memory allows; the
+    # overlap is fixed, so long specials re-transcribe a smaller share.
+    TRANSCRIBE_MIN_CHUNK_SECONDS: float = 60.0
+    TRANSCRIBE_MAX_CHUNK_SECONDS: float = 600.0
+    TRANSCRIBE_OVERLAP_SECONDS: float = 15.0
+    # Peak encoder memory of a 60 s chunk; attention makes it grow with the
+    # square of the chunk length. Uncalibrated estimate: measure it with
+    # `benchmark.py chunking` on Apple Silicon before relying on it
+    TRANSCRIBE_CHUNK_MEMORY_MB_AT_60S: float = 64.0
+    TRANSCRIBE_MEMORY_FRACTION: float = 0.5  # share of free memory one chunk may use
+
+    # === Stage worker processes ===
+    # Transcription, voice activity detection and laugh-event analysis run
+    # in spawned workers; 0 runs them in the pipeline process
+    STAGE_POOL_WORKERS: int = 1
+    STAGE_POOL_MAX_JOBS_PER_WORKER: int = 20  # recycle workers to shed leaks
+    STAGE_POOL_MAX_RSS_MB: int = 12288  # a worker above this mid-job is replaced
+
+    # === Voice activity pre-pass ===
+    # Transcription gets only speech; laughter detection gets the rest of
+    # the non-silent audio plus the edges of speech. Off until validated on
+    # real specials: it changes transcripts and laughter metrics (README)
+    VAD_ENABLED: bool = False
+    VAD_SILENCE_MARGIN_DB: float = 10.0  # above the 10th percentile frame energy
+    VAD_SPEECH_MIN_BAND_RATIO: float = 0.5  # share of energy in 300-3400 Hz
+    VAD_SPEECH_MAX_FLATNESS: float = 0.35  # noisier frames: applause, laughter
+    VAD_SPEECH_MIN_MODULATION_DB: float = 4.0  # syllable-rate swings; music is steady
+    VAD_MAX_GAP_SECONDS: float = 1.0  # shorter pauses stay inside a speech region
+    VAD_MIN_SPEECH_SECONDS: float = 0.5
+    VAD_PAD_SECONDS: float = 0.3
+    VAD_LAUGHTER_PAD_SECONDS: float = 1.5  # laughter that starts under a punchline
 
     # === Sound analysis settings ===
     WINDOW_DURATION_SECONDS: float = 0.5
@@ -68,6 +113,35 @@ class Settings(BaseSettings):
     LAUGH_EVENT_MIN_DURATION_SECONDS: float = 0.4
     LAUGH_EVENT_MAX_GAP_SECONDS: float = 0.2
 
+    # === dbt settings ===
+    DBT_PROJECT_DIR: Path = Path(__file__).parent.parent
+    DBT_SOURCE_SELECTOR: str = "source:standup_raw.process_video+"
+    DBT_MAX_SCOPED_VIDEOS: int = 500  # above this, run unscoped incrementals
+    DBT_FLUSH_MAX_VIDEOS: int = 200  # run dbt early once this many changed
+    DBT_FLUSH_MAX_SECONDS: int = 3600  # ...or once the oldest change is this old
+
+    # === Telemetry ===
+    TELEMETRY_PROMETHEUS_FILE: Path | None = None  # textfile-collector output
+
+    # === Distributed worker settings ===
+    WORKER_LEASE_SECONDS: int = 900  # lease length before a task can be stolen
+    WORKER_HEARTBEAT_SECONDS: int = 60  # how often a live worker extends it
+    WORKER_MAX_ATTEMPTS: int = 3  # attempts before a task is marked failed
+
+    # === Scheduling ===
+    # Pending work runs cheapest stage first, then by score: recency and views
+    # add to it, hours of audio subtract. Playlists are listed in full before
+    # anything is processed. False keeps listing/queue order.
+    SCHEDULE_BY_PRIORITY: bool = True
+    SCHEDULE_RECENCY_WEIGHT: float = 2.0  # score of an upload from today
+    SCHEDULE_RECENCY_HALF_LIFE_DAYS: float = 14.0
+    SCHEDULE_VIEWS_WEIGHT: float = 0.25  # per tenfold views
+    SCHEDULE_COST_WEIGHT: float = 0.1  # per hour of audio
+
+    # === Backlog forecast (--plan) ===
+    PLAN_HISTORY_DAYS: int = 30  # recorded stage runs the cost models learn from
+    PLAN_MIN_SAMPLES: int = 5  # fewer runs fit a plain ratio instead of a line
+
     # === Gemini Configuration ===
     GEMINI_MODEL: str = "gemini-2.5-pro"
     # GEMINI_MODEL: str = "gemini-2.5-flash"
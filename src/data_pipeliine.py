@@ -1,19 +1,53 @@
 import logging
-from datetime import date
-from typing import Any, Callable
-
+from collections import deque
+from contextlib import ExitStack
+from datetime import date, datetime, timedelta, timezone
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Iterator, Sequence
+
+import psycopg
 from minio import Minio
 from yt_dlp.utils import DownloadError, ExtractorError
 
+from audio_stream import ChecksumMismatchError
 from config import Settings, VideoURLModel, get_settings
-from database import ProcessVideoRepository, get_db_connection
-from dbt_run import run_dbt_pipeline
+from database import (
+    PlaylistSyncRepository,
+    ProcessVideoRepository,
+    StageRunRepository,
+    get_db_connection,
+)
+from dbt_run import DbtRunner, DbtRunScheduler, run_dbt_pipeline
 from llm import GeminiClient, request_llm_classification, request_llm_summary
 from models import ProcessVideo
+from process_pool import StagePool, create_stage_pool
 from sound_classifier import SoundClassifierClient
+from telemetry import PipelineTelemetry, get_telemetry
 from transcribe import ParakeetTranscriber
 from utils import remove_audio_cache
-from youtube_downloader import YoutubeDownloader
+from vad import VoiceActivityDetector
+from youtube_downloader import (
+    AudioDownloadEngine,
+    AudioInventory,
+    PlaylistListing,
+    YoutubeDownloader,
+)
+
+# Telemetry stage names for the columns each pipeline step produces.
+COLUMN_STAGES = {
+    "video_meta_json": "metadata",
+    "transcribe_json": "transcribe",
+    "sound_classifier_json": "sound_classify",
+    "laugh_events_json": "laugh_events",
+    "llm_chapter_json": "llm_summary",
+    "llm_classifier_json": "llm_classify",
+}
+
+
+def audio_duration_seconds(video_row: ProcessVideo) -> float | None:
+    duration = (video_row.video_meta_json or {}).get("duration")
+    return float(duration) if duration else None
 
 
 def update_field_if_missing(
@@ -34,18 +68,23 @@ def update_field_if_missing(
     if video_row.video_id is None:
         raise ValueError("Cannot update database without a video_id")
 
-    new_value = value_generator_func()
-    if new_value is None and not allow_none:
-        return False
-
-    setattr(video_row, column_name, new_value)
-    repository.update_video_field(
+    with get_telemetry().stage(
+        COLUMN_STAGES.get(column_name, column_name),
         video_row.video_id,
-        column_name,
-        new_value,
-        json_type=json_type,
-    )
-    commit()
+        audio_seconds=audio_duration_seconds(video_row),
+    ) as stage_run:
+        new_value = value_generator_func()
+        if new_value is None and not allow_none:
+            return False
+
+        setattr(video_row, column_name, new_value)
+        stage_run.bytes_moved = repository.update_video_field(
+            video_row.video_id,
+            column_name,
+            new_value,
+            json_type=json_type,
+        )
+        commit()
     return True
 
 
@@ -63,11 +102,19 @@ def update_video_metadata(
         or not video_row.meta_updated_at
         or video_row.meta_updated_at.date() < date.today()
     ):
+
+        def _extract_video_info() -> dict[str, Any] | None:
+            video_info = downloader.extract_video_info(video_row.video_url)
+            if video_info is not None:
+                # Committed together with video_meta_json by update_field_if_missing.
+                repository.record_daily_metrics(video_row.video_id, video_info)
+            return video_info
+
         if update_field_if_missing(
             video_row,
             repository,
             "video_meta_json",
-            lambda: downloader.extract_video_info(video_row.video_url),
+            _extract_video_info,
             commit=commit,
             force_update=True,
         ):
@@ -79,10 +126,9 @@ def update_video_metadata(
 def process_audio_and_transcription(
     video_row: ProcessVideo,
     repository: ProcessVideoRepository,
-    downloader: YoutubeDownloader,
+    audio_engine: AudioDownloadEngine,
     transcriber: ParakeetTranscriber,
     sound_classifier: SoundClassifierClient,
-    storage_client: Minio,
     commit: Callable[[], None],
 ) -> bool:
     updated = False
@@ -96,33 +142,65 @@ def process_audio_and_transcription(
     if not (needs_transcription or needs_sound_classifier or needs_laugh_events):
         return updated
 
-    audio_path_str: str | None = None
     if needs_transcription or needs_sound_classifier:
-        audio_path = downloader.download_audio(
-            storage_client, video_row.video_url, video_row.video_id
-        )
-        audio_path_str = str(audio_path)
-        video_row.audio_path = audio_path_str
-
-    if needs_transcription and audio_path_str:
-        if update_field_if_missing(
-            video_row,
-            repository,
-            "transcribe_json",
-            lambda: transcriber.transcribe_audio(audio_path_str),
-            commit=commit,
-        ):
-            updated = True
-
-    if needs_sound_classifier and audio_path_str:
-        if update_field_if_missing(
-            video_row,
-            repository,
-            "sound_classifier_json",
-            lambda: sound_classifier.classify_audio(audio_path_str),
-            commit=commit,
-        ):
-            updated = True
+        # Only the Swift classifier needs a seekable file; transcription alone
+        # can decode straight from the MinIO stream.
+        with ExitStack() as stack:
+            with get_telemetry().stage(
+                "download",
+                video_row.video_id,
+                audio_seconds=audio_duration_seconds(video_row),
+            ) as stage_run:
+                audio_input = stack.enter_context(
+                    audio_engine.open_audio(
+                        video_row.video_url,
+                        video_row.video_id,
+                        require_file=needs_sound_classifier,
+                    )
+                )
+                if not audio_input.streamed:
+                    stage_run.bytes_moved = audio_input.path.stat().st_size
+            audio_path_str = str(audio_input.path)
+            video_row.audio_path = audio_path_str
+
+            def _transcribe() -> dict[str, dict[str, Any]]:
+                transcript = transcriber.transcribe_audio(
+                    audio_path_str, audio_duration_seconds(video_row)
+                )
+                try:
+                    audio_input.ensure_complete()
+                except ChecksumMismatchError as exc:
+                    logging.warning("Re-downloading %s: %s", video_row.video_id, exc)
+                    audio_path = audio_engine.replace_corrupt_audio(
+                        video_row.video_url, video_row.video_id
+                    )
+                    video_row.audio_path = str(audio_path)
+                    transcript = transcriber.transcribe_audio(
+                        str(audio_path), audio_duration_seconds(video_row)
+                    )
+                # Committed together with transcribe_json by update_field_if_missing.
+                repository.replace_transcript_segments(video_row.video_id, transcript)
+                return transcript
+
+            if needs_transcription:
+                if update_field_if_missing(
+                    video_row,
+                    repository,
+                    "transcribe_json",
+                    _transcribe,
+                    commit=commit,
+                ):
+                    updated = True
+
+            if needs_sound_classifier:
+                if update_field_if_missing(
+                    video_row,
+                    repository,
+                    "sound_classifier_json",
+                    lambda: sound_classifier.classify_audio(audio_path_str),
+                    commit=commit,
+                ):
+                    updated = True
 
     if needs_laugh_events:
         if update_field_if_missing(
@@ -154,11 +232,18 @@ def run_llm_tasks(
     if not needs_llm:
         return updated
 
+    def _summarise() -> dict[str, Any] | None:
+        chapters = request_llm_summary(video_row.transcribe_json, client=llm_client)
+        if chapters is not None:
+            # Committed together with llm_chapter_json by update_field_if_missing.
+            repository.replace_chapter_summaries(video_row.video_id, chapters)
+        return chapters
+
     if update_field_if_missing(
         video_row,
         repository,
         "llm_chapter_json",
-        lambda: request_llm_summary(video_row.transcribe_json, client=llm_client),
+        _summarise,
         allow_none=False,
         commit=commit,
     ):
@@ -218,7 +303,7 @@ def process_single_video(
     transcriber: ParakeetTranscriber,
     sound_classifier_client: SoundClassifierClient,
     llm_client: GeminiClient,
-    storage_client: Minio,
+    audio_engine: AudioDownloadEngine,
     commit: Callable[[], None],
     settings: Settings,
 ) -> bool:
@@ -246,10 +331,9 @@ def process_single_video(
         if process_audio_and_transcription(
             video_from_db,
             repository,
-            downloader,
+            audio_engine,
             transcriber,
             sound_classifier_client,
-            storage_client,
             commit,
         ):
             any_updates = True
@@ -260,8 +344,6 @@ def process_single_video(
         if update_status(video_from_db, repository, commit):
             any_updates = True
 
-        remove_audio_cache(settings=settings)
-
         if any_updates:
             return True
 
@@ -271,9 +353,67 @@ def process_single_video(
     except Exception as exc:  # noqa: BLE001
         logging.error("Error processing video %s: %s", video_row.video_id, exc)
         raise
+    finally:
+        if video_row.video_id is not None:
+            audio_engine.release(video_row.video_id)
     return False
 
 
+def sync_playlist_entries(
+    listing: PlaylistListing,
+    repository: ProcessVideoRepository,
+    playlist_sync: PlaylistSyncRepository,
+    settings: Settings,
+) -> Iterator[ProcessVideo]:
+    """
+    Yield a stored playlist's videos, paging YouTube only for new ones.
+
+    YouTube reports the entry count with the first page. Paging stops once
+    that many minus the stored videos are found, so an idle playlist costs a
+    single request. Removals can hide additions behind an unchanged count,
+    so a full listing is still made every ``PLAYLIST_FULL_SYNC_DAYS``.
+    """
+    playlist_id = listing.playlist_id
+    known_videos = repository.get_playlist_videos(playlist_id)
+    known_ids = {video.video_id for video in known_videos}
+    state = playlist_sync.get(playlist_id)
+    full_sync_due = (
+        state is None
+        or state.last_full_sync_at is None
+        or datetime.now(timezone.utc) - state.last_full_sync_at
+        >= timedelta(days=settings.PLAYLIST_FULL_SYNC_DAYS)
+    )
+    missing = (
+        None
+        if full_sync_due or listing.entry_count is None
+        else listing.entry_count - len(known_ids)
+    )
+
+    listed_ids: set[str | None] = set()
+    new_videos = 0
+    full_listing = True
+    if missing is not None and missing <= 0:
+        full_listing = False
+    else:
+        for video in listing.entries:
+            listed_ids.add(video.video_id)
+            new_videos += video.video_id not in known_ids
+            yield video
+            if missing is not None and new_videos >= missing:
+                full_listing = False
+                break
+
+    logging.info(
+        "Playlist %s: %s new video(s) after listing %s of %s entries",
+        playlist_id,
+        new_videos,
+        len(listed_ids),
+        listing.entry_count,
+    )
+    playlist_sync.record(playlist_id, listing.entry_count, full_listing=full_listing)
+    yield from (video for video in known_videos if video.video_id not in listed_ids)
+
+
 def process_playlist(
     youtube_url: str,
     repository: ProcessVideoRepository,
@@ -282,19 +422,230 @@ def process_playlist(
     transcriber: ParakeetTranscriber,
     sound_classifier_client: SoundClassifierClient,
     llm_client: GeminiClient,
-    storage_client: Minio,
+    audio_engine: AudioDownloadEngine,
     commit: Callable[[], None],
     settings: Settings,
-) -> None:
+    dbt_scheduler: DbtRunScheduler,
+    playlist_sync: PlaylistSyncRepository | None = None,
+) -> int:
+    """
+    Process every video of a playlist; return how many changed.
+
+    With ``playlist_sync`` the listing stops once the new videos are found
+    and the rest of the playlist is taken from the database.
+    """
+    return process_playlists(
+        [youtube_url],
+        repository,
+        downloader=downloader,
+        transcriber=transcriber,
+        sound_classifier_client=sound_classifier_client,
+        llm_client=llm_client,
+        audio_engine=audio_engine,
+        commit=commit,
+        settings=settings,
+        dbt_scheduler=dbt_scheduler,
+        playlist_sync=playlist_sync,
+    )
+
+
+def process_playlists(
+    youtube_urls: Sequence[str],
+    repository: ProcessVideoRepository,
+    *,
+    downloader: YoutubeDownloader,
+    transcriber: ParakeetTranscriber,
+    sound_classifier_client: SoundClassifierClient,
+    llm_client: GeminiClient,
+    audio_engine: AudioDownloadEngine,
+    commit: Callable[[], None],
+    settings: Settings,
+    dbt_scheduler: DbtRunScheduler,
+    playlist_sync: PlaylistSyncRepository | None = None,
+) -> int:
+    """
+    Process the videos of several playlists; return how many changed.
+
+    With SCHEDULE_BY_PRIORITY every playlist is listed and stored first, and
+    their videos are then processed in one priority order, so a fresh upload
+    deep in a listing or in a later playlist does not wait behind the
+    backlog. Otherwise each playlist is processed while it is being listed.
+    """
+    if not settings.SCHEDULE_BY_PRIORITY:
+        return sum(
+            _list_and_process_playlist(
+                youtube_url,
+                repository,
+                downloader=downloader,
+                transcriber=transcriber,
+                sound_classifier_client=sound_classifier_client,
+                llm_client=llm_client,
+                audio_engine=audio_engine,
+                commit=commit,
+                settings=settings,
+                dbt_scheduler=dbt_scheduler,
+                playlist_sync=playlist_sync,
+            )
+            for youtube_url in youtube_urls
+        )
+
+    videos: dict[str, ProcessVideo] = {}
+    for youtube_url in youtube_urls:
+        for video in list_playlist(
+            youtube_url,
+            repository,
+            downloader=downloader,
+            commit=commit,
+            settings=settings,
+            playlist_sync=playlist_sync,
+        ):
+            if video.video_id:
+                videos.setdefault(video.video_id, video)
+    ordered_ids = repository.order_by_priority(list(videos), settings)
+    logging.info("Processing %s video(s) by priority", len(ordered_ids))
+    return _process_playlist_entries(
+        (videos[video_id] for video_id in ordered_ids),
+        repository,
+        downloader=downloader,
+        transcriber=transcriber,
+        sound_classifier_client=sound_classifier_client,
+        llm_client=llm_client,
+        audio_engine=audio_engine,
+        commit=commit,
+        settings=settings,
+        dbt_scheduler=dbt_scheduler,
+        store=False,
+    )
+
+
+def list_playlist(
+    youtube_url: str,
+    repository: ProcessVideoRepository,
+    *,
+    downloader: YoutubeDownloader,
+    commit: Callable[[], None],
+    settings: Settings,
+    playlist_sync: PlaylistSyncRepository | None = None,
+) -> list[ProcessVideo]:
+    """Store a playlist's entries without processing them; return its videos."""
     logging.info("=" * 42)
-    playlist_info = downloader.extract_playlist_info(youtube_url)
-    logging.info("Starting playlist processing - %s", playlist_info[0].playlist_title)
+    videos: list[ProcessVideo] = []
+    with downloader.open_playlist(youtube_url) as listing:
+        entries: Iterator[ProcessVideo] = listing.entries
+        if playlist_sync is not None and listing.playlist_id:
+            entries = sync_playlist_entries(
+                listing, repository, playlist_sync, settings
+            )
+        while batch := list(islice(entries, settings.PLAYLIST_BATCH_SIZE)):
+            repository.create_videos(batch)
+            commit()
+            videos.extend(batch)
+    # The sync state is recorded once the listing is exhausted.
+    commit()
+    logging.info("Listed %s video(s) - %s", len(videos), listing.playlist_title)
+    return videos
 
-    repository.create_videos(playlist_info)
+
+def _list_and_process_playlist(
+    youtube_url: str,
+    repository: ProcessVideoRepository,
+    *,
+    downloader: YoutubeDownloader,
+    transcriber: ParakeetTranscriber,
+    sound_classifier_client: SoundClassifierClient,
+    llm_client: GeminiClient,
+    audio_engine: AudioDownloadEngine,
+    commit: Callable[[], None],
+    settings: Settings,
+    dbt_scheduler: DbtRunScheduler,
+    playlist_sync: PlaylistSyncRepository | None = None,
+) -> int:
+    logging.info("=" * 42)
+    with downloader.open_playlist(youtube_url) as listing:
+        entries: Iterator[ProcessVideo] = listing.entries
+        if playlist_sync is not None and listing.playlist_id:
+            entries = sync_playlist_entries(
+                listing, repository, playlist_sync, settings
+            )
+        processed_videos = _process_playlist_entries(
+            entries,
+            repository,
+            downloader=downloader,
+            transcriber=transcriber,
+            sound_classifier_client=sound_classifier_client,
+            llm_client=llm_client,
+            audio_engine=audio_engine,
+            commit=commit,
+            settings=settings,
+            dbt_scheduler=dbt_scheduler,
+        )
+    # The sync state is recorded once the listing is exhausted.
     commit()
+    return processed_videos
+
+
+def _process_playlist_entries(
+    entries: Iterator[ProcessVideo],
+    repository: ProcessVideoRepository,
+    *,
+    downloader: YoutubeDownloader,
+    transcriber: ParakeetTranscriber,
+    sound_classifier_client: SoundClassifierClient,
+    llm_client: GeminiClient,
+    audio_engine: AudioDownloadEngine,
+    commit: Callable[[], None],
+    settings: Settings,
+    dbt_scheduler: DbtRunScheduler,
+    store: bool = True,
+) -> int:
+    """
+    Insert and process ``entries`` as they arrive; return how many changed.
+
+    ``store=False`` skips the insert for entries that are already stored.
+    """
+    # Videos are listed lazily and inserted in batches, so processing starts
+    # after the first page and the listing never has to be held in memory.
+    pending: deque[ProcessVideo] = deque()
+    needs_audio: set[str] = set()
+    lookahead = settings.DOWNLOAD_WORKERS
+    listed_videos = 0
+
+    def _fill_pending() -> None:
+        nonlocal listed_videos
+        # Keep the current video plus the prefetch lookahead buffered.
+        while len(pending) <= lookahead:
+            batch = list(islice(entries, settings.PLAYLIST_BATCH_SIZE))
+            if not batch:
+                return
+            if not listed_videos:
+                logging.info(
+                    "Starting playlist processing - %s", batch[0].playlist_title
+                )
+            listed_videos += len(batch)
+            if store:
+                repository.create_videos(batch)
+                commit()
+            batch_ids = [video.video_id for video in batch if video.video_id]
+            needs_audio.update(repository.get_video_ids_needing_audio_file(batch_ids))
+            pending.extend(batch)
 
     processed_videos = 0
-    for video in playlist_info:
+    while True:
+        _fill_pending()
+        if not pending:
+            break
+        video = pending.popleft()
+        # Keep the download pool busy with the next videos that still need
+        # audio while the current one is transcribed and classified.
+        audio_queue = (
+            queued
+            for queued in pending
+            if queued.video_id in needs_audio and queued.video_url
+        )
+        audio_engine.prefetch(
+            (queued.video_url, queued.video_id)
+            for queued in islice(audio_queue, lookahead)
+        )
         processed = process_single_video(
             video,
             repository,
@@ -302,74 +653,155 @@ def process_playlist(
             transcriber=transcriber,
             sound_classifier_client=sound_classifier_client,
             llm_client=llm_client,
-            storage_client=storage_client,
+            audio_engine=audio_engine,
             commit=commit,
             settings=settings,
         )
-        if processed:
+        if processed and video.video_id:
             processed_videos += 1
+            dbt_scheduler.add([video.video_id])
 
-    if processed_videos:
-        logging.info(
-            "Processed %s video(s) with changes; running dbt pipeline",
-            processed_videos,
+    logging.info(
+        "Processed %s of %s video(s) with changes",
+        processed_videos,
+        listed_videos,
+    )
+    return processed_videos
+
+
+def persist_telemetry(
+    telemetry: PipelineTelemetry,
+    connection: psycopg.Connection,
+    settings: Settings,
+) -> None:
+    """Store pending stage runs and refresh the Prometheus textfile."""
+    pending = telemetry.drain_pending()
+    try:
+        StageRunRepository(connection).insert_runs(
+            telemetry.run_id, telemetry.worker_id, pending
         )
-        run_dbt_pipeline()
+        connection.commit()
+    except Exception as exc:  # noqa: BLE001
+        connection.rollback()
+        telemetry.restore_pending(pending)
+        logging.warning("Failed to persist stage telemetry: %s", exc)
+    if settings.TELEMETRY_PROMETHEUS_FILE:
+        telemetry.write_prometheus(settings.TELEMETRY_PROMETHEUS_FILE)
+
+
+def backfill_typed_rows(
+    repository: ProcessVideoRepository, commit: Callable[[], None]
+) -> None:
+    """Split JSON written before the typed raw tables existed."""
+    if segments := repository.backfill_transcript_segments():
+        logging.info("Backfilled %s transcript segment(s)", segments)
+    if chapters := repository.backfill_chapter_summaries():
+        logging.info("Backfilled %s chapter summary row(s)", chapters)
+    if metrics := repository.backfill_daily_metrics():
+        logging.info("Backfilled %s daily metric row(s)", metrics)
+    commit()
+
+
+def create_audio_engine(
+    downloader: YoutubeDownloader, settings: Settings
+) -> AudioDownloadEngine:
+    minio_client = Minio(
+        settings.MINIO_DOMAIN,
+        access_key=settings.MINIO_ROOT_USER,
+        secret_key=settings.MINIO_ROOT_PASSWORD,
+        secure=False,
+    )
+    # One listing per run replaces a stat_object probe per video; fall back
+    # to probing when the listing fails.
+    audio_inventory: AudioInventory | None = AudioInventory(
+        minio_client, settings=settings
+    )
+    if audio_inventory.refresh() is None:
+        audio_inventory = None
+    return AudioDownloadEngine(
+        downloader, minio_client, inventory=audio_inventory, settings=settings
+    )
 
 
 def run_pipeline(new_playlist: str | None) -> None:
     """Execute the data pipeline for a specific playlist or pending playlists."""
     connection = None
+    llm_client: GeminiClient | None = None
+    audio_engine: AudioDownloadEngine | None = None
+    stage_pool: StagePool | None = None
     try:
         settings = get_settings()
         connection = get_db_connection(settings=settings)
         repository = ProcessVideoRepository(connection)
+        backfill_typed_rows(repository, connection.commit)
 
         downloader = YoutubeDownloader(settings=settings)
-        transcriber = ParakeetTranscriber()
-        sound_classifier_client = SoundClassifierClient(settings=settings)
+        stage_pool = create_stage_pool(settings)
+        vad = (
+            VoiceActivityDetector(settings, pool=stage_pool)
+            if settings.VAD_ENABLED
+            else None
+        )
+        transcriber = ParakeetTranscriber(settings=settings, vad=vad, pool=stage_pool)
+        sound_classifier_client = SoundClassifierClient(
+            settings=settings, vad=vad, pool=stage_pool
+        )
         llm_client = GeminiClient()
 
-        minio_client = Minio(
-            settings.MINIO_DOMAIN,
-            access_key=settings.MINIO_ROOT_USER,
-            secret_key=settings.MINIO_ROOT_PASSWORD,
-            secure=False,
+        audio_engine = create_audio_engine(downloader, settings)
+        # One runner per invocation so the dbt project is parsed only once,
+        # and one scheduler so dbt runs once for all playlists.
+        dbt_scheduler = DbtRunScheduler(
+            partial(run_dbt_pipeline, runner=DbtRunner(settings=settings)),
+            settings=settings,
         )
 
         if new_playlist:
-            youtube_url = VideoURLModel(url=new_playlist)
-            process_playlist(
-                str(youtube_url.url),
-                repository,
-                downloader=downloader,
-                transcriber=transcriber,
-                sound_classifier_client=sound_classifier_client,
-                llm_client=llm_client,
-                storage_client=minio_client,
-                commit=connection.commit,
-                settings=settings,
-            )
-            return
-
-        pending_playlists = repository.get_playlist_ids()
-        for playlist in pending_playlists:
-            pending_playlists_url = (
+            playlist_urls = [new_playlist]
+        else:
+            playlist_urls = [
                 "https://www.youtube.com/playlist?list=" + playlist.playlist_id
-            )
-            youtube_url = VideoURLModel(url=pending_playlists_url)
-            process_playlist(
-                str(youtube_url.url),
+                for playlist in repository.get_playlist_ids()
+            ]
+
+        playlist_sync = PlaylistSyncRepository(connection)
+        # Scoped runs only look at the ids they are given, so changes from
+        # playlists finished before a failure must still reach dbt now.
+        try:
+            process_playlists(
+                [
+                    str(VideoURLModel(url=playlist_url).url)
+                    for playlist_url in playlist_urls
+                ],
                 repository,
                 downloader=downloader,
                 transcriber=transcriber,
                 sound_classifier_client=sound_classifier_client,
                 llm_client=llm_client,
-                storage_client=minio_client,
+                audio_engine=audio_engine,
                 commit=connection.commit,
                 settings=settings,
+                dbt_scheduler=dbt_scheduler,
+                playlist_sync=playlist_sync,
             )
+        except BaseException:
+            # A dbt failure here must not hide the error that stopped the run.
+            try:
+                dbt_scheduler.flush()
+            except Exception:
+                logging.exception("dbt run after a failed pipeline also failed")
+            raise
+        dbt_scheduler.flush()
 
     finally:
+        if stage_pool is not None:
+            stage_pool.close()
+        if audio_engine is not None:
+            audio_engine.close()
+            remove_audio_cache(settings=settings)
+        if connection:
+            persist_telemetry(get_telemetry(), connection, settings)
+        if llm_client is not None and llm_client.response_stats:
+            logging.info("Gemini responses: %s", dict(llm_client.response_stats))
         if connection:
             connection.close()
@@ -1,11 +1,13 @@
-import json
 import logging
-from typing import Any, Iterable, Optional, Sequence
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, Optional, Sequence
 
 import psycopg
 
 from config import Settings, get_settings
-from models import ProcessVideo
+from json_codec import EncodedJsonb, register_json_codec
+from models import PipelineTask, PlaylistSync, ProcessVideo
+from telemetry import StageRun
 from utils import try_except_with_log
 
 
@@ -13,13 +15,15 @@ from utils import try_except_with_log
 def get_db_connection(settings: Settings | None = None) -> psycopg.Connection:
     """Establish a connection to Postgres using provided settings."""
     resolved_settings = settings or get_settings()
-    return psycopg.connect(
+    connection = psycopg.connect(
         host=resolved_settings.POSTGRES_HOST,
         dbname=resolved_settings.POSTGRES_DB,
         user=resolved_settings.POSTGRES_USER,
         password=resolved_settings.POSTGRES_PASSWORD,
         port=resolved_settings.POSTGRES_PORT,
     )
+    register_json_codec(connection)
+    return connection
 
 
 class ProcessVideoRepository:
@@ -29,13 +33,13 @@ class ProcessVideoRepository:
         self._connection = connection
 
     def _row_to_model(self, row: Sequence[Any], columns: Sequence[str]) -> ProcessVideo:
-        payload = dict(zip(columns, row))
-        return ProcessVideo.model_validate(payload)
+        return ProcessVideo.from_row(dict(zip(columns, row)))
 
     @try_except_with_log()
     def get_video_by_id(self, video_id: str) -> Optional[ProcessVideo]:
         query = "SELECT * FROM standup_raw.process_video WHERE video_id = %s"
-        with self._connection.cursor() as cursor:
+        # Binary results hand jsonb to orjson as bytes, skipping a text decode.
+        with self._connection.cursor(binary=True) as cursor:
             cursor.execute(query, (video_id,))
             record = cursor.fetchone()
             if record is None:
@@ -51,17 +55,289 @@ class ProcessVideoRepository:
         value: Any,
         *,
         json_type: bool = False,
-    ) -> None:
-        payload = json.dumps(value) if json_type else value
+    ) -> int:
+        """Update one column and return the size of the written JSON payload."""
+        payload = EncodedJsonb.encode(value) if json_type else value
         with self._connection.cursor() as cursor:
             cursor.execute(
                 f"UPDATE standup_raw.process_video SET {column} = %s WHERE video_id = %s",
                 (payload, video_id),
             )
+        return len(payload) if isinstance(payload, EncodedJsonb) else 0
+
+    def _replace_video_rows(
+        self,
+        table: str,
+        columns: Sequence[str],
+        video_id: str,
+        rows: Iterable[Sequence[Any]],
+    ) -> None:
+        """Delete a video's rows from ``table`` and COPY ``rows`` in their place."""
+        with self._connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE video_id = %s", (video_id,))
+            with cursor.copy(
+                f"COPY {table} (video_id, {', '.join(columns)}) FROM STDIN"
+            ) as copy:
+                for row in rows:
+                    copy.write_row((video_id, *row))
+
+    @try_except_with_log()
+    def replace_transcript_segments(
+        self, video_id: str, transcript: dict[str, dict[str, Any]]
+    ) -> int:
+        """Replace the typed segment rows of one video using COPY."""
+        self._replace_video_rows(
+            "standup_raw.transcript_segment",
+            ("idx", "start_s", "end_s", "text"),
+            video_id,
+            (
+                (int(key), segment["start"], segment["end"], segment.get("text") or "")
+                for key, segment in transcript.items()
+            ),
+        )
+        return len(transcript)
+
+    @try_except_with_log()
+    def replace_chapter_summaries(
+        self, video_id: str, llm_chapter_json: dict[str, Any]
+    ) -> int:
+        """Replace the typed chapter rows of one video using COPY."""
+        # The LLM occasionally repeats a start id; keep its first chapter.
+        chapters = {}
+        for chapter in llm_chapter_json.get("chapters", []):
+            chapters.setdefault(int(chapter["id"]), chapter)
+        self._replace_video_rows(
+            "standup_raw.chapter_summary",
+            ("start_idx", "end_idx", "theme", "summary"),
+            video_id,
+            (
+                (
+                    start_idx,
+                    chapter.get("end_id"),
+                    chapter.get("theme") or "",
+                    chapter.get("summary") or "",
+                )
+                for start_idx, chapter in chapters.items()
+            ),
+        )
+        return len(chapters)
+
+    @try_except_with_log()
+    def backfill_transcript_segments(self) -> int:
+        """Split stored transcribe_json documents that have no segment rows yet."""
+        with self._connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO standup_raw.transcript_segment (
+                    video_id, idx, start_s, end_s, text
+                )
+                SELECT
+                    pv.video_id,
+                    segment.key::INT,
+                    (segment.value ->> 'start')::DOUBLE PRECISION,
+                    (segment.value ->> 'end')::DOUBLE PRECISION,
+                    coalesce(segment.value ->> 'text', '')
+                FROM standup_raw.process_video AS pv
+                CROSS JOIN LATERAL jsonb_each(pv.transcribe_json) AS segment
+                WHERE pv.transcribe_json IS NOT NULL
+                  AND NOT EXISTS (
+                      SELECT 1
+                      FROM standup_raw.transcript_segment AS ts
+                      WHERE ts.video_id = pv.video_id
+                  )
+                ON CONFLICT (video_id, idx) DO NOTHING
+                """
+            )
+            return cursor.rowcount
+
+    @try_except_with_log()
+    def backfill_chapter_summaries(self) -> int:
+        """Split stored llm_chapter_json documents that have no chapter rows yet."""
+        with self._connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO standup_raw.chapter_summary (
+                    video_id, start_idx, end_idx, theme, summary
+                )
+                SELECT
+                    pv.video_id,
+                    ch.id,
+                    ch.end_id,
+                    coalesce(ch.theme, ''),
+                    coalesce(ch.summary, '')
+                FROM standup_raw.process_video AS pv
+                CROSS JOIN LATERAL jsonb_to_recordset(pv.llm_chapter_json -> 'chapters')
+                    AS ch (id INT, end_id INT, theme TEXT, summary TEXT)
+                WHERE pv.llm_chapter_json IS NOT NULL
+                  AND ch.id IS NOT NULL
+                  AND NOT EXISTS (
+                      SELECT 1
+                      FROM standup_raw.chapter_summary AS cs
+                      WHERE cs.video_id = pv.video_id
+                  )
+                ON CONFLICT (video_id, start_idx) DO NOTHING
+                """
+            )
+            return cursor.rowcount
 
     @try_except_with_log()
-    def create_videos(self, playlist_info: Iterable[ProcessVideo]) -> int:
-        videos = list(playlist_info)
+    def record_daily_metrics(
+        self, video_id: str, video_meta_json: dict[str, Any]
+    ) -> None:
+        """Upsert today's view/like/comment counts with deltas to the last snapshot."""
+        with self._connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT standup_raw.ensure_video_metrics_partition(current_date)"
+            )
+            cursor.execute(
+                """
+                INSERT INTO standup_raw.video_metrics_daily (
+                    video_id,
+                    snapshot_date,
+                    view_count,
+                    like_count,
+                    comment_count,
+                    view_delta,
+                    like_delta,
+                    comment_delta
+                )
+                SELECT
+                    %(video_id)s,
+                    current_date,
+                    %(view_count)s,
+                    %(like_count)s,
+                    %(comment_count)s,
+                    %(view_count)s - prev.view_count,
+                    %(like_count)s - prev.like_count,
+                    %(comment_count)s - prev.comment_count
+                FROM (SELECT 1) AS one
+                LEFT JOIN LATERAL (
+                    SELECT m.view_count, m.like_count, m.comment_count
+                    FROM standup_raw.video_metrics_daily AS m
+                    WHERE m.video_id = %(video_id)s AND m.snapshot_date < current_date
+                    ORDER BY m.snapshot_date DESC
+                    LIMIT 1
+                ) AS prev ON TRUE
+                ON CONFLICT (video_id, snapshot_date) DO UPDATE SET
+                    view_count = EXCLUDED.view_count,
+                    like_count = EXCLUDED.like_count,
+                    comment_count = EXCLUDED.comment_count,
+                    view_delta = EXCLUDED.view_delta,
+                    like_delta = EXCLUDED.like_delta,
+                    comment_delta = EXCLUDED.comment_delta,
+                    recorded_at = now()
+                """,
+                {
+                    "video_id": video_id,
+                    "view_count": video_meta_json.get("view_count"),
+                    "like_count": video_meta_json.get("like_count"),
+                    "comment_count": video_meta_json.get("comment_count"),
+                },
+            )
+
+    @try_except_with_log()
+    def backfill_daily_metrics(self) -> int:
+        """
+        Seed the history from the dbt snapshots and the stored metadata.
+
+        Before the pipeline recorded ``video_metrics_daily``, the daily
+        history lived only in ``standup_core.core_videos_meta``. Its missing
+        days are copied over, so a full refresh of the fact can rebuild the
+        past deltas. Videos with neither get their stored snapshot. Deltas of
+        the seeded videos are then recomputed over their whole history.
+        """
+        with self._connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT to_regclass('standup_core.core_videos_meta') IS NOT NULL"
+            )
+            legacy_history = (
+                """
+                SELECT video_id, snapshot_date, view_count, like_count, comment_count
+                FROM standup_core.core_videos_meta
+                UNION ALL
+                """
+                if cursor.fetchone()[0]
+                else ""
+            )
+            snapshots = f"""
+                {legacy_history}
+                SELECT
+                    pv.video_id,
+                    pv.meta_updated_at::DATE,
+                    (pv.video_meta_json ->> 'view_count')::BIGINT,
+                    (pv.video_meta_json ->> 'like_count')::BIGINT,
+                    (pv.video_meta_json ->> 'comment_count')::BIGINT
+                FROM standup_raw.process_video AS pv
+                WHERE pv.video_meta_json IS NOT NULL
+                  AND pv.meta_updated_at IS NOT NULL
+            """
+            cursor.execute(
+                f"""
+                CREATE TEMP TABLE metrics_backfill AS
+                SELECT DISTINCT ON (s.video_id, s.snapshot_date)
+                    s.video_id, s.snapshot_date, s.view_count, s.like_count,
+                    s.comment_count
+                FROM ({snapshots}) AS s (
+                    video_id, snapshot_date, view_count, like_count, comment_count
+                )
+                INNER JOIN standup_raw.process_video AS pv
+                    ON pv.video_id = s.video_id
+                WHERE NOT EXISTS (
+                    SELECT 1
+                    FROM standup_raw.video_metrics_daily AS m
+                    WHERE m.video_id = s.video_id
+                      AND m.snapshot_date = s.snapshot_date
+                )
+                """
+            )
+            cursor.execute(
+                """
+                SELECT standup_raw.ensure_video_metrics_partition(day)
+                FROM (SELECT DISTINCT snapshot_date AS day FROM metrics_backfill) AS d
+                """
+            )
+            cursor.execute(
+                """
+                INSERT INTO standup_raw.video_metrics_daily (
+                    video_id, snapshot_date, view_count, like_count, comment_count
+                )
+                SELECT video_id, snapshot_date, view_count, like_count, comment_count
+                FROM metrics_backfill
+                ON CONFLICT (video_id, snapshot_date) DO NOTHING
+                """
+            )
+            inserted = cursor.rowcount
+            if inserted:
+                cursor.execute(
+                    """
+                    UPDATE standup_raw.video_metrics_daily AS m
+                    SET view_delta = d.view_delta,
+                        like_delta = d.like_delta,
+                        comment_delta = d.comment_delta
+                    FROM (
+                        SELECT
+                            video_id,
+                            snapshot_date,
+                            view_count - lag(view_count) OVER w AS view_delta,
+                            like_count - lag(like_count) OVER w AS like_delta,
+                            comment_count - lag(comment_count) OVER w
+                                AS comment_delta
+                        FROM standup_raw.video_metrics_daily
+                        WHERE video_id IN (SELECT video_id FROM metrics_backfill)
+                        WINDOW w AS (PARTITION BY video_id ORDER BY snapshot_date)
+                    ) AS d
+                    WHERE m.video_id = d.video_id
+                      AND m.snapshot_date = d.snapshot_date
+                      AND (m.view_delta, m.like_delta, m.comment_delta)
+                          IS DISTINCT FROM (d.view_delta, d.like_delta, d.comment_delta)
+                    """
+                )
+            cursor.execute("DROP TABLE metrics_backfill")
+            return inserted
+
+    @try_except_with_log()
+    def create_videos(self, videos: Sequence[ProcessVideo]) -> int:
+        """Insert one batch of playlist entries, skipping known videos."""
         if not videos:
             return 0
 
@@ -92,21 +368,22 @@ class ProcessVideoRepository:
 
             logging.info(f"Number of new video - {len(unique_new_videos)}")
 
-            for video in unique_new_videos:
-                cursor.execute(
-                    """
-                    INSERT INTO standup_raw.process_video (
-                        channel_id,
-                        channel_name,
-                        playlist_id,
-                        playlist_title,
-                        video_id,
-                        video_title,
-                        video_url
-                    )
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (video_id) DO NOTHING
-                    """,
+            # executemany pipelines the batch into a single round-trip.
+            cursor.executemany(
+                """
+                INSERT INTO standup_raw.process_video (
+                    channel_id,
+                    channel_name,
+                    playlist_id,
+                    playlist_title,
+                    video_id,
+                    video_title,
+                    video_url
+                )
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (video_id) DO NOTHING
+                """,
+                [
                     (
                         video.channel_id,
                         video.channel_name,
@@ -115,10 +392,68 @@ class ProcessVideoRepository:
                         video.video_id,
                         video.video_title,
                         video.video_url,
-                    ),
-                )
+                    )
+                    for video in unique_new_videos
+                ],
+            )
         return len(unique_new_videos)
 
+    @try_except_with_log()
+    def get_playlist_videos(self, playlist_id: str) -> list[ProcessVideo]:
+        """Return the listing fields of a playlist's stored videos."""
+        query = """
+            SELECT
+                channel_id,
+                channel_name,
+                playlist_id,
+                playlist_title,
+                video_id,
+                video_title,
+                video_url
+            FROM standup_raw.process_video
+            WHERE playlist_id = %s
+            ORDER BY created_at, video_id
+        """
+        with self._connection.cursor() as cursor:
+            cursor.execute(query, (playlist_id,))
+            records = cursor.fetchall()
+            columns = [desc[0] for desc in cursor.description]
+        return [self._row_to_model(record, columns) for record in records]
+
+    @try_except_with_log()
+    def get_video_ids_needing_audio_file(self, video_ids: Sequence[str]) -> set[str]:
+        """Return the subset of video_ids whose pending stages need a local file."""
+        if not video_ids:
+            return set()
+        query = """
+            SELECT video_id
+            FROM standup_raw.process_video
+            WHERE video_id = ANY(%s)
+              AND sound_classifier_json IS NULL
+        """
+        with self._connection.cursor() as cursor:
+            cursor.execute(query, (list(video_ids),))
+            return {row[0] for row in cursor.fetchall()}
+
+    @try_except_with_log()
+    def order_by_priority(
+        self, video_ids: Sequence[str], settings: Settings
+    ) -> list[str]:
+        """Return video_ids by the cheapest stage they wait on, then by score."""
+        if not video_ids:
+            return []
+        query = f"""
+            SELECT video.video_id
+            FROM standup_raw.process_video AS video
+            WHERE video.video_id = ANY(%(video_ids)s)
+            ORDER BY {MISSING_STAGE_RANK_SQL}, {PRIORITY_SCORE_SQL} DESC
+        """
+        with self._connection.cursor() as cursor:
+            cursor.execute(
+                query, {"video_ids": list(video_ids), **priority_params(settings)}
+            )
+            return [row[0] for row in cursor.fetchall()]
+
     @try_except_with_log()
     def get_playlist_ids(self) -> list[ProcessVideo]:
         """Return all playlist_id from process_video table"""
@@ -133,3 +468,370 @@ class ProcessVideoRepository:
             )
 
         return [self._row_to_model(record, columns) for record in records]
+
+
+# Work needed by each stage, expressed over standup_raw.process_video.
+PIPELINE_STAGE_CONDITIONS = {
+    "metadata": """
+        video_url IS NOT NULL
+        AND (
+            video_meta_json IS NULL
+            OR meta_updated_at IS NULL
+            OR meta_updated_at::date < current_date
+        )
+    """,
+    "audio": """
+        video_url IS NOT NULL
+        AND (
+            transcribe_json IS NULL
+            OR sound_classifier_json IS NULL
+            OR laugh_events_json IS NULL
+        )
+    """,
+    "llm": """
+        transcribe_json IS NOT NULL
+        AND (llm_chapter_json IS NULL OR llm_classifier_json IS NULL)
+    """,
+}
+
+# Cheapest first: a metadata refresh takes seconds, a Gemini call about a
+# minute and the audio stage several minutes per show.
+PIPELINE_STAGE_ORDER = ["metadata", "llm", "audio"]
+
+# Cheapest stage a video in standup_raw.process_video still waits on. The
+# daily metadata refresh is routine, so it does not count as missing work.
+MISSING_STAGE_RANK_SQL = f"""
+    CASE
+        WHEN {PIPELINE_STAGE_CONDITIONS["llm"]} THEN 1
+        WHEN {PIPELINE_STAGE_CONDITIONS["audio"]} THEN 2
+        ELSE 0
+    END
+"""
+
+# Value of a standup_raw.process_video row aliased as ``video``. Metadata is
+# fetched after listing, so a video without an upload date is a new one and
+# counts as uploaded today.
+PRIORITY_SCORE_SQL = """
+    %(recency_weight)s * coalesce(
+        power(
+            0.5,
+            greatest(
+                current_date - to_date(
+                    nullif(video.video_meta_json->>'upload_date', ''), 'YYYYMMDD'
+                ),
+                0
+            ) / %(recency_half_life_days)s
+        ),
+        1.0
+    )
+    + %(views_weight)s
+        * log(1 + coalesce((video.video_meta_json->>'view_count')::float8, 0))
+    - %(cost_weight)s
+        * coalesce((video.video_meta_json->>'duration')::float8, 0) / 3600
+"""
+
+
+def priority_params(settings: Settings) -> dict[str, Any]:
+    """Query parameters for ``PRIORITY_SCORE_SQL``."""
+    return {
+        "stage_order": PIPELINE_STAGE_ORDER,
+        "recency_weight": settings.SCHEDULE_RECENCY_WEIGHT,
+        "recency_half_life_days": settings.SCHEDULE_RECENCY_HALF_LIFE_DAYS,
+        "views_weight": settings.SCHEDULE_VIEWS_WEIGHT,
+        "cost_weight": settings.SCHEDULE_COST_WEIGHT,
+    }
+
+
+# Session advisory lock taken by a queue worker around its dbt run.
+DBT_ADVISORY_LOCK_ID = 0x5354_4442  # "STDB"
+
+
+class PipelineTaskRepository:
+    """
+    Postgres-backed job queue over standup_raw.pipeline_task.
+
+    Tasks are leased with ``FOR UPDATE SKIP LOCKED`` so any number of worker
+    processes, on any number of hosts, can drain the queue without picking
+    the same row. A lease that is not renewed by heartbeats expires and the
+    task becomes available to other workers again.
+    """
+
+    def __init__(self, connection: psycopg.Connection) -> None:
+        self._connection = connection
+
+    @try_except_with_log()
+    def enqueue_pending(
+        self, stages: Sequence[str], *, video_id: str | None = None
+    ) -> int:
+        """Create (or reopen finished) tasks for videos that still need work."""
+        selects = [
+            f"SELECT video_id, '{stage}' AS stage FROM standup_raw.process_video"
+            f" WHERE {PIPELINE_STAGE_CONDITIONS[stage]}"
+            for stage in stages
+        ]
+        if not selects:
+            return 0
+        query = f"""
+            INSERT INTO standup_raw.pipeline_task (video_id, stage)
+            SELECT video_id, stage
+            FROM ({" UNION ALL ".join(selects)}) AS pending
+            WHERE %(video_id)s::text IS NULL OR video_id = %(video_id)s
+            ON CONFLICT (video_id, stage) DO UPDATE
+            SET status = 'pending',
+                attempts = 0,
+                worker_id = NULL,
+                lease_expires_at = NULL,
+                last_error = NULL,
+                updated_at = now()
+            WHERE standup_raw.pipeline_task.status = 'done'
+               OR (
+                   standup_raw.pipeline_task.status = 'failed'
+                   AND standup_raw.pipeline_task.updated_at::date < current_date
+               )
+        """
+        with self._connection.cursor() as cursor:
+            cursor.execute(query, {"video_id": video_id})
+            return cursor.rowcount
+
+    @try_except_with_log()
+    def lease(
+        self,
+        stages: Sequence[str],
+        worker_id: str,
+        lease_seconds: float,
+        *,
+        settings: Settings | None = None,
+    ) -> Optional[PipelineTask]:
+        """
+        Claim the next available task, including ones with expired leases.
+
+        With ``SCHEDULE_BY_PRIORITY`` the cheapest stage goes first, then the
+        video with the highest ``PRIORITY_SCORE_SQL``; otherwise the oldest.
+        """
+        resolved_settings = settings or get_settings()
+        order_by = "task.created_at, task.video_id"
+        if resolved_settings.SCHEDULE_BY_PRIORITY:
+            order_by = (
+                "array_position(%(stage_order)s::text[], task.stage),"
+                f" {PRIORITY_SCORE_SQL} DESC, {order_by}"
+            )
+        query = f"""
+            WITH next_task AS (
+                SELECT task.video_id, task.stage
+                FROM standup_raw.pipeline_task AS task
+                JOIN standup_raw.process_video AS video
+                  ON video.video_id = task.video_id
+                WHERE task.stage = ANY(%(stages)s)
+                  AND (
+                      task.status = 'pending'
+                      OR (task.status = 'leased' AND task.lease_expires_at < now())
+                  )
+                ORDER BY {order_by}
+                LIMIT 1
+                FOR UPDATE OF task SKIP LOCKED
+            )
+            UPDATE standup_raw.pipeline_task AS task
+            SET status = 'leased',
+                worker_id = %(worker_id)s,
+                attempts = task.attempts + 1,
+                lease_expires_at = now() + make_interval(secs => %(lease_seconds)s),
+                heartbeat_at = now(),
+                updated_at = now()
+            FROM next_task
+            WHERE task.video_id = next_task.video_id
+              AND task.stage = next_task.stage
+            RETURNING task.video_id, task.stage, task.attempts
+        """
+        with self._connection.cursor() as cursor:
+            cursor.execute(
+                query,
+                {
+                    "stages": list(stages),
+                    "worker_id": worker_id,
+                    "lease_seconds": lease_seconds,
+                    **priority_params(resolved_settings),
+                },
+            )
+            record = cursor.fetchone()
+            if record is None:
+                return None
+            columns = [desc[0] for desc in cursor.description]
+            return PipelineTask.model_validate(dict(zip(columns, record)))
+
+    @try_except_with_log()
+    def heartbeat(
+        self, task: PipelineTask, worker_id: str, lease_seconds: float
+    ) -> bool:
+        """Extend a lease; False means another worker has taken the task over."""
+        query = """
+            UPDATE standup_raw.pipeline_task
+            SET lease_expires_at = now() + make_interval(secs => %s),
+                heartbeat_at = now()
+            WHERE video_id = %s AND stage = %s
+              AND worker_id = %s AND status = 'leased'
+        """
+        with self._connection.cursor() as cursor:
+            cursor.execute(query, (lease_seconds, task.video_id, task.stage, worker_id))
+            return cursor.rowcount == 1
+
+    @try_except_with_log()
+    def complete(self, task: PipelineTask, worker_id: str) -> None:
+        query = """
+            UPDATE standup_raw.pipeline_task
+            SET status = 'done', lease_expires_at = NULL, updated_at = now()
+            WHERE video_id = %s AND stage = %s AND worker_id = %s
+        """
+        with self._connection.cursor() as cursor:
+            cursor.execute(query, (task.video_id, task.stage, worker_id))
+
+    @try_except_with_log()
+    def fail(
+        self,
+        task: PipelineTask,
+        worker_id: str,
+        error: str,
+        *,
+        max_attempts: int,
+    ) -> None:
+        """Requeue the task, or mark it failed once attempts are exhausted."""
+        query = """
+            UPDATE standup_raw.pipeline_task
+            SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+                lease_expires_at = NULL,
+                last_error = %s,
+                updated_at = now()
+            WHERE video_id = %s AND stage = %s AND worker_id = %s
+        """
+        with self._connection.cursor() as cursor:
+            cursor.execute(
+                query, (max_attempts, error, task.video_id, task.stage, worker_id)
+            )
+
+    @try_except_with_log()
+    def has_outstanding_tasks(self, stages: Sequence[str]) -> bool:
+        """
+        True while live leases remain, or pending tasks for ``stages``.
+
+        Pending tasks of other stages are ignored: a live worker that takes
+        them runs dbt itself, and with none they would block dbt forever.
+        """
+        query = """
+            SELECT EXISTS (
+                SELECT 1 FROM standup_raw.pipeline_task
+                WHERE (status = 'leased' AND lease_expires_at >= now())
+                   OR (status = 'pending' AND stage = ANY(%s))
+            )
+        """
+        with self._connection.cursor() as cursor:
+            cursor.execute(query, (list(stages),))
+            return bool(cursor.fetchone()[0])
+
+    @contextmanager
+    def dbt_lock(self) -> Iterator[None]:
+        """Hold the session lock that keeps workers from running dbt at once."""
+        with self._connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(%s)", (DBT_ADVISORY_LOCK_ID,))
+        self._connection.commit()
+        try:
+            yield
+        finally:
+            with self._connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", (DBT_ADVISORY_LOCK_ID,))
+            self._connection.commit()
+
+
+class PlaylistSyncRepository:
+    """Data access layer for the standup_raw.playlist_sync listing state."""
+
+    def __init__(self, connection: psycopg.Connection) -> None:
+        self._connection = connection
+
+    @try_except_with_log()
+    def get(self, playlist_id: str) -> Optional[PlaylistSync]:
+        with self._connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT * FROM standup_raw.playlist_sync WHERE playlist_id = %s",
+                (playlist_id,),
+            )
+            record = cursor.fetchone()
+            if record is None:
+                return None
+            columns = [desc[0] for desc in cursor.description]
+            return PlaylistSync.model_validate(dict(zip(columns, record)))
+
+    @try_except_with_log()
+    def record(
+        self, playlist_id: str, entry_count: int | None, *, full_listing: bool
+    ) -> None:
+        with self._connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO standup_raw.playlist_sync (
+                    playlist_id, entry_count, last_synced_at, last_full_sync_at
+                )
+                VALUES (%s, %s, now(), CASE WHEN %s THEN now() END)
+                ON CONFLICT (playlist_id) DO UPDATE SET
+                    entry_count = EXCLUDED.entry_count,
+                    last_synced_at = EXCLUDED.last_synced_at,
+                    last_full_sync_at = coalesce(
+                        EXCLUDED.last_full_sync_at,
+                        standup_raw.playlist_sync.last_full_sync_at
+                    )
+                """,
+                (playlist_id, entry_count, full_listing),
+            )
+
+
+class StageRunRepository:
+    """Data access layer for the standup_raw.stage_runs telemetry table."""
+
+    def __init__(self, connection: psycopg.Connection) -> None:
+        self._connection = connection
+
+    @try_except_with_log()
+    def insert_runs(
+        self,
+        pipeline_run_id: str,
+        worker_id: str | None,
+        runs: Sequence[StageRun],
+    ) -> int:
+        if not runs:
+            return 0
+        with self._connection.cursor() as cursor:
+            cursor.executemany(
+                """
+                INSERT INTO standup_raw.stage_runs (
+                    pipeline_run_id,
+                    worker_id,
+                    video_id,
+                    stage,
+                    status,
+                    started_at,
+                    wall_seconds,
+                    cpu_seconds,
+                    peak_rss_bytes,
+                    bytes_moved,
+                    audio_seconds,
+                    error
+                )
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                [
+                    (
+                        pipeline_run_id,
+                        worker_id,
+                        run.video_id,
+                        run.stage,
+                        run.status,
+                        run.started_at,
+                        run.wall_seconds,
+                        run.cpu_seconds,
+                        run.peak_rss_bytes,
+                        run.bytes_moved,
+                        run.audio_seconds,
+                        run.error,
+                    )
+                    for run in runs
+                ],
+            )
+        return len(runs)
@@ -1,62 +1,242 @@
+import copy
+import json
 import logging
-import re
-import subprocess
-import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Collection, Iterable
 
+from config import Settings, get_settings
+from telemetry import StageRun, get_telemetry
 
-def run_dbt_pipeline() -> None:
-    """Run the dbt pipeline and associated tests."""
-    command = ("uv", "run", "dbt", "run")
-
-    try:
-        result = subprocess.run(
-            command,
-            check=False,
-            capture_output=True,
-            text=True,
-        )
-    except Exception as exc:  # noqa: BLE001
-        logging.exception("Unexpected error when running dbt")
-        raise RuntimeError("Failed to invoke dbt run") from exc
-
-    if result.returncode != 0:
-        logging.error("DBT pipeline failed with return code %s", result.returncode)
-        if result.stdout:
-            logging.error("dbt stdout:\n%s", result.stdout)
-        if result.stderr:
-            logging.error("dbt stderr:\n%s", result.stderr)
-        raise RuntimeError("dbt run exited with a non-zero status")
+# Statuses dbt reports for nodes that did not succeed.
+FAILED_STATUSES = frozenset({"error", "fail", "runtime error"})
 
-    logging.info("DBT pipeline completed successfully")
 
-    test_command = ("uv", "run", "dbt", "test")
+def create_dbt_runner(manifest: Any | None = None) -> Any:
+    # Imported lazily: loading dbt adds seconds to every CLI start.
+    from dbt.cli.main import dbtRunner
+
+    return dbtRunner(manifest=manifest)
+
+
+def build_dbt_args(
+    dbt_command: str,
+    changed_video_ids: Collection[str] | None,
+    settings: Settings,
+) -> list[str]:
+    """
+    Build dbt CLI arguments, scoped to ``changed_video_ids`` when given.
+
+    Scoped runs select only models downstream of the raw source and pass the
+    ids as the ``changed_video_ids`` var, which the incremental models use to
+    read just those videos. ``None`` or too many ids fall back to a full run.
+    """
+    # --quiet keeps dbt's console output (previously captured from the
+    # subprocess) out of the pipeline log; errors are still printed.
+    args = [dbt_command, "--quiet", "--project-dir", str(settings.DBT_PROJECT_DIR)]
+    if (
+        changed_video_ids is None
+        or len(changed_video_ids) > settings.DBT_MAX_SCOPED_VIDEOS
+    ):
+        return args
+    dbt_vars = json.dumps({"changed_video_ids": sorted(changed_video_ids)})
+    return args + ["--select", settings.DBT_SOURCE_SELECTOR, "--vars", dbt_vars]
+
+
+@dataclass
+class DbtNodeResult:
+    name: str
+    resource_type: str
+    status: str
+    execution_time: float
+    message: str | None = None
+    started_at: datetime | None = None
+
+    @property
+    def failed(self) -> bool:
+        return self.status in FAILED_STATUSES
+
+
+@dataclass
+class DbtCommandResult:
+    command: str
+    success: bool
+    nodes: list[DbtNodeResult] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def failures(self) -> list[DbtNodeResult]:
+        return [node for node in self.nodes if node.failed]
+
+
+@dataclass
+class DbtPipelineResult:
+    run: DbtCommandResult
+    test: DbtCommandResult | None = None
+
+    @property
+    def success(self) -> bool:
+        return self.run.success and (self.test is None or self.test.success)
+
+
+def _node_result(result: Any) -> DbtNodeResult:
+    started_at = next(
+        (timing.started_at for timing in result.timing if timing.name == "execute"),
+        None,
+    )
+    if started_at is not None and started_at.tzinfo is None:
+        started_at = started_at.replace(tzinfo=timezone.utc)
+    return DbtNodeResult(
+        name=result.node.name,
+        resource_type=str(result.node.resource_type),
+        status=str(result.status),
+        execution_time=result.execution_time or 0.0,
+        message=result.message,
+        started_at=started_at,
+    )
+
 
-    try:
-        test_result = subprocess.run(
-            test_command,
-            check=False,
-            capture_output=True,
-            text=True,
+class DbtRunner:
+    """Invoke dbt in-process, parsing the project once per instance."""
+
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        *,
+        runner_factory: Callable[[Any | None], Any] = create_dbt_runner,
+    ) -> None:
+        self._settings = settings or get_settings()
+        self._runner_factory = runner_factory
+        self._manifest: Any | None = None
+
+    def _parsed_manifest(self) -> Any:
+        if self._manifest is None:
+            result = self._runner_factory(None).invoke(
+                build_dbt_args("parse", None, self._settings)
+            )
+            if not result.success:
+                raise RuntimeError("dbt parse failed") from result.exception
+            self._manifest = result.result
+        return self._manifest
+
+    def invoke(
+        self, dbt_command: str, changed_video_ids: Collection[str] | None = None
+    ) -> DbtCommandResult:
+        # dbt resolves constraint refs in place while compiling, so a manifest
+        # cannot be executed twice; each invocation gets its own copy.
+        manifest = copy.deepcopy(self._parsed_manifest())
+        args = build_dbt_args(dbt_command, changed_video_ids, self._settings)
+        result = self._runner_factory(manifest).invoke(args)
+        nodes = [_node_result(node) for node in getattr(result.result, "results", [])]
+        return DbtCommandResult(
+            command=dbt_command,
+            success=result.success,
+            nodes=nodes,
+            error=str(result.exception) if result.exception else None,
+        )
+
+
+def record_model_timings(result: DbtCommandResult) -> None:
+    """Log per-model timings and add them to the stage telemetry."""
+    telemetry = get_telemetry()
+    models = [node for node in result.nodes if node.resource_type == "model"]
+    for node in sorted(models, key=lambda node: node.execution_time, reverse=True):
+        logging.info("dbt %s %s in %.2fs", node.name, node.status, node.execution_time)
+        telemetry.record(
+            StageRun(
+                stage=f"dbt:{node.name}",
+                video_id=None,
+                started_at=node.started_at or datetime.now(timezone.utc),
+                wall_seconds=node.execution_time,
+                status="error" if node.failed else "ok",
+                error=node.message if node.failed else None,
+            )
         )
-    except Exception as exc:  # noqa: BLE001
-        logging.exception("Unexpected error when running dbt tests")
-        raise RuntimeError("Failed to invoke dbt test") from exc
 
-    if test_result.returncode == 0:
+
+def run_dbt_pipeline(
+    changed_video_ids: Collection[str] | None = None,
+    *,
+    settings: Settings | None = None,
+    runner: DbtRunner | None = None,
+) -> DbtPipelineResult:
+    """Run the dbt pipeline and associated tests."""
+    active_runner = runner or DbtRunner(settings=settings)
+    if changed_video_ids is not None:
+        logging.info("Running dbt for %s changed video(s)", len(changed_video_ids))
+
+    run_result = active_runner.invoke("run", changed_video_ids)
+    record_model_timings(run_result)
+    if not run_result.success:
+        for node in run_result.failures:
+            logging.error("dbt model %s failed: %s", node.name, node.message)
+        if run_result.error:
+            logging.error("dbt run error: %s", run_result.error)
+        raise RuntimeError("dbt run did not complete successfully")
+
+    logging.info("DBT pipeline completed successfully")
+
+    test_result = active_runner.invoke("test", changed_video_ids)
+    if test_result.success:
         logging.info("DBT tests completed successfully")
-        return
-
-    if test_result.stdout:
-        pattern = re.compile(r"(Failure in test.*?(?:\n\s*\n|$))", re.DOTALL)
-        error_blocks = pattern.findall(test_result.stdout)
-        if error_blocks:
-            for block in error_blocks:
-                for line in block.strip().splitlines():
-                    logging.error(line)
-        else:
-            logging.error("No failure blocks found in dbt test output")
-
-    if test_result.stderr:
-        logging.error("dbt test stderr:\n%s", test_result.stderr)
-
-    sys.exit(1)
+    else:
+        for node in test_result.failures:
+            logging.error("Failure in test %s: %s", node.name, node.message)
+        if test_result.error:
+            logging.error("dbt test error: %s", test_result.error)
+    return DbtPipelineResult(run=run_result, test=test_result)
+
+
+class DbtRunScheduler:
+    """
+    Debounce dbt: collect changed videos and run dbt once per invocation.
+
+    ``add`` triggers an early run when ``DBT_FLUSH_MAX_VIDEOS`` changes are
+    pending or the oldest pending change is ``DBT_FLUSH_MAX_SECONDS`` old, so
+    long backfills still refresh the marts; ``flush`` runs whatever is left.
+    """
+
+    def __init__(
+        self,
+        run_dbt: Callable[[Collection[str]], Any] = run_dbt_pipeline,
+        *,
+        settings: Settings | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        resolved_settings = settings or get_settings()
+        self._run_dbt = run_dbt
+        self._max_videos = resolved_settings.DBT_FLUSH_MAX_VIDEOS
+        self._max_seconds = resolved_settings.DBT_FLUSH_MAX_SECONDS
+        self._clock = clock
+        self._pending: set[str] = set()
+        self._first_change_at: float | None = None
+
+    @property
+    def pending(self) -> frozenset[str]:
+        return frozenset(self._pending)
+
+    def add(self, video_ids: Iterable[str]) -> None:
+        new_ids = set(video_ids) - self._pending
+        if not new_ids:
+            return
+        if self._first_change_at is None:
+            self._first_change_at = self._clock()
+        self._pending.update(new_ids)
+        if (
+            len(self._pending) >= self._max_videos
+            or self._clock() - self._first_change_at >= self._max_seconds
+        ):
+            self.flush()
+
+    def flush(self) -> Any | None:
+        if not self._pending:
+            return None
+        video_ids = sorted(self._pending)
+        with get_telemetry().stage("dbt"):
+            result = self._run_dbt(video_ids)
+        # Cleared only once dbt succeeded; a failed run keeps the ids pending
+        # so a later flush still rebuilds them.
+        self._pending.difference_update(video_ids)
+        self._first_change_at = None
+        return result
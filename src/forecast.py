@@ -0,0 +1,434 @@
+import statistics
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Any, Sequence
+
+import psycopg
+
+from config import Settings, get_settings
+from database import PIPELINE_STAGE_ORDER, get_db_connection
+from llm import CLASSIFIER_PROMPT_TEMPLATE, SUMMARY_PROMPT_TEMPLATE
+
+# Rough Gemini tokenizer ratio; only used to turn prompt length into a unit
+# the latency model is fitted on.
+CHARS_PER_TOKEN = 4.0
+
+# Shows without a duration in their metadata count as the median pending one,
+# or as this long when none has a duration yet.
+DEFAULT_SHOW_SECONDS = 3600.0
+
+# Recorded stage -> the queue stage (worker --stages) that runs it.
+STAGE_GROUPS = {
+    "metadata": "metadata",
+    "download": "audio",
+    "transcribe": "audio",
+    "sound_classify": "audio",
+    "laugh_events": "audio",
+    "llm_summary": "llm",
+    "llm_classify": "llm",
+}
+
+# What a stage's cost grows with.
+STAGE_UNITS = {
+    "metadata": "run",
+    "download": "audio_second",
+    "transcribe": "audio_second",
+    "sound_classify": "audio_second",
+    "laugh_events": "audio_second",
+    "llm_summary": "prompt_token",
+    "llm_classify": "prompt_token",
+}
+
+# Transcript and chapter text per second of audio, until runs are recorded.
+DEFAULT_TRANSCRIPT_CHARS_PER_SECOND = 14.0
+DEFAULT_CHAPTER_CHARS_PER_SECOND = 1.0
+
+# (fixed seconds, seconds per unit) for stages without recorded runs.
+DEFAULT_STAGE_COSTS = {
+    "metadata": (2.0, 0.0),
+    "download": (5.0, 0.01),
+    "transcribe": (5.0, 0.03),
+    "sound_classify": (2.0, 0.02),
+    "laugh_events": (0.5, 0.001),
+    "llm_summary": (20.0, 0.002),
+    "llm_classify": (10.0, 0.002),
+}
+
+TRANSCRIPT_CHARS_SQL = """
+    SELECT sum(length(ts.text)) AS chars
+    FROM standup_raw.transcript_segment AS ts
+    WHERE ts.video_id = {video_id}
+"""
+
+CHAPTER_CHARS_SQL = """
+    SELECT sum(length(cs.theme) + length(cs.summary)) AS chars
+    FROM standup_raw.chapter_summary AS cs
+    WHERE cs.video_id = {video_id}
+"""
+
+# One regression per stage: wall seconds against audio seconds, or against
+# prompt tokens rebuilt from the stored transcript and chapters.
+COST_MODEL_QUERY = f"""
+WITH runs AS (
+    SELECT
+        run.stage,
+        run.wall_seconds,
+        CASE run.stage
+            WHEN 'metadata' THEN NULL
+            WHEN 'llm_summary'
+                THEN transcript.chars / %(chars_per_token)s + %(summary_tokens)s
+            WHEN 'llm_classify'
+                THEN chapters.chars / %(chars_per_token)s + %(classifier_tokens)s
+            ELSE run.audio_seconds
+        END AS units
+    FROM standup_raw.stage_runs AS run
+    LEFT JOIN LATERAL ({TRANSCRIPT_CHARS_SQL.format(video_id="run.video_id")})
+        AS transcript ON run.stage = 'llm_summary'
+    LEFT JOIN LATERAL ({CHAPTER_CHARS_SQL.format(video_id="run.video_id")})
+        AS chapters ON run.stage = 'llm_classify'
+    WHERE run.status = 'ok'
+      AND run.stage = ANY(%(stages)s)
+      AND run.started_at >= now() - make_interval(days => %(history_days)s)
+)
+SELECT
+    stage,
+    count(*) AS runs,
+    count(units) AS samples,
+    avg(wall_seconds) AS avg_wall,
+    avg(units) AS avg_units,
+    regr_intercept(wall_seconds, units) AS intercept,
+    regr_slope(wall_seconds, units) AS slope
+FROM runs
+GROUP BY stage
+"""
+
+TEXT_RATE_QUERY = f"""
+WITH shows AS (
+    SELECT
+        (video.video_meta_json->>'duration')::float8 AS duration,
+        transcript.chars AS transcript_chars,
+        chapters.chars AS chapter_chars
+    FROM standup_raw.process_video AS video
+    LEFT JOIN LATERAL ({TRANSCRIPT_CHARS_SQL.format(video_id="video.video_id")})
+        AS transcript ON TRUE
+    LEFT JOIN LATERAL ({CHAPTER_CHARS_SQL.format(video_id="video.video_id")})
+        AS chapters ON TRUE
+    WHERE (video.video_meta_json->>'duration')::float8 > 0
+)
+SELECT
+    sum(transcript_chars)::float8
+        / nullif(sum(duration) FILTER (WHERE transcript_chars IS NOT NULL), 0),
+    sum(chapter_chars)::float8
+        / nullif(sum(duration) FILTER (WHERE chapter_chars IS NOT NULL), 0)
+FROM shows
+"""
+
+# Videos with missing artefacts; the daily metadata refresh of finished
+# videos is routine and not part of the backlog.
+PENDING_WORK_QUERY = f"""
+SELECT
+    video.video_id,
+    (video.video_meta_json->>'duration')::float8 AS duration,
+    video.video_meta_json IS NULL AS metadata,
+    video.transcribe_json IS NULL AS transcribe,
+    video.sound_classifier_json IS NULL AS sound_classify,
+    video.laugh_events_json IS NULL AS laugh_events,
+    video.llm_chapter_json IS NULL AS llm_summary,
+    video.llm_classifier_json IS NULL AS llm_classify,
+    transcript.chars AS transcript_chars,
+    chapters.chars AS chapter_chars
+FROM standup_raw.process_video AS video
+LEFT JOIN LATERAL ({TRANSCRIPT_CHARS_SQL.format(video_id="video.video_id")})
+    AS transcript ON TRUE
+LEFT JOIN LATERAL ({CHAPTER_CHARS_SQL.format(video_id="video.video_id")})
+    AS chapters ON TRUE
+WHERE video.video_url IS NOT NULL
+  AND (
+      video.video_meta_json IS NULL
+      OR video.transcribe_json IS NULL
+      OR video.sound_classifier_json IS NULL
+      OR video.laugh_events_json IS NULL
+      OR video.llm_chapter_json IS NULL
+      OR video.llm_classifier_json IS NULL
+  )
+"""
+
+
+@dataclass(frozen=True)
+class StageCostModel:
+    """Wall seconds of one stage run: fixed cost plus a rate per unit."""
+
+    stage: str
+    unit: str
+    fixed_seconds: float
+    seconds_per_unit: float
+    runs: int = 0  # recorded runs the model was fitted on; 0 means defaults
+
+    def predict(self, units: float) -> float:
+        return self.fixed_seconds + self.seconds_per_unit * units
+
+    def describe(self) -> str:
+        if self.unit == "run":
+            return f"{self.fixed_seconds:.1f} s/run"
+        if self.unit == "prompt_token":
+            rate = f"{self.seconds_per_unit * 1000:.2f} ms/token"
+        else:
+            rate = f"{self.seconds_per_unit:.3f} s/audio s"
+        return f"{self.fixed_seconds:.1f} s + {rate}"
+
+
+@dataclass(frozen=True)
+class TextRates:
+    """Characters of transcript and chapters per second of audio."""
+
+    transcript_chars_per_second: float = DEFAULT_TRANSCRIPT_CHARS_PER_SECOND
+    chapter_chars_per_second: float = DEFAULT_CHAPTER_CHARS_PER_SECOND
+
+
+@dataclass(frozen=True)
+class WorkerGroup:
+    """``count`` workers started with the same ``--stages``."""
+
+    stages: tuple[str, ...]
+    count: int = 1
+
+    @property
+    def label(self) -> str:
+        return f"{','.join(self.stages)}={self.count}"
+
+
+@dataclass
+class BacklogForecast:
+    videos: int = 0
+    audio_seconds: float = 0.0
+    videos_without_duration: int = 0
+    stage_videos: dict[str, int] = field(default_factory=dict)
+    stage_seconds: dict[str, float] = field(default_factory=dict)
+    longest_job_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    bottleneck: str = "-"
+
+
+def parse_worker_spec(spec: str) -> WorkerGroup:
+    """Parse ``STAGES[=COUNT]``, e.g. ``audio=2`` or ``metadata,llm``."""
+    stages_part, _, count_part = spec.partition("=")
+    stages = tuple(stage.strip() for stage in stages_part.split(",") if stage)
+    unknown = sorted(set(stages) - set(PIPELINE_STAGE_ORDER))
+    if unknown or not stages:
+        raise ValueError(f"Unknown pipeline stages in worker spec {spec!r}")
+    count = int(count_part) if count_part else 1
+    if count < 1:
+        raise ValueError(f"Worker count must be positive in {spec!r}")
+    return WorkerGroup(stages, count)
+
+
+def _fit_stage(
+    stage: str, record: dict[str, Any] | None, min_samples: int
+) -> StageCostModel:
+    unit = STAGE_UNITS[stage]
+    if not record or not record["runs"]:
+        fixed, rate = DEFAULT_STAGE_COSTS[stage]
+        return StageCostModel(stage, unit, fixed, rate)
+    runs = record["runs"]
+    if unit == "run" or not record["samples"]:
+        return StageCostModel(stage, unit, record["avg_wall"], 0.0, runs)
+    intercept, slope = record["intercept"], record["slope"]
+    if (
+        record["samples"] >= min_samples
+        and intercept is not None
+        and slope is not None
+        and intercept >= 0
+        and slope >= 0
+    ):
+        return StageCostModel(stage, unit, intercept, slope, runs)
+    # Too few runs, or runs of one length, for a line: use a plain ratio.
+    rate = record["avg_wall"] / record["avg_units"] if record["avg_units"] else 0.0
+    return StageCostModel(stage, unit, 0.0, rate, runs)
+
+
+def fit_cost_models(
+    connection: psycopg.Connection, settings: Settings
+) -> dict[str, StageCostModel]:
+    """Fit one cost model per stage from the recent ``stage_runs``."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            COST_MODEL_QUERY,
+            {
+                "stages": list(STAGE_GROUPS),
+                "history_days": settings.PLAN_HISTORY_DAYS,
+                "chars_per_token": CHARS_PER_TOKEN,
+                "summary_tokens": len(SUMMARY_PROMPT_TEMPLATE) / CHARS_PER_TOKEN,
+                "classifier_tokens": len(CLASSIFIER_PROMPT_TEMPLATE) / CHARS_PER_TOKEN,
+            },
+        )
+        columns = [desc[0] for desc in cursor.description]
+        records = {row[0]: dict(zip(columns, row)) for row in cursor.fetchall()}
+    return {
+        stage: _fit_stage(stage, records.get(stage), settings.PLAN_MIN_SAMPLES)
+        for stage in STAGE_GROUPS
+    }
+
+
+def fetch_text_rates(connection: psycopg.Connection) -> TextRates:
+    with connection.cursor() as cursor:
+        cursor.execute(TEXT_RATE_QUERY)
+        transcript_rate, chapter_rate = cursor.fetchone()
+    defaults = TextRates()
+    return TextRates(
+        transcript_rate or defaults.transcript_chars_per_second,
+        chapter_rate or defaults.chapter_chars_per_second,
+    )
+
+
+def fetch_pending_work(connection: psycopg.Connection) -> list[dict[str, Any]]:
+    with connection.cursor() as cursor:
+        cursor.execute(PENDING_WORK_QUERY)
+        columns = [desc[0] for desc in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _video_stage_seconds(
+    video: dict[str, Any],
+    duration: float,
+    models: dict[str, StageCostModel],
+    rates: TextRates,
+) -> dict[str, float]:
+    """Predicted wall seconds of every stage ``video`` still needs."""
+    needed = [stage for stage in STAGE_GROUPS if video.get(stage)]
+    if video["transcribe"] or video["sound_classify"]:
+        needed.append("download")
+    # Prompts of videos not transcribed or summarised yet are sized from
+    # the text other shows produced per second of audio.
+    transcript_chars = (
+        video["transcript_chars"] or duration * rates.transcript_chars_per_second
+    )
+    chapter_chars = video["chapter_chars"] or duration * rates.chapter_chars_per_second
+    prompt_tokens = {
+        "llm_summary": (len(SUMMARY_PROMPT_TEMPLATE) + transcript_chars)
+        / CHARS_PER_TOKEN,
+        "llm_classify": (len(CLASSIFIER_PROMPT_TEMPLATE) + chapter_chars)
+        / CHARS_PER_TOKEN,
+    }
+    units = {"run": 1.0, "audio_second": duration}
+    return {
+        stage: models[stage].predict(
+            prompt_tokens.get(stage, units.get(STAGE_UNITS[stage], 0.0))
+        )
+        for stage in needed
+    }
+
+
+def estimate_wall_seconds(
+    group_seconds: dict[str, float], workers: Sequence[WorkerGroup]
+) -> tuple[float, tuple[str, ...]]:
+    """
+    Lower bound on the time ``workers`` need for ``group_seconds`` of work.
+
+    Any set of queue stages can only be drained by the workers that take at
+    least one of them, so the slowest such set bounds the whole backlog.
+    Returns the bound and that set; an uncovered stage makes it infinite.
+    """
+    groups = [group for group, seconds in group_seconds.items() if seconds > 0]
+    wall_seconds, bottleneck = 0.0, ()
+    for size in range(1, len(groups) + 1):
+        for subset in combinations(groups, size):
+            workers_taking = sum(
+                worker.count
+                for worker in workers
+                if any(stage in worker.stages for stage in subset)
+            )
+            work = sum(group_seconds[group] for group in subset)
+            seconds = work / workers_taking if workers_taking else float("inf")
+            if seconds > wall_seconds:
+                wall_seconds, bottleneck = seconds, subset
+    return wall_seconds, bottleneck
+
+
+def forecast_backlog(
+    pending: Sequence[dict[str, Any]],
+    models: dict[str, StageCostModel],
+    rates: TextRates,
+    workers: Sequence[WorkerGroup],
+) -> BacklogForecast:
+    """Add up the predicted work of ``pending`` and bound its wall time."""
+    durations = [video["duration"] for video in pending if video["duration"]]
+    default_duration = statistics.median(durations) if durations else None
+    forecast = BacklogForecast(videos=len(pending))
+    for video in pending:
+        duration = video["duration"]
+        if not duration:
+            forecast.videos_without_duration += 1
+            duration = default_duration or DEFAULT_SHOW_SECONDS
+        forecast.audio_seconds += duration
+        job_seconds: dict[str, float] = {}
+        for stage, seconds in _video_stage_seconds(
+            video, duration, models, rates
+        ).items():
+            forecast.stage_videos[stage] = forecast.stage_videos.get(stage, 0) + 1
+            forecast.stage_seconds[stage] = (
+                forecast.stage_seconds.get(stage, 0.0) + seconds
+            )
+            group = STAGE_GROUPS[stage]
+            job_seconds[group] = job_seconds.get(group, 0.0) + seconds
+        # One task is never split across workers.
+        forecast.longest_job_seconds = max(
+            forecast.longest_job_seconds, *job_seconds.values(), 0.0
+        )
+
+    group_seconds: dict[str, float] = {}
+    for stage, seconds in forecast.stage_seconds.items():
+        group = STAGE_GROUPS[stage]
+        group_seconds[group] = group_seconds.get(group, 0.0) + seconds
+    wall_seconds, bottleneck = estimate_wall_seconds(group_seconds, workers)
+    forecast.wall_seconds, forecast.bottleneck = wall_seconds, ", ".join(bottleneck)
+    if forecast.longest_job_seconds > wall_seconds:
+        forecast.wall_seconds = forecast.longest_job_seconds
+        forecast.bottleneck = "longest single task"
+    return forecast
+
+
+def _hours(seconds: float) -> str:
+    return f"{seconds / 3600:.2f} h"
+
+
+def format_plan(
+    forecast: BacklogForecast,
+    models: dict[str, StageCostModel],
+    workers: Sequence[WorkerGroup],
+) -> str:
+    lines = [
+        f"Backlog: {forecast.videos} video(s), {_hours(forecast.audio_seconds)}"
+        f" of audio ({forecast.videos_without_duration} without a duration)",
+        f"{'stage':<15}{'videos':>7}  {'cost model':<30}{'fitted on':>11}{'work':>10}",
+    ]
+    for stage, model in models.items():
+        source = f"{model.runs} runs" if model.runs else "defaults"
+        lines.append(
+            f"{stage:<15}{forecast.stage_videos.get(stage, 0):>7}  "
+            f"{model.describe():<30}{source:>11}"
+            f"{_hours(forecast.stage_seconds.get(stage, 0.0)):>10}"
+        )
+    lines.append(f"Workers: {' '.join(worker.label for worker in workers)}")
+    if forecast.wall_seconds == float("inf"):
+        lines.append(f"No worker takes: {forecast.bottleneck}")
+    else:
+        lines.append(
+            f"Estimated wall time: {_hours(forecast.wall_seconds)}"
+            f" (bottleneck: {forecast.bottleneck or '-'})"
+        )
+    return "\n".join(lines)
+
+
+def run_plan(worker_specs: Sequence[str]) -> None:
+    """Print the forecast for the pending backlog; nothing is processed."""
+    workers = [parse_worker_spec(spec) for spec in worker_specs]
+    settings = get_settings()
+    connection = get_db_connection(settings=settings)
+    try:
+        models = fit_cost_models(connection, settings)
+        rates = fetch_text_rates(connection)
+        pending = fetch_pending_work(connection)
+    finally:
+        connection.close()
+    forecast = forecast_backlog(pending, models, rates, workers)
+    print(format_plan(forecast, models, workers))
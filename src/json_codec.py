@@ -0,0 +1,47 @@
+from typing import Any
+
+import orjson
+import psycopg
+from psycopg.adapt import Dumper
+from psycopg.pq import Format
+from psycopg.types.json import set_json_dumps, set_json_loads
+
+# Subclass of json.JSONDecodeError, so existing handlers keep working.
+JSONDecodeError = orjson.JSONDecodeError
+
+# Stdlib json writes int keys as strings and numpy scalars as plain numbers.
+DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Version byte that prefixes a jsonb value in the binary protocol.
+JSONB_BINARY_VERSION = b"\x01"
+
+
+def dumps(value: Any) -> bytes:
+    return orjson.dumps(value, option=DUMPS_OPTIONS)
+
+
+def loads(document: str | bytes) -> Any:
+    return orjson.loads(document)
+
+
+class EncodedJsonb(bytes):
+    """A JSON document already serialised with ``dumps``, sent as jsonb."""
+
+    @classmethod
+    def encode(cls, value: Any) -> "EncodedJsonb":
+        return cls(dumps(value))
+
+
+class EncodedJsonbBinaryDumper(Dumper):
+    format = Format.BINARY
+    oid = psycopg.adapters.types["jsonb"].oid
+
+    def dump(self, obj: EncodedJsonb) -> bytes:
+        return JSONB_BINARY_VERSION + obj
+
+
+def register_json_codec(connection: psycopg.Connection) -> None:
+    """Use orjson for jsonb columns on ``connection``, in both directions."""
+    set_json_dumps(dumps, connection)
+    set_json_loads(loads, connection)
+    connection.adapters.register_dumper(EncodedJsonb, EncodedJsonbBinaryDumper)
@@ -1,8 +1,14 @@
-import json
+import logging
 import subprocess
-from typing import Any, Callable, Dict, Sequence
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Sequence
 
+from pydantic import BaseModel, ValidationError
+
+import json_codec
 from config import get_settings
+from models import LLMChapters, LLMClassifications
 from utils import try_except_with_log
 
 SUMMARY_PROMPT_TEMPLATE = """
@@ -187,6 +193,138 @@ def clean_json_output(llm_output: str) -> str:
     return llm_output.strip()
 
 
+SMART_DOUBLE_QUOTES = frozenset("\u201c\u201d\u201e\u201f\u00ab\u00bb")
+BRACKET_PAIRS = {"{": "}", "[": "]"}
+
+
+def _strip_dangling(chars: list[str]) -> None:
+    """Drop trailing whitespace, commas, and dangling keys before a closer."""
+    while chars and (chars[-1].isspace() or chars[-1] == ","):
+        chars.pop()
+    if chars and chars[-1] == ":":
+        chars.pop()
+        while chars and chars[-1].isspace():
+            chars.pop()
+        # Remove the orphaned key string left before the colon.
+        if chars and chars[-1] == '"':
+            chars.pop()
+            while chars and not (chars[-1] == '"' and chars[-2:-1] != ["\\"]):
+                chars.pop()
+            if chars:
+                chars.pop()
+        while chars and (chars[-1].isspace() or chars[-1] == ","):
+            chars.pop()
+
+
+@dataclass(frozen=True)
+class JsonRepair:
+    document: str
+    truncated: bool = False  # the response ended inside an open container
+    mismatched: int = 0  # closers skipped because another container was open
+    dropped: str = ""  # trailing text cut away to close the document
+
+    @property
+    def lossy(self) -> bool:
+        """True when the repaired document may be missing content."""
+        return self.truncated or bool(self.dropped)
+
+
+def iter_json_repairs(llm_output: str) -> Iterator[JsonRepair]:
+    """
+    Yield candidate repairs of a malformed JSON document, most faithful first.
+
+    A single pass normalises smart quotes used as string delimiters, escapes
+    raw newlines inside strings, drops trailing commas and stray closers, and
+    tracks unbalanced brackets. When containers are left open the first
+    candidate closes them; later candidates cut back to the most recent fully
+    closed container so that a broken final object is discarded rather than
+    half-parsed, recording what was ``dropped``. A response that stops inside
+    an open container is ``truncated``; one that ends on a closer of the
+    wrong kind only has ``mismatched`` brackets.
+    """
+    openers = (llm_output.find("{"), llm_output.find("["))
+    start = min((index for index in openers if index >= 0), default=-1)
+    if start < 0:
+        return
+
+    chars: list[str] = []
+    stack: list[str] = []
+    checkpoints: list[tuple[int, tuple[str, ...]]] = []
+    in_string = False
+    smart_string = False
+    escaped = False
+    mismatched = 0
+    ended_on_mismatch = False
+
+    for ch in llm_output[start:]:
+        if in_string:
+            if escaped:
+                escaped = False
+                chars.append(ch)
+            elif ch == "\\":
+                escaped = True
+                chars.append(ch)
+            elif ch == '"' or (smart_string and ch in SMART_DOUBLE_QUOTES):
+                in_string = False
+                chars.append('"')
+            elif ch == "\n":
+                chars.append("\\n")
+            elif ch == "\t":
+                chars.append("\\t")
+            else:
+                chars.append(ch)
+            continue
+
+        if not ch.isspace():
+            ended_on_mismatch = False
+        if ch == '"' or ch in SMART_DOUBLE_QUOTES:
+            in_string = True
+            smart_string = ch != '"'
+            chars.append('"')
+        elif ch in BRACKET_PAIRS:
+            stack.append(BRACKET_PAIRS[ch])
+            chars.append(ch)
+        elif ch in "}]":
+            if not stack or stack[-1] != ch:
+                mismatched += 1
+                ended_on_mismatch = True
+                continue
+            _strip_dangling(chars)
+            chars.append(stack.pop())
+            checkpoints.append((len(chars), tuple(stack)))
+            if not stack:
+                break
+        else:
+            chars.append(ch)
+
+    if not stack:
+        yield JsonRepair("".join(chars), mismatched=mismatched)
+        return
+
+    truncated = in_string or not ended_on_mismatch
+    tail = list(chars)
+    if in_string:
+        if escaped:
+            tail.pop()
+        tail.append('"')
+    _strip_dangling(tail)
+    yield JsonRepair(
+        "".join(tail) + "".join(reversed(stack)),
+        truncated=truncated,
+        mismatched=mismatched,
+    )
+
+    for length, open_closers in reversed(checkpoints[-3:]):
+        kept = chars[:length]
+        _strip_dangling(kept)
+        yield JsonRepair(
+            "".join(kept) + "".join(reversed(open_closers)),
+            truncated=truncated,
+            mismatched=mismatched,
+            dropped="".join(chars[length:]).strip(" \n\t,"),
+        )
+
+
 class GeminiClient:
     """Lightweight wrapper around the Gemini CLI for easier testing."""
 
@@ -205,14 +343,79 @@ class GeminiClient:
         self._model = model or settings.GEMINI_MODEL
         self._max_attempts = max_attempts
         self._command_builder = command_builder or self._default_command_builder
+        self.response_stats: Counter[str] = Counter()
 
     def _default_command_builder(self, prompt: str, model: str) -> Sequence[str]:
         return ["gemini", "-p", prompt, "-m", model]
 
+    def _validate(
+        self, document: str, response_model: type[BaseModel] | None
+    ) -> Dict[str, Any]:
+        payload = json_codec.loads(document)
+        if response_model is None:
+            return payload
+        return response_model.model_validate(payload).model_dump()
+
+    def _parse_output(
+        self,
+        llm_output: str,
+        response_model: type[BaseModel] | None,
+        *,
+        accept_lossy: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Parse the response, falling back to local repair before giving up.
+
+        A repair that may be missing content (a truncated response, or text
+        dropped to close the document) is only accepted when no re-prompt is
+        left.
+        """
+        try:
+            payload = self._validate(llm_output, response_model)
+        except (json_codec.JSONDecodeError, ValidationError) as exc:
+            for repair in iter_json_repairs(llm_output):
+                try:
+                    payload = self._validate(repair.document, response_model)
+                except (json_codec.JSONDecodeError, ValidationError):
+                    continue
+                problem = (
+                    "was cut off"
+                    if repair.truncated
+                    else f"had {repair.mismatched} mismatched closing bracket(s)"
+                )
+                if repair.lossy:
+                    if repair.dropped:
+                        logging.warning(
+                            "Gemini response %s; repair dropped: %r",
+                            problem,
+                            repair.dropped[:200],
+                        )
+                    else:
+                        logging.warning("Gemini response %s", problem)
+                    if not accept_lossy:
+                        raise exc
+                    self.response_stats[
+                        "truncated" if repair.truncated else "mismatched"
+                    ] += 1
+                    return payload
+                self.response_stats["repaired"] += 1
+                logging.info("Repaired malformed Gemini JSON locally")
+                if repair.mismatched:
+                    logging.info("Gemini response %s", problem)
+                return payload
+            raise exc
+        self.response_stats["parsed"] += 1
+        return payload
+
     @try_except_with_log()
-    def request(self, prompt: str) -> Dict[str, Any] | None:
+    def request(
+        self,
+        prompt: str,
+        *,
+        response_model: type[BaseModel] | None = None,
+    ) -> Dict[str, Any] | None:
         current_prompt = prompt
-        for _ in range(self._max_attempts):
+        for attempt in range(1, self._max_attempts + 1):
             result = self._run_command(
                 self._command_builder(current_prompt, self._model)
             )
@@ -224,14 +427,22 @@ class GeminiClient:
 
             llm_output = clean_json_output(result.stdout)
             try:
-                return json.loads(llm_output)
-            except json.JSONDecodeError as exc:
+                return self._parse_output(
+                    llm_output,
+                    response_model,
+                    accept_lossy=attempt == self._max_attempts,
+                )
+            except (json_codec.JSONDecodeError, ValidationError) as exc:
+                if attempt == self._max_attempts:
+                    break
+                self.response_stats["reprompted"] += 1
                 current_prompt = (
                     prompt
                     + "Your previous response had a JSON formatting error: "
                     + f"{exc}.\n Here is the invalid response you provided:\n\n {llm_output} "
                     + "\n\n Please correct the JSON and provide the full, valid JSON object."
                 )
+        self.response_stats["failed"] += 1
         return None
 
 
@@ -261,7 +472,9 @@ def request_llm_summary(
     client: GeminiClient | None = None,
 ) -> Dict[str, Any] | None:
     active_client = client or GeminiClient()
-    response = active_client.request(build_summary_prompt(transcribe_json))
+    response = active_client.request(
+        build_summary_prompt(transcribe_json), response_model=LLMChapters
+    )
     if response is None:
         return None
 
@@ -279,5 +492,7 @@ def request_llm_classification(
     client: GeminiClient | None = None,
 ) -> Dict[str, Any] | None:
     active_client = client or GeminiClient()
-    response = active_client.request(build_classifier_prompt(llm_chapter_json))
+    response = active_client.request(
+        build_classifier_prompt(llm_chapter_json), response_model=LLMClassifications
+    )
     return response
@@ -4,6 +4,8 @@ import logging
 from pydantic import ValidationError
 
 from data_pipeliine import run_pipeline
+from forecast import run_plan
+from worker import PIPELINE_STAGES, run_worker
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -23,6 +25,35 @@ def parse_args() -> argparse.Namespace:
         dest="new_playlist",
         help="URL of the new playlist to ingest",
     )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Drain the shared task queue instead of walking playlists",
+    )
+    parser.add_argument(
+        "--stages",
+        default=",".join(PIPELINE_STAGES),
+        help="Comma-separated stages this worker takes (metadata,audio,llm)",
+    )
+    parser.add_argument(
+        "--worker_id",
+        dest="worker_id",
+        help="Identifier recorded on leased tasks (defaults to host:pid)",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Estimate how long the pending backlog takes without processing it",
+    )
+    parser.add_argument(
+        "--workers",
+        nargs="+",
+        metavar="STAGES=COUNT",
+        help=(
+            "Worker configuration for --plan, e.g. 'audio=2 metadata,llm=1'"
+            " (defaults to one worker taking --stages)"
+        ),
+    )
     return parser.parse_args()
 
 
@@ -30,7 +61,13 @@ def main() -> None:
     """Main entry point for the video processing pipeline."""
     args = parse_args()
     try:
-        run_pipeline(args.new_playlist)
+        if args.plan:
+            run_plan(args.workers or [f"{args.stages}=1"])
+        elif args.worker:
+            stages = [stage.strip() for stage in args.stages.split(",") if stage]
+            run_worker(stages, worker_id=args.worker_id)
+        else:
+            run_pipeline(args.new_playlist)
     except ValidationError as exc:
         logging.error("URL validation error: %s", exc)
     except KeyboardInterrupt:
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any
+from typing import Any, Mapping
 
 from pydantic import BaseModel, Field
 
@@ -23,3 +23,48 @@ class ProcessVideo(BaseModel):
     audio_path: str | None = None
     process_status: str | None = None
     meta_updated_at: datetime | None = None
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> "ProcessVideo":
+        """
+        Build from a trusted database row without validation.
+
+        psycopg already returns typed values, and re-validating the JSONB
+        columns walks every transcript segment and classifier window.
+        Unknown columns are ignored.
+        """
+        return cls.model_construct(**row)
+
+
+class LLMChapter(BaseModel):
+    id: int
+    theme: str
+    summary: str
+
+
+class LLMChapters(BaseModel):
+    chapters: list[LLMChapter]
+
+
+class LLMClassification(BaseModel):
+    id: int
+    main_category: str
+    subcategory: str
+    reason: str
+
+
+class LLMClassifications(BaseModel):
+    classifications: list[LLMClassification]
+
+
+class PlaylistSync(BaseModel):
+    playlist_id: str
+    entry_count: int | None = None
+    last_synced_at: datetime
+    last_full_sync_at: datetime | None = None
+
+
+class PipelineTask(BaseModel):
+    video_id: str
+    stage: str
+    attempts: int = 0
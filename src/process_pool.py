@@ -0,0 +1,205 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Iterator
+
+import numpy as np
+
+from config import Settings, get_settings
+from telemetry import (
+    RssSampler,
+    WorkerUsage,
+    current_rss_bytes,
+    process_cpu_seconds,
+    record_worker_usage,
+)
+
+RSS_CHECK_SECONDS = 1.0
+WORKER_EXIT_TIMEOUT_SECONDS = 5.0
+
+
+class StageWorkerError(RuntimeError):
+    """A stage worker process exited before returning its result."""
+
+
+@dataclass(frozen=True)
+class SharedArray:
+    """Handle to a NumPy array placed in shared memory for a worker."""
+
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+@contextmanager
+def share_array(array: np.ndarray) -> Iterator[SharedArray]:
+    """Copy ``array`` into shared memory for the duration of the block."""
+    memory = SharedMemory(create=True, size=max(array.nbytes, 1))
+    try:
+        np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)[...] = array
+        yield SharedArray(memory.name, array.shape, array.dtype.str)
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+@contextmanager
+def attach_array(shared: SharedArray) -> Iterator[np.ndarray]:
+    """
+    Map a shared array without copying it.
+
+    The view must not outlive the block: drop every reference to it before
+    leaving, or closing the mapping fails.
+    """
+    memory = SharedMemory(name=shared.name)
+    try:
+        yield np.ndarray(shared.shape, dtype=np.dtype(shared.dtype), buffer=memory.buf)
+    finally:
+        memory.close()
+
+
+# Set while a worker runs a job; the watchdog leaves idle workers alone, so
+# a spike that has been freed never breaks the pool between jobs.
+_job_running = threading.Event()
+_jobs_run = 0
+_max_jobs = 0
+
+
+def _run_job(
+    func: Callable[..., Any], args: tuple, kwargs: dict
+) -> tuple[Any, WorkerUsage, int | None]:
+    """Run a job, measure what it cost, and return the pid if the worker retires."""
+    global _jobs_run
+    _jobs_run += 1
+    _job_running.set()
+    cpu_started = process_cpu_seconds()
+    rss_sampler = RssSampler()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        usage = WorkerUsage(process_cpu_seconds() - cpu_started, rss_sampler.stop())
+        _job_running.clear()
+    retiring = _max_jobs and _jobs_run >= _max_jobs
+    return result, usage, os.getpid() if retiring else None
+
+
+def _watch_rss(max_rss_bytes: int) -> None:
+    while True:
+        time.sleep(RSS_CHECK_SECONDS)
+        rss = current_rss_bytes()
+        if rss is None or rss <= max_rss_bytes or not _job_running.is_set():
+            continue
+        logging.error(
+            "Stage worker %s reached %.0f MiB RSS; exiting",
+            os.getpid(),
+            rss / 2**20,
+        )
+        # The parent fails this job and replaces the worker.
+        os._exit(1)
+
+
+def _init_worker(max_rss_bytes: int, max_jobs: int, log_level: int) -> None:
+    global _max_jobs
+    _max_jobs = max_jobs
+    logging.basicConfig(
+        level=log_level, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    if max_rss_bytes and current_rss_bytes() is not None:
+        threading.Thread(
+            target=_watch_rss, args=(max_rss_bytes,), name="rss-watchdog", daemon=True
+        ).start()
+
+
+def _wait_for_exit(pid: int) -> None:
+    """
+    Reap a recycled worker while the stage that used it is still timed.
+
+    Its usage already came back with the job; reaped later, it would show up
+    again in the children counters of whatever stage runs next.
+    """
+    deadline = time.monotonic() + WORKER_EXIT_TIMEOUT_SECONDS
+    # active_children() also reaps the workers that have exited.
+    while any(child.pid == pid for child in multiprocessing.active_children()):
+        if time.monotonic() > deadline:
+            logging.warning("Stage worker %s did not exit after its last job", pid)
+            return
+        time.sleep(0.05)
+
+
+class StagePool:
+    """
+    Run CPU-heavy stage functions in worker processes.
+
+    Workers are replaced after ``STAGE_POOL_MAX_JOBS_PER_WORKER`` jobs, and
+    a worker whose current RSS passes ``STAGE_POOL_MAX_RSS_MB`` during a job
+    exits. A worker that dies fails only its job with ``StageWorkerError``;
+    a pool broken between jobs is rebuilt before the next job is submitted.
+    """
+
+    def __init__(self, settings: Settings | None = None) -> None:
+        self._settings = settings or get_settings()
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._settings.STAGE_POOL_WORKERS,
+                # Workers load MLX and NumPy themselves; forking them is unsafe.
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(
+                    self._settings.STAGE_POOL_MAX_RSS_MB * 2**20,
+                    self._settings.STAGE_POOL_MAX_JOBS_PER_WORKER,
+                    logging.getLogger().level,
+                ),
+                max_tasks_per_child=self._settings.STAGE_POOL_MAX_JOBS_PER_WORKER,
+            )
+        return self._executor
+
+    def _submit(self, func: Callable[..., Any], args: tuple, kwargs: dict) -> Future:
+        try:
+            return self._get_executor().submit(_run_job, func, args, kwargs)
+        except BrokenProcessPool:
+            # A worker died between jobs, so this one never started: retry
+            # once on a fresh pool.
+            self.close()
+            return self._get_executor().submit(_run_job, func, args, kwargs)
+
+    def run(self, func: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Any:
+        """Run ``func`` in a worker and wait for its result."""
+        try:
+            result, usage, retiring_pid = self._submit(func, args, kwargs).result()
+        except BrokenProcessPool as exc:
+            self.close()
+            raise StageWorkerError(
+                f"Stage worker running {func.__name__} exited (memory limit or crash)"
+            ) from exc
+        record_worker_usage(usage)
+        if retiring_pid is not None:
+            _wait_for_exit(retiring_pid)
+        return result
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self) -> "StagePool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def create_stage_pool(settings: Settings) -> StagePool | None:
+    """Return a pool, or None when stages should run in this process."""
+    if settings.STAGE_POOL_WORKERS <= 0:
+        return None
+    return StagePool(settings)
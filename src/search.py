@@ -0,0 +1,152 @@
+import argparse
+import logging
+from dataclasses import dataclass
+from typing import Sequence
+
+import psycopg
+
+from config import get_settings
+from database import get_db_connection
+
+# Must match the generated tsvector columns in initdb/init_schema.sql.
+TRANSCRIPT_TS_CONFIG = "russian"
+CHAPTER_TS_CONFIG = "english"
+
+SNIPPET_CHARS = 80
+
+# Each branch is ranked and cut to ``limit`` on its GIN index before the
+# results are joined to titles and chapters, so common words stay cheap.
+SEARCH_QUERY = """
+WITH transcript_hits AS (
+    SELECT
+        'transcript' AS source,
+        ts.video_id,
+        ts.idx,
+        ts.start_s,
+        ts.text,
+        ts_rank(ts.text_tsv, query) AS rank
+    FROM standup_raw.transcript_segment AS ts
+    CROSS JOIN websearch_to_tsquery(%(transcript_config)s::REGCONFIG, %(query)s) AS query
+    WHERE ts.text_tsv @@ query
+    ORDER BY rank DESC
+    LIMIT %(limit)s
+),
+
+chapter_hits AS (
+    SELECT
+        'chapter' AS source,
+        cs.video_id,
+        cs.start_idx AS idx,
+        ts.start_s,
+        cs.summary AS text,
+        ts_rank(cs.search_tsv, query) AS rank
+    FROM standup_raw.chapter_summary AS cs
+    CROSS JOIN websearch_to_tsquery(%(chapter_config)s::REGCONFIG, %(query)s) AS query
+    LEFT JOIN standup_raw.transcript_segment AS ts
+        ON ts.video_id = cs.video_id AND ts.idx = cs.start_idx
+    WHERE cs.search_tsv @@ query
+    ORDER BY rank DESC
+    LIMIT %(limit)s
+),
+
+hits AS (
+    SELECT * FROM transcript_hits
+    UNION ALL
+    SELECT * FROM chapter_hits
+)
+
+SELECT
+    hits.source,
+    hits.video_id,
+    pv.video_title,
+    hits.start_s,
+    chapter.theme,
+    hits.text,
+    hits.rank
+FROM hits
+INNER JOIN standup_raw.process_video AS pv ON pv.video_id = hits.video_id
+LEFT JOIN LATERAL (
+    SELECT cs.theme
+    FROM standup_raw.chapter_summary AS cs
+    WHERE cs.video_id = hits.video_id AND cs.start_idx <= hits.idx
+    ORDER BY cs.start_idx DESC
+    LIMIT 1
+) AS chapter ON TRUE
+ORDER BY hits.rank DESC, hits.video_id, hits.start_s
+LIMIT %(limit)s
+"""
+
+
+@dataclass
+class SearchHit:
+    source: str
+    video_id: str
+    video_title: str | None
+    start_s: float | None
+    chapter: str | None
+    text: str
+    rank: float
+
+    @property
+    def timestamp(self) -> str:
+        if self.start_s is None:
+            return "--:--:--"
+        minutes, seconds = divmod(int(self.start_s), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def search_catalog(
+    connection: psycopg.Connection, query: str, *, limit: int = 20
+) -> list[SearchHit]:
+    """Search transcript segments and chapter summaries, best matches first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            SEARCH_QUERY,
+            {
+                "query": query,
+                "limit": limit,
+                "transcript_config": TRANSCRIPT_TS_CONFIG,
+                "chapter_config": CHAPTER_TS_CONFIG,
+            },
+        )
+        return [SearchHit(*row) for row in cursor.fetchall()]
+
+
+def format_hit(hit: SearchHit) -> str:
+    snippet = " ".join(hit.text.split())
+    if len(snippet) > SNIPPET_CHARS:
+        snippet = snippet[: SNIPPET_CHARS - 1] + "…"
+    chapter = hit.chapter or "-"
+    return f"{hit.video_id}  {hit.timestamp}  [{chapter}]  {hit.source}: {snippet}"
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Full-text search over transcripts and chapter summaries"
+    )
+    parser.add_argument(
+        "query",
+        help="Search terms in web-search syntax, e.g. '\"first date\" -cat'",
+    )
+    parser.add_argument("--limit", type=int, default=20)
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    connection = get_db_connection(settings=get_settings())
+    try:
+        hits = search_catalog(connection, args.query, limit=args.limit)
+    finally:
+        connection.close()
+    for hit in hits:
+        print(format_hit(hit))
+    if not hits:
+        print("No matches")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,13 @@
-import json
 import subprocess
 from typing import Callable, Mapping, Sequence
 
 import numpy as np
 
+import json_codec
 from config import Settings, get_settings
+from process_pool import StagePool
 from utils import try_except_with_log
+from vad import VoiceActivityDetector
 
 EventDict = dict[str, float | int]
 
@@ -44,23 +46,35 @@ class SoundClassifierClient:
         command_builder: Callable[
             [str, Settings], list[str]
         ] = build_classifier_command,
+        vad: VoiceActivityDetector | None = None,
+        pool: StagePool | None = None,
     ) -> None:
         self._settings = settings or get_settings()
         self._runner = runner
         self._command_builder = command_builder
+        self._vad = vad
+        self._pool = pool
         self._events_avg_confidence_threshold = (
             self._settings.LAUGH_EVENT_AVG_CONFIDENCE_THRESHOLD
         )
         self._events_min_duration = self._settings.LAUGH_EVENT_MIN_DURATION_SECONDS
         self._events_max_gap = self._settings.LAUGH_EVENT_MAX_GAP_SECONDS
 
-    @try_except_with_log("Starting laughter detection")
-    def classify_audio(self, audio_path: str) -> dict[str, float]:
+    def _classify(self, audio_path: str) -> dict[str, float]:
         command = self._command_builder(audio_path, self._settings)
         completed_process = self._runner(command)
-        payload = json.loads(completed_process.stdout)
+        payload = json_codec.loads(completed_process.stdout)
         return payload
 
+    @try_except_with_log("Starting laughter detection")
+    def classify_audio(self, audio_path: str) -> dict[str, float]:
+        if self._vad is None:
+            return self._classify(audio_path)
+        # Speech interiors are skipped; timestamps are mapped back to the show.
+        with self._vad.laughter_audio(audio_path) as candidates:
+            payload = self._classify(str(candidates.path))
+        return candidates.remap_timestamps(payload)
+
     def _to_sorted_arrays(
         self, raw: Mapping[str, float] | None
     ) -> tuple[np.ndarray, np.ndarray]:
@@ -138,5 +152,14 @@ class SoundClassifierClient:
     def build_laugh_events_payload(
         self, raw: Mapping[str, float] | None
     ) -> dict[str, list[EventDict]]:
-        events = self.analyze_laugh_events(raw)
+        if self._pool is None:
+            events = self.analyze_laugh_events(raw)
+        else:
+            events = self._pool.run(analyze_laugh_events_in_worker, self._settings, raw)
         return {"events": self.serialize_events(events)}
+
+
+def analyze_laugh_events_in_worker(
+    settings: Settings, raw: Mapping[str, float] | None
+) -> list[EventDict]:
+    return SoundClassifierClient(settings).analyze_laugh_events(raw)
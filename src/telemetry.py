@@ -0,0 +1,281 @@
+import ctypes
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, Sequence
+
+# ru_maxrss is reported in bytes on macOS and in kilobytes on Linux.
+RSS_UNIT_BYTES = 1 if sys.platform == "darwin" else 1024
+
+PROMETHEUS_PREFIX = "standup_stage"
+RSS_SAMPLE_SECONDS = 0.2  # spikes shorter than this can be missed
+
+
+def _cpu_times() -> tuple[float, float]:
+    """CPU time of this process and of its finished children (ffmpeg, Swift)."""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime, children.ru_utime + children.ru_stime
+
+
+def process_cpu_seconds() -> float:
+    return sum(_cpu_times())
+
+
+@dataclass(frozen=True)
+class WorkerUsage:
+    """CPU time and peak RSS a stage pool worker spent on one job."""
+
+    cpu_seconds: float
+    peak_rss_bytes: int
+
+
+# Usage reported by pool jobs for the innermost stage of the current thread.
+_stage_worker_usage: ContextVar[list[WorkerUsage] | None] = ContextVar(
+    "stage_worker_usage", default=None
+)
+
+
+def record_worker_usage(usage: WorkerUsage) -> None:
+    """Attribute a pool job's usage to the stage that submitted it."""
+    stage_usage = _stage_worker_usage.get()
+    if stage_usage is not None:
+        stage_usage.append(usage)
+
+
+# proc_pidinfo flavor returning struct proc_taskinfo; resident size is its
+# second uint64.
+PROC_PIDTASKINFO = 4
+PROC_TASKINFO_SIZE = 96
+
+
+@lru_cache
+def _libproc() -> ctypes.CDLL:
+    return ctypes.CDLL("libproc.dylib", use_errno=True)
+
+
+def current_rss_bytes() -> int | None:
+    """Resident set size of this process now, or None where it cannot be read."""
+    if sys.platform == "darwin":
+        buffer = ctypes.create_string_buffer(PROC_TASKINFO_SIZE)
+        try:
+            written = _libproc().proc_pidinfo(
+                os.getpid(), PROC_PIDTASKINFO, 0, buffer, PROC_TASKINFO_SIZE
+            )
+        except OSError:
+            return None
+        if written != PROC_TASKINFO_SIZE:
+            return None
+        return int.from_bytes(buffer.raw[8:16], sys.byteorder)
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def _children_max_rss_bytes() -> int:
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * RSS_UNIT_BYTES
+
+
+class RssSampler:
+    """
+    Track the highest current RSS of this process while a stage or job runs.
+
+    ru_maxrss is a lifetime high-water mark, so it is only used for child
+    processes (ffmpeg, the Swift binary) and only when one that exited during
+    the stage set a new high.
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_SECONDS) -> None:
+        self._interval = interval
+        self._children_started = _children_max_rss_bytes()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.peak_bytes = current_rss_bytes() or 0
+        if self.peak_bytes:
+            self._thread = threading.Thread(
+                target=self._run, name="rss-sampler", daemon=True
+            )
+            self._thread.start()
+
+    def _sample(self) -> None:
+        self.peak_bytes = max(self.peak_bytes, current_rss_bytes() or 0)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self._sample()
+
+    def stop(self, *, include_children: bool = True) -> int:
+        """Stop sampling and return the stage's peak RSS in bytes."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._sample()
+        children = _children_max_rss_bytes()
+        if include_children and children > self._children_started:
+            return max(self.peak_bytes, children)
+        return self.peak_bytes
+
+
+@dataclass
+class StageRun:
+    stage: str
+    video_id: str | None
+    started_at: datetime
+    audio_seconds: float | None = None
+    bytes_moved: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_bytes: int = 0
+    status: str = "running"
+    error: str | None = None
+
+    @property
+    def real_time_factor(self) -> float | None:
+        """Seconds of work per second of audio; below 1.0 is faster than real time."""
+        if not self.audio_seconds:
+            return None
+        return self.wall_seconds / self.audio_seconds
+
+
+@dataclass
+class PipelineTelemetry:
+    """Collect per-stage resource usage for one pipeline invocation."""
+
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    worker_id: str | None = None
+    runs: list[StageRun] = field(default_factory=list)
+    _pending: list[StageRun] = field(default_factory=list, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @contextmanager
+    def stage(
+        self,
+        stage: str,
+        video_id: str | None = None,
+        *,
+        audio_seconds: float | None = None,
+    ) -> Iterator[StageRun]:
+        """Time a stage; callers may add ``bytes_moved`` to the yielded run."""
+        run = StageRun(
+            stage=stage,
+            video_id=video_id,
+            started_at=datetime.now(timezone.utc),
+            audio_seconds=audio_seconds,
+        )
+        wall_started = time.perf_counter()
+        own_started, children_started = _cpu_times()
+        rss_sampler = RssSampler()
+        worker_usage: list[WorkerUsage] = []
+        usage_token = _stage_worker_usage.set(worker_usage)
+        try:
+            yield run
+            run.status = "ok"
+        except BaseException as exc:
+            run.status = "error"
+            run.error = str(exc)
+            raise
+        finally:
+            _stage_worker_usage.reset(usage_token)
+            run.wall_seconds = time.perf_counter() - wall_started
+            own, children = _cpu_times()
+            run.cpu_seconds = own - own_started
+            if worker_usage:
+                # Pool workers are children of this process: a recycled one
+                # would add its whole lifetime here, so they report per job.
+                run.cpu_seconds += sum(usage.cpu_seconds for usage in worker_usage)
+                run.peak_rss_bytes = max(
+                    rss_sampler.stop(include_children=False),
+                    *(usage.peak_rss_bytes for usage in worker_usage),
+                )
+            else:
+                run.cpu_seconds += children - children_started
+                run.peak_rss_bytes = rss_sampler.stop()
+            self.record(run)
+            logging.debug(
+                "Stage %s for %s took %.2fs wall / %.2fs CPU",
+                stage,
+                video_id,
+                run.wall_seconds,
+                run.cpu_seconds,
+            )
+
+    def record(self, run: StageRun) -> None:
+        """Add a run timed elsewhere, e.g. a model reported by dbt."""
+        with self._lock:
+            self.runs.append(run)
+            self._pending.append(run)
+
+    def drain_pending(self) -> list[StageRun]:
+        """Return runs not yet persisted and forget them."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        return pending
+
+    def restore_pending(self, runs: Sequence[StageRun]) -> None:
+        with self._lock:
+            self._pending[:0] = runs
+
+    def render_prometheus(self) -> str:
+        """Render aggregated stage metrics in the Prometheus text format."""
+        with self._lock:
+            runs = list(self.runs)
+
+        totals: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for run in runs:
+            stage_totals = totals[run.stage]
+            stage_totals["runs"] += 1
+            stage_totals["errors"] += run.status == "error"
+            stage_totals["wall_seconds"] += run.wall_seconds
+            stage_totals["cpu_seconds"] += run.cpu_seconds
+            stage_totals["bytes"] += run.bytes_moved
+            stage_totals["audio_seconds"] += run.audio_seconds or 0.0
+            stage_totals["peak_rss_bytes"] = max(
+                stage_totals["peak_rss_bytes"], run.peak_rss_bytes
+            )
+
+        metrics = [
+            ("runs_total", "counter", "Stage executions"),
+            ("errors_total", "counter", "Stage executions that raised"),
+            ("wall_seconds_total", "counter", "Wall-clock seconds spent in the stage"),
+            ("cpu_seconds_total", "counter", "CPU seconds incl. child processes"),
+            ("bytes_total", "counter", "Bytes downloaded or persisted by the stage"),
+            ("audio_seconds_total", "counter", "Seconds of audio processed"),
+            ("peak_rss_bytes", "gauge", "Highest RSS sampled during a stage run"),
+        ]
+        lines: list[str] = []
+        for name, metric_type, help_text in metrics:
+            key = name.removesuffix("_total")
+            metric = f"{PROMETHEUS_PREFIX}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {metric_type}")
+            for stage, stage_totals in sorted(totals.items()):
+                value = stage_totals[key]
+                sample = int(value) if float(value).is_integer() else repr(value)
+                lines.append(f'{metric}{{stage="{stage}"}} {sample}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path) -> None:
+        """Write atomically so a textfile collector never reads a partial file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial_path = path.with_name(path.name + ".tmp")
+        partial_path.write_text(self.render_prometheus(), encoding="utf-8")
+        partial_path.replace(path)
+
+
+@lru_cache
+def get_telemetry() -> PipelineTelemetry:
+    return PipelineTelemetry()
@@ -1,9 +1,90 @@
-from typing import Any
-
-from mlx import core
-from parakeet_mlx import from_pretrained
+import logging
+import math
+import os
+from dataclasses import dataclass
+from typing import Any, Callable
 
+from config import Settings, get_settings
+from process_pool import StagePool
 from utils import try_except_with_log
+from vad import VoiceActivityDetector
+
+# Chunk length the TRANSCRIBE_CHUNK_MEMORY_MB_AT_60S estimate refers to.
+REFERENCE_CHUNK_SECONDS = 60.0
+
+
+def load_parakeet_model() -> Any:
+    # Imported lazily so non-Apple workers can run the other pipeline stages.
+    from parakeet_mlx import from_pretrained
+
+    return from_pretrained("mlx-community/parakeet-tdt-0.6b-v3")
+
+
+def clear_mlx_cache() -> None:
+    try:
+        from mlx import core
+    except ImportError:
+        return
+    core.clear_cache()
+
+
+def available_memory_bytes() -> int | None:
+    """Return memory free for inference: MLX's working set headroom, else free RAM."""
+    try:
+        from mlx import core
+
+        working_set = core.metal.device_info()["max_recommended_working_set_size"]
+        return max(0, int(working_set) - core.get_active_memory())
+    except (ImportError, AttributeError, KeyError, RuntimeError):
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+@dataclass(frozen=True)
+class ChunkPlan:
+    chunk_duration: float
+    overlap_duration: float
+
+    @property
+    def redundant_share(self) -> float:
+        """Share of transcribed audio that is overlap, i.e. done twice."""
+        return self.overlap_duration / self.chunk_duration
+
+
+def plan_chunks(
+    duration_seconds: float | None,
+    available_bytes: int | None,
+    settings: Settings,
+) -> ChunkPlan:
+    """
+    Pick the chunk length for a show of ``duration_seconds``.
+
+    The largest chunk is capped by TRANSCRIBE_MAX_CHUNK_SECONDS and by the
+    memory budget. A show that fits is transcribed in one pass. Longer shows
+    are cut into the fewest chunks that fit, sized equally so the last one
+    is not a short tail.
+    """
+    overlap = settings.TRANSCRIBE_OVERLAP_SECONDS
+    max_chunk = settings.TRANSCRIBE_MAX_CHUNK_SECONDS
+    if available_bytes is not None:
+        budget_mb = available_bytes * settings.TRANSCRIBE_MEMORY_FRACTION / 2**20
+        memory_chunk = REFERENCE_CHUNK_SECONDS * math.sqrt(
+            budget_mb / settings.TRANSCRIBE_CHUNK_MEMORY_MB_AT_60S
+        )
+        max_chunk = min(max_chunk, memory_chunk)
+    max_chunk = max(max_chunk, settings.TRANSCRIBE_MIN_CHUNK_SECONDS, overlap * 2)
+
+    if duration_seconds is None:
+        return ChunkPlan(float(math.floor(max_chunk)), overlap)
+    # The overlap doubles as slack for metadata durations rounded down.
+    if duration_seconds + overlap <= max_chunk:
+        return ChunkPlan(float(math.floor(max_chunk)), overlap)
+    chunks = math.ceil((duration_seconds - overlap) / (max_chunk - overlap))
+    chunk = (duration_seconds - overlap) / chunks + overlap
+    return ChunkPlan(float(math.ceil(chunk)), overlap)
 
 
 class ParakeetTranscriber:
@@ -11,14 +92,18 @@ class ParakeetTranscriber:
 
     def __init__(
         self,
-        model_loader=lambda: from_pretrained("mlx-community/parakeet-tdt-0.6b-v3"),
+        model_loader=load_parakeet_model,
         *,
-        chunk_duration: float = 60.0,
-        overlap_duration: float = 15.0,
+        settings: Settings | None = None,
+        memory_probe: Callable[[], int | None] = available_memory_bytes,
+        vad: VoiceActivityDetector | None = None,
+        pool: StagePool | None = None,
     ) -> None:
         self._model_loader = model_loader
-        self._chunk_duration = chunk_duration
-        self._overlap_duration = overlap_duration
+        self._settings = settings or get_settings()
+        self._memory_probe = memory_probe
+        self._vad = vad
+        self._pool = pool
         self._model: Any | None = None
 
     def load_model_if_needed(self) -> Any:
@@ -26,18 +111,82 @@ class ParakeetTranscriber:
             self._model = self._model_loader()
         return self._model
 
-    @try_except_with_log("Starting audio transcription")
-    def transcribe_audio(self, audio_path: str) -> dict[str, dict[str, Any]]:
+    def plan_for(self, duration_seconds: float | None) -> ChunkPlan:
+        return plan_chunks(duration_seconds, self._memory_probe(), self._settings)
+
+    def run_model(self, audio_path: str, plan: ChunkPlan) -> dict[str, dict[str, Any]]:
         model = self.load_model_if_needed()
         try:
             result = model.transcribe(
                 audio_path,
-                chunk_duration=self._chunk_duration,
-                overlap_duration=self._overlap_duration,
+                chunk_duration=plan.chunk_duration,
+                overlap_duration=plan.overlap_duration,
             )
         finally:
-            core.clear_cache()
+            clear_mlx_cache()
         return {
             str(i): {"text": s.text, "start": round(s.start, 2), "end": round(s.end, 2)}
             for i, s in enumerate(result.sentences)
         }
+
+    def transcribe_planned(
+        self,
+        audio_path: str,
+        duration_seconds: float | None,
+        plan: ChunkPlan | None,
+    ) -> dict[str, dict[str, Any]]:
+        """Load the model first so the plan sees the memory left beside it."""
+        self.load_model_if_needed()
+        chunk_plan = plan or self.plan_for(duration_seconds)
+        logging.info(
+            "Transcribing with %.0fs chunks and %.0fs overlap",
+            chunk_plan.chunk_duration,
+            chunk_plan.overlap_duration,
+        )
+        return self.run_model(audio_path, chunk_plan)
+
+    def _transcribe(
+        self,
+        audio_path: str,
+        duration_seconds: float | None,
+        plan: ChunkPlan | None,
+    ) -> dict[str, dict[str, Any]]:
+        if self._pool is None:
+            return self.transcribe_planned(audio_path, duration_seconds, plan)
+        # The model and its MLX memory live in the worker, so the chunks are
+        # planned there; this process would report almost no memory in use.
+        return self._pool.run(
+            transcribe_in_worker, self._settings, audio_path, duration_seconds, plan
+        )
+
+    @try_except_with_log("Starting audio transcription")
+    def transcribe_audio(
+        self,
+        audio_path: str,
+        duration_seconds: float | None = None,
+        *,
+        plan: ChunkPlan | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        if self._vad is None:
+            return self._transcribe(audio_path, duration_seconds, plan)
+        # Only speech is transcribed; timestamps are mapped back to the show.
+        with self._vad.speech_audio(audio_path) as speech:
+            transcript = self._transcribe(str(speech.path), speech.duration, plan)
+        return speech.remap_segments(transcript)
+
+
+# Stage pool workers keep one transcriber, so the model is loaded once per
+# worker rather than once per job.
+_worker_transcriber: ParakeetTranscriber | None = None
+
+
+def transcribe_in_worker(
+    settings: Settings,
+    audio_path: str,
+    duration_seconds: float | None,
+    plan: ChunkPlan | None,
+) -> dict[str, dict[str, Any]]:
+    global _worker_transcriber
+    if _worker_transcriber is None:
+        _worker_transcriber = ParakeetTranscriber(settings=settings)
+    return _worker_transcriber.transcribe_planned(audio_path, duration_seconds, plan)
@@ -0,0 +1,353 @@
+import logging
+import os
+import stat
+import subprocess
+import tempfile
+import wave
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, Mapping, Sequence
+
+import numpy as np
+
+from config import Settings, get_settings
+from process_pool import SharedArray, StagePool, attach_array, share_array
+
+SAMPLE_RATE = 16_000
+FRAME_SAMPLES = 512  # 32 ms
+FRAME_SECONDS = FRAME_SAMPLES / SAMPLE_RATE
+FRAMES_PER_BLOCK = 4096  # bounds the FFT working set for long shows
+SPEECH_BAND_HZ = (300.0, 3400.0)
+MODULATION_WINDOW_SECONDS = 1.0
+# Frames quieter than this are silent even when the show has digital silence
+# that pulls the percentile noise floor down.
+SILENCE_FLOOR_DB = -50.0
+# Silence inserted between condensed spans so words are not glued together.
+JOIN_GAP_SECONDS = 0.3
+# Enough to keep classifier windows at the 1/600 s CMTime resolution apart.
+TIMESTAMP_DECIMALS = 6
+
+Region = tuple[float, float]
+
+
+def decode_pcm(audio_path: str) -> np.ndarray:
+    """Decode any ffmpeg-readable input to 16 kHz mono int16 samples."""
+    completed = subprocess.run(
+        [
+            "ffmpeg",
+            "-nostdin",
+            "-v",
+            "error",
+            "-i",
+            audio_path,
+            "-ac",
+            "1",
+            "-ar",
+            str(SAMPLE_RATE),
+            "-f",
+            "s16le",
+            "-",
+        ],
+        capture_output=True,
+        check=True,
+    )
+    return np.frombuffer(completed.stdout, dtype=np.int16)
+
+
+def frame_features(pcm: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return per-frame energy (dBFS), speech-band share and spectral flatness."""
+    frame_count = pcm.size // FRAME_SAMPLES
+    frames = pcm[: frame_count * FRAME_SAMPLES].reshape(frame_count, FRAME_SAMPLES)
+    window = np.hanning(FRAME_SAMPLES).astype(np.float32)
+    frequencies = np.fft.rfftfreq(FRAME_SAMPLES, 1 / SAMPLE_RATE)
+    band = (frequencies >= SPEECH_BAND_HZ[0]) & (frequencies <= SPEECH_BAND_HZ[1])
+
+    energy_db = np.empty(frame_count, dtype=np.float32)
+    band_ratio = np.empty(frame_count, dtype=np.float32)
+    flatness = np.empty(frame_count, dtype=np.float32)
+    for start in range(0, frame_count, FRAMES_PER_BLOCK):
+        block = frames[start : start + FRAMES_PER_BLOCK].astype(np.float32) / 32768
+        stop = start + block.shape[0]
+        energy_db[start:stop] = 10 * np.log10(np.mean(block**2, axis=1) + 1e-10)
+        power = np.abs(np.fft.rfft(block * window, axis=1)) ** 2 + 1e-12
+        band_power = power[:, band]
+        band_ratio[start:stop] = band_power.sum(axis=1) / power.sum(axis=1)
+        # Geometric over arithmetic mean: near 1 for noise, near 0 for tones.
+        flatness[start:stop] = np.exp(np.mean(np.log(band_power), axis=1)) / np.mean(
+            band_power, axis=1
+        )
+    return energy_db, band_ratio, flatness
+
+
+def _rolling_std(values: np.ndarray, width: int) -> np.ndarray:
+    kernel = np.ones(width) / width
+    mean = np.convolve(values, kernel, mode="same")
+    mean_square = np.convolve(values**2, kernel, mode="same")
+    return np.sqrt(np.maximum(mean_square - mean**2, 0.0))
+
+
+def _dilate(mask: np.ndarray, frames: int) -> np.ndarray:
+    if frames <= 0:
+        return mask
+    return np.convolve(mask, np.ones(2 * frames + 1), mode="same") > 0
+
+
+def _erode(mask: np.ndarray, frames: int) -> np.ndarray:
+    return ~_dilate(~mask, frames)
+
+
+def _frames(seconds: float) -> int:
+    return int(round(seconds / FRAME_SECONDS))
+
+
+def mask_to_regions(mask: np.ndarray, min_seconds: float = 0.0) -> list[Region]:
+    """Turn a per-frame mask into (start, end) seconds, dropping short runs."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    keep = (ends - starts) * FRAME_SECONDS >= min_seconds
+    return [
+        (round(start * FRAME_SECONDS, 3), round(end * FRAME_SECONDS, 3))
+        for start, end in zip(starts[keep].tolist(), ends[keep].tolist())
+    ]
+
+
+@dataclass(frozen=True)
+class VoiceActivity:
+    duration: float
+    speech: list[Region]
+    laughter: list[Region]
+
+    @staticmethod
+    def total(regions: Sequence[Region]) -> float:
+        return sum(end - start for start, end in regions)
+
+
+def detect_voice_activity(pcm: np.ndarray, settings: Settings) -> VoiceActivity:
+    """
+    Split a show into speech regions and laughter-candidate regions.
+
+    A frame is active when its energy clears the noise floor. It is speech
+    when it is also mostly in the speech band, not noise-like (applause and
+    laughter are flat) and part of the syllable-rate energy swings that
+    music lacks. Short pauses are bridged and short blips dropped. Laughter
+    candidates are active frames outside speech, extended into the edges of
+    speech where laughter often starts.
+    """
+    duration = pcm.size / SAMPLE_RATE
+    energy_db, band_ratio, flatness = frame_features(pcm)
+    if energy_db.size == 0:
+        return VoiceActivity(duration, [], [])
+
+    noise_floor = np.percentile(energy_db, 10)
+    active = energy_db > max(
+        noise_floor + settings.VAD_SILENCE_MARGIN_DB, SILENCE_FLOOR_DB
+    )
+    modulation = _rolling_std(
+        energy_db.astype(np.float64), max(1, _frames(MODULATION_WINDOW_SECONDS))
+    )
+    speech = (
+        active
+        & (band_ratio >= settings.VAD_SPEECH_MIN_BAND_RATIO)
+        & (flatness <= settings.VAD_SPEECH_MAX_FLATNESS)
+        & (modulation >= settings.VAD_SPEECH_MIN_MODULATION_DB)
+    )
+
+    bridge = _frames(settings.VAD_MAX_GAP_SECONDS / 2)
+    speech = _erode(_dilate(speech, bridge), bridge)
+    speech_regions = mask_to_regions(speech, settings.VAD_MIN_SPEECH_SECONDS)
+    speech = np.zeros_like(speech)
+    for start, end in speech_regions:
+        speech[_frames(start) : _frames(end)] = True
+
+    laughter = active & ~_erode(speech, _frames(settings.VAD_LAUGHTER_PAD_SECONDS))
+    laughter = _erode(_dilate(laughter, bridge), bridge)
+    padding = _frames(settings.VAD_PAD_SECONDS)
+    return VoiceActivity(
+        duration,
+        mask_to_regions(_dilate(speech, padding)),
+        mask_to_regions(_dilate(laughter, padding)),
+    )
+
+
+def detect_shared_voice_activity(
+    shared: SharedArray, settings: Settings
+) -> VoiceActivity:
+    """Stage pool entry point: detect on samples the parent put in shared memory."""
+    with attach_array(shared) as pcm:
+        activity = detect_voice_activity(pcm, settings)
+        del pcm
+    return activity
+
+
+class SpanMap:
+    """Map times in condensed audio back to the original timeline."""
+
+    def __init__(self, regions: Sequence[Region], gap: float = JOIN_GAP_SECONDS):
+        spans = np.array(regions, dtype=float).reshape(-1, 2)
+        self._source_starts = spans[:, 0]
+        self._durations = spans[:, 1] - spans[:, 0]
+        self._condensed_starts = np.concatenate(
+            ([0.0], np.cumsum(self._durations + gap)[:-1])
+        )[: len(spans)]
+        self.duration = float(self._durations.sum() + gap * max(len(spans) - 1, 0))
+
+    def to_source(self, times: np.ndarray) -> np.ndarray:
+        if self._source_starts.size == 0:
+            return np.asarray(times, dtype=float)
+        index = np.searchsorted(self._condensed_starts, times, side="right") - 1
+        index = np.clip(index, 0, self._source_starts.size - 1)
+        # Times inside a join gap are pinned to the end of the preceding span.
+        offset = np.clip(
+            times - self._condensed_starts[index], 0, self._durations[index]
+        )
+        return self._source_starts[index] + offset
+
+    def in_gap(self, times: np.ndarray) -> np.ndarray:
+        """True for times in a join gap or past the end, i.e. not show audio."""
+        times = np.asarray(times, dtype=float)
+        if self._source_starts.size == 0:
+            return np.zeros(times.shape, dtype=bool)
+        index = np.searchsorted(self._condensed_starts, times, side="right") - 1
+        index = np.clip(index, 0, self._source_starts.size - 1)
+        return times - self._condensed_starts[index] >= self._durations[index]
+
+
+@dataclass
+class CondensedAudio:
+    """Audio handed to an engine, with the way back to the original timeline."""
+
+    path: Path
+    duration: float
+    span_map: SpanMap
+
+    def remap_segments(
+        self, segments: Mapping[str, dict[str, object]]
+    ) -> dict[str, dict[str, object]]:
+        if not segments:
+            return dict(segments)
+        keys = list(segments)
+        starts = self.span_map.to_source(
+            np.array([segments[key]["start"] for key in keys], dtype=float)
+        )
+        ends = self.span_map.to_source(
+            np.array([segments[key]["end"] for key in keys], dtype=float)
+        )
+        return {
+            key: {**segments[key], "start": round(start, 2), "end": round(end, 2)}
+            for key, start, end in zip(keys, starts.tolist(), ends.tolist())
+        }
+
+    def remap_timestamps(self, scores: Mapping[str, float]) -> dict[str, float]:
+        """
+        Map classifier window starts back to the show.
+
+        Windows starting in a join gap hold no show audio and are dropped, so
+        no two windows land on one key. Keys stay plain decimal seconds, as
+        the binary writes them for a whole file.
+        """
+        if not scores:
+            return dict(scores)
+        times = np.array([float(key) for key in scores])
+        in_gap = self.span_map.in_gap(times)
+        remapped: dict[str, float] = {}
+        for time, confidence, gap in zip(
+            self.span_map.to_source(times).tolist(), scores.values(), in_gap.tolist()
+        ):
+            if not gap:
+                remapped[str(round(time, TIMESTAMP_DECIMALS))] = confidence
+        return remapped
+
+
+def write_wav(pcm: np.ndarray, regions: Sequence[Region], path: Path) -> None:
+    gap = np.zeros(int(JOIN_GAP_SECONDS * SAMPLE_RATE), dtype=np.int16)
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        for index, (start, end) in enumerate(regions):
+            if index:
+                wav.writeframes(gap.tobytes())
+            span = pcm[int(start * SAMPLE_RATE) : int(end * SAMPLE_RATE)]
+            wav.writeframes(span.tobytes())
+
+
+class VoiceActivityDetector:
+    """
+    Run the pre-pass once per audio file and hand each engine its regions.
+
+    The decoded samples of the last regular file are kept, so the transcriber
+    and the laughter detector share one decode of the same show.
+    """
+
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        *,
+        decoder: Callable[[str], np.ndarray] = decode_pcm,
+        pool: StagePool | None = None,
+    ) -> None:
+        self._settings = settings or get_settings()
+        self._decoder = decoder
+        self._pool = pool
+        self._cache_key: tuple[str, int, int, float] | None = None
+        self._cached: tuple[np.ndarray, VoiceActivity] | None = None
+
+    def analyse(self, audio_path: str) -> tuple[np.ndarray, VoiceActivity]:
+        file_stat = os.stat(audio_path)
+        # A FIFO can be read once and its path is reused, so it is never cached.
+        cache_key = None
+        if not stat.S_ISFIFO(file_stat.st_mode):
+            cache_key = (
+                audio_path,
+                file_stat.st_ino,
+                file_stat.st_size,
+                file_stat.st_mtime,
+            )
+            if cache_key == self._cache_key and self._cached is not None:
+                return self._cached
+
+        pcm = self._decoder(audio_path)
+        if self._pool is None:
+            activity = detect_voice_activity(pcm, self._settings)
+        else:
+            with share_array(pcm) as shared:
+                activity = self._pool.run(
+                    detect_shared_voice_activity, shared, self._settings
+                )
+        logging.info(
+            "Voice activity: %.0fs speech, %.0fs laughter candidates of %.0fs",
+            VoiceActivity.total(activity.speech),
+            VoiceActivity.total(activity.laughter),
+            activity.duration,
+        )
+        if cache_key is not None:
+            self._cache_key, self._cached = cache_key, (pcm, activity)
+        return pcm, activity
+
+    @contextmanager
+    def _condensed(
+        self, pcm: np.ndarray, regions: Sequence[Region], duration: float
+    ) -> Iterator[CondensedAudio]:
+        if not regions:
+            # Nothing detected is more likely a miss than an empty show.
+            logging.warning("Voice activity found no regions; using the full audio")
+            regions = [(0.0, duration)]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "condensed.wav"
+            write_wav(pcm, regions, path)
+            span_map = SpanMap(regions)
+            yield CondensedAudio(path, span_map.duration, span_map)
+
+    @contextmanager
+    def speech_audio(self, audio_path: str) -> Iterator[CondensedAudio]:
+        pcm, activity = self.analyse(audio_path)
+        with self._condensed(pcm, activity.speech, activity.duration) as audio:
+            yield audio
+
+    @contextmanager
+    def laughter_audio(self, audio_path: str) -> Iterator[CondensedAudio]:
+        pcm, activity = self.analyse(audio_path)
+        with self._condensed(pcm, activity.laughter, activity.duration) as audio:
+            yield audio
@@ -0,0 +1,287 @@
+import logging
+import os
+import re
+import socket
+import threading
+from contextlib import suppress
+from typing import Any, Callable, Sequence
+
+import psycopg
+from yt_dlp.utils import DownloadError, ExtractorError
+
+from config import Settings, get_settings
+from data_pipeliine import (
+    backfill_typed_rows,
+    create_audio_engine,
+    persist_telemetry,
+    process_audio_and_transcription,
+    run_llm_tasks,
+    update_status,
+    update_video_metadata,
+)
+from database import (
+    PIPELINE_STAGE_CONDITIONS,
+    PipelineTaskRepository,
+    ProcessVideoRepository,
+    get_db_connection,
+)
+from dbt_run import run_dbt_pipeline
+from llm import GeminiClient
+from models import PipelineTask
+from process_pool import StagePool, create_stage_pool
+from sound_classifier import SoundClassifierClient
+from telemetry import get_telemetry
+from transcribe import ParakeetTranscriber
+from utils import remove_audio_cache
+from vad import VoiceActivityDetector
+from youtube_downloader import AudioDownloadEngine, YoutubeDownloader
+
+PIPELINE_STAGES = tuple(PIPELINE_STAGE_CONDITIONS)
+
+# Stages whose completion can make new work available for another stage.
+STAGE_DEPENDENTS: dict[str, tuple[str, ...]] = {"audio": ("llm",)}
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseHeartbeat:
+    """Renew a task lease from a background thread while the stage runs."""
+
+    def __init__(
+        self,
+        connection: psycopg.Connection,
+        task: PipelineTask,
+        worker_id: str,
+        settings: Settings,
+    ) -> None:
+        self._connection = connection
+        self._queue = PipelineTaskRepository(connection)
+        self._task = task
+        self._worker_id = worker_id
+        self._lease_seconds = settings.WORKER_LEASE_SECONDS
+        self._interval = settings.WORKER_HEARTBEAT_SECONDS
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="lease-heartbeat", daemon=True
+        )
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                renewed = self._queue.heartbeat(
+                    self._task, self._worker_id, self._lease_seconds
+                )
+                self._connection.commit()
+            except Exception as exc:  # noqa: BLE001
+                self._connection.rollback()
+                logging.warning("Lease heartbeat failed: %s", exc)
+                continue
+            if not renewed:
+                logging.warning(
+                    "Lost lease on %s/%s", self._task.video_id, self._task.stage
+                )
+                return
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def run_task(
+    task: PipelineTask,
+    repository: ProcessVideoRepository,
+    *,
+    commit: Callable[[], None],
+    downloader: YoutubeDownloader,
+    audio_engine: AudioDownloadEngine | None,
+    transcriber: ParakeetTranscriber | None,
+    sound_classifier_client: SoundClassifierClient | None,
+    llm_client: GeminiClient | None,
+) -> bool:
+    """Run one leased stage for one video; return True when work was performed."""
+    video_row = repository.get_video_by_id(task.video_id)
+    if video_row is None:
+        return False
+
+    updated = False
+    if task.stage == "metadata":
+        updated = update_video_metadata(video_row, repository, downloader, commit)
+    elif task.stage == "audio":
+        try:
+            updated = process_audio_and_transcription(
+                video_row,
+                repository,
+                audio_engine,
+                transcriber,
+                sound_classifier_client,
+                commit,
+            )
+        finally:
+            audio_engine.release(task.video_id)
+    elif task.stage == "llm":
+        updated = run_llm_tasks(video_row, repository, llm_client, commit)
+
+    if update_status(video_row, repository, commit):
+        updated = True
+    return updated
+
+
+def run_worker(stages: Sequence[str], *, worker_id: str | None = None) -> None:
+    """
+    Drain queued tasks for ``stages`` until none are left to lease.
+
+    Several workers can run at once on different hosts, e.g. Apple Silicon
+    machines with ``audio`` and Linux machines with ``metadata,llm``. A
+    worker that did work runs dbt once no live leases or pending tasks for
+    its stages remain; an advisory lock keeps two such runs from overlapping.
+    """
+    unknown = sorted(set(stages) - set(PIPELINE_STAGES))
+    if unknown:
+        raise ValueError(f"Unknown pipeline stages: {', '.join(unknown)}")
+
+    resolved_worker_id = worker_id or default_worker_id()
+    # Workers on one host get their own scratch directory, so cleaning up
+    # on exit never removes another worker's downloads or FIFOs.
+    shared_settings = get_settings()
+    settings = shared_settings.model_copy(
+        update={
+            "DATA_DIR": shared_settings.DATA_DIR
+            / "workers"
+            / re.sub(r"[^\w.-]", "_", resolved_worker_id)
+        }
+    )
+    telemetry = get_telemetry()
+    telemetry.worker_id = resolved_worker_id
+    connection = None
+    heartbeat_connection = None
+    audio_engine: AudioDownloadEngine | None = None
+    stage_pool: StagePool | None = None
+    try:
+        connection = get_db_connection(settings=settings)
+        heartbeat_connection = get_db_connection(settings=settings)
+        repository = ProcessVideoRepository(connection)
+        queue = PipelineTaskRepository(connection)
+        backfill_typed_rows(repository, connection.commit)
+
+        queue.enqueue_pending(stages)
+        connection.commit()
+
+        downloader = YoutubeDownloader(settings=settings)
+        transcriber = None
+        sound_classifier_client = None
+        if "audio" in stages:
+            audio_engine = create_audio_engine(downloader, settings)
+            stage_pool = create_stage_pool(settings)
+            vad = (
+                VoiceActivityDetector(settings, pool=stage_pool)
+                if settings.VAD_ENABLED
+                else None
+            )
+            transcriber = ParakeetTranscriber(
+                settings=settings, vad=vad, pool=stage_pool
+            )
+            sound_classifier_client = SoundClassifierClient(
+                settings=settings, vad=vad, pool=stage_pool
+            )
+        llm_client = GeminiClient() if "llm" in stages else None
+
+        logging.info(
+            "Worker %s draining stages: %s", resolved_worker_id, ", ".join(stages)
+        )
+        processed_tasks = 0
+        while True:
+            task = queue.lease(
+                stages,
+                resolved_worker_id,
+                settings.WORKER_LEASE_SECONDS,
+                settings=settings,
+            )
+            connection.commit()
+            if task is None:
+                break
+
+            logging.info(
+                "Leased %s task for %s (attempt %s)",
+                task.stage,
+                task.video_id,
+                task.attempts,
+            )
+            try:
+                with LeaseHeartbeat(
+                    heartbeat_connection, task, resolved_worker_id, settings
+                ):
+                    if run_task(
+                        task,
+                        repository,
+                        commit=connection.commit,
+                        downloader=downloader,
+                        audio_engine=audio_engine,
+                        transcriber=transcriber,
+                        sound_classifier_client=sound_classifier_client,
+                        llm_client=llm_client,
+                    ):
+                        processed_tasks += 1
+            except (DownloadError, ExtractorError) as exc:
+                # Unavailable videos will not recover on retry.
+                connection.rollback()
+                logging.warning(
+                    "Giving up on %s/%s, video unavailable: %s",
+                    task.video_id,
+                    task.stage,
+                    exc,
+                )
+                queue.fail(task, resolved_worker_id, str(exc), max_attempts=0)
+                connection.commit()
+                continue
+            except Exception as exc:  # noqa: BLE001
+                connection.rollback()
+                logging.error("Task %s/%s failed: %s", task.video_id, task.stage, exc)
+                queue.fail(
+                    task,
+                    resolved_worker_id,
+                    str(exc),
+                    max_attempts=settings.WORKER_MAX_ATTEMPTS,
+                )
+                connection.commit()
+                continue
+
+            queue.complete(task, resolved_worker_id)
+            dependents = STAGE_DEPENDENTS.get(task.stage, ())
+            if dependents:
+                queue.enqueue_pending(dependents, video_id=task.video_id)
+            connection.commit()
+            persist_telemetry(telemetry, connection, settings)
+
+        logging.info(
+            "Worker %s finished; %s task(s) with changes",
+            resolved_worker_id,
+            processed_tasks,
+        )
+        if processed_tasks:
+            # Waiting on the lock serialises workers that finish together.
+            with queue.dbt_lock():
+                if not queue.has_outstanding_tasks(stages):
+                    # Other workers' changes are unknown here, so the run
+                    # stays unscoped.
+                    with telemetry.stage("dbt"):
+                        run_dbt_pipeline(settings=settings)
+    finally:
+        if stage_pool is not None:
+            stage_pool.close()
+        if audio_engine is not None:
+            audio_engine.close()
+            remove_audio_cache(settings=settings)
+            with suppress(OSError):
+                settings.DATA_DIR.rmdir()
+        if connection:
+            persist_telemetry(telemetry, connection, settings)
+        if heartbeat_connection:
+            heartbeat_connection.close()
+        if connection:
+            connection.close()
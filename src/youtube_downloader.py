@@ -1,10 +1,25 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Callable, Dict, Iterable, List
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping
 
 import yt_dlp
 from minio import Minio
 from minio.error import S3Error
 
+from audio_stream import (
+    AudioInput,
+    ChecksumMismatchError,
+    ObjectRangeReader,
+    extract_user_metadata,
+    stream_to_fifo,
+)
 from config import Settings, get_settings
 from models import ProcessVideo
 from utils import try_except_with_log
@@ -21,6 +36,57 @@ def build_audio_artifacts(
     return local_audio_path, object_name, local_audio_path_template
 
 
+# yt-dlp options that change the encoded bytes; cookies, verbosity and
+# fragment concurrency are deliberately excluded from the fingerprint.
+AUDIO_CODEC_OPTION_KEYS = ("format", "postprocessors", "postprocessor_args")
+
+
+def codec_options_hash(download_opts: Mapping[str, Any]) -> str:
+    """Fingerprint the yt-dlp options that influence the encoded audio."""
+    relevant = {key: download_opts.get(key) for key in AUDIO_CODEC_OPTION_KEYS}
+    encoded = json.dumps(relevant, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class DownloadedAudio:
+    path: Path
+    duration: float | None = None
+
+
+def build_audio_metadata(
+    downloaded: DownloadedAudio, settings: Settings
+) -> dict[str, str]:
+    """Return the MinIO user metadata stored alongside an audio object."""
+    with downloaded.path.open("rb") as file:
+        sha256 = hashlib.file_digest(file, "sha256").hexdigest()
+    metadata = {
+        "sha256": sha256,
+        "codec-hash": codec_options_hash(settings.YDL_DOWNLOAD_OPTS),
+    }
+    if downloaded.duration:
+        size_bits = downloaded.path.stat().st_size * 8
+        metadata["duration"] = f"{downloaded.duration:.2f}"
+        metadata["bitrate"] = str(round(size_bits / downloaded.duration))
+    return metadata
+
+
+def is_cached_audio_valid(metadata: Mapping[str, str], settings: Settings) -> bool:
+    """Check that a cached object was encoded with the current options."""
+    codec_hash = metadata.get("codec-hash")
+    if codec_hash is None:
+        return settings.MINIO_TRUST_LEGACY_AUDIO
+    return codec_hash == codec_options_hash(settings.YDL_DOWNLOAD_OPTS)
+
+
+@dataclass
+class PlaylistListing:
+    playlist_id: str | None
+    playlist_title: str | None
+    entry_count: int | None  # as reported by YouTube, before paging
+    entries: Iterator[ProcessVideo]
+
+
 class YoutubeDownloader:
     """Wrapper around yt-dlp operations to enable dependency injection."""
 
@@ -57,33 +123,121 @@ class YoutubeDownloader:
 
         return self._with_client(self._settings.YDL_PLAYLIST_OPTS, _extract)
 
-    def extract_playlist_info(self, youtube_url: str) -> List[ProcessVideo]:
-        """Extract playlist metadata and return validated ProcessVideo entries."""
-
-        def _extract(client: yt_dlp.YoutubeDL) -> List[ProcessVideo]:
-            all_playlist_info = client.extract_info(youtube_url)
-            playlist_id = all_playlist_info.get("id")
-            playlist_title = all_playlist_info.get("title")
-            entries: Iterable[dict[str, Any]] = all_playlist_info.get("entries", [])
-
-            playlist_info: List[ProcessVideo] = []
-            for entry in entries:
-                video_data = {
-                    "channel_id": entry.get("channel_id"),
-                    "channel_name": entry.get("channel"),
-                    "playlist_id": playlist_id,
-                    "playlist_title": playlist_title,
-                    "video_id": entry.get("id"),
-                    "video_title": entry.get("title"),
-                    "video_url": entry.get("url"),
-                }
-
-                playlist_info.append(ProcessVideo(**video_data))
-            return playlist_info
+    @contextmanager
+    def open_playlist(self, youtube_url: str) -> Iterator[PlaylistListing]:
+        """
+        Fetch the first page of a playlist; further pages load while iterating.
 
-        return self._with_client(self._settings.YDL_PLAYLIST_OPTS, _extract)
+        With ``process=False`` yt-dlp returns the entries lazily, so a large
+        playlist or channel is paged only as far as ``entries`` is consumed.
+        """
+        with self._ydl_factory(self._settings.YDL_PLAYLIST_OPTS) as client:
+            playlist = client.extract_info(youtube_url, download=False, process=False)
+            playlist_id = playlist.get("id")
+            playlist_title = playlist.get("title")
+            entries: Iterable[dict[str, Any]] = playlist.get("entries") or []
+            yield PlaylistListing(
+                playlist_id=playlist_id,
+                playlist_title=playlist_title,
+                entry_count=playlist.get("playlist_count"),
+                entries=(
+                    ProcessVideo(
+                        channel_id=entry.get("channel_id"),
+                        channel_name=entry.get("channel"),
+                        playlist_id=playlist_id,
+                        playlist_title=playlist_title,
+                        video_id=entry.get("id"),
+                        video_title=entry.get("title"),
+                        video_url=entry.get("url"),
+                    )
+                    for entry in entries
+                ),
+            )
+
+    def open_cached_audio(
+        self, storage_client: Minio, video_id: str
+    ) -> ObjectRangeReader:
+        _, object_name, _ = build_audio_artifacts(video_id, self._settings)
+        return ObjectRangeReader(
+            storage_client,
+            self._settings.MINIO_AUDIO_BUCKET,
+            object_name,
+            chunk_size=self._settings.MINIO_STREAM_CHUNK_SIZE,
+        )
+
+    def discard_cached_audio(self, storage_client: Minio, video_id: str) -> None:
+        """Delete a corrupt audio object so the next fetch downloads it again."""
+        _, object_name, _ = build_audio_artifacts(video_id, self._settings)
+        storage_client.remove_object(self._settings.MINIO_AUDIO_BUCKET, object_name)
+        logging.warning("Removed corrupt cached audio %s", object_name)
+
+    def fetch_cached_audio(self, storage_client: Minio, video_id: str) -> Path | None:
+        """Return the local audio path when the object already exists in MinIO."""
+        local_audio_path, object_name, _ = build_audio_artifacts(
+            video_id, self._settings
+        )
+        if local_audio_path.exists():
+            try:
+                stat = storage_client.stat_object(
+                    self._settings.MINIO_AUDIO_BUCKET, object_name
+                )
+            except S3Error as error:
+                if error.code != "NoSuchKey":
+                    raise
+                return None
+            if is_cached_audio_valid(
+                extract_user_metadata(stat.metadata or {}), self._settings
+            ):
+                return local_audio_path
+            logging.info("Cached audio %s is stale; re-encoding", object_name)
+            local_audio_path.unlink(missing_ok=True)
+            return None
+
+        # The first ranged GET doubles as the existence check, replacing the
+        # stat_object + fget_object pair (which stats the object again).
+        reader = self.open_cached_audio(storage_client, video_id)
+        if not reader.exists():
+            return None
+        if not is_cached_audio_valid(reader.metadata, self._settings):
+            logging.info("Cached audio %s is stale; re-encoding", object_name)
+            return None
+        try:
+            return reader.write_to(local_audio_path)
+        except ChecksumMismatchError as exc:
+            logging.warning("Discarding corrupt cached audio: %s", exc)
+            self.discard_cached_audio(storage_client, video_id)
+            return None
 
     @try_except_with_log("Starting audio download")
+    def download_to_local(self, video_url: str, video_id: str) -> DownloadedAudio:
+        """Download audio with yt-dlp into DATA_DIR without touching storage."""
+        local_audio_path, _, local_audio_template = build_audio_artifacts(
+            video_id, self._settings
+        )
+        download_opts = self._settings.YDL_DOWNLOAD_OPTS.copy()
+        download_opts["outtmpl"] = local_audio_template
+
+        def _download(client: yt_dlp.YoutubeDL) -> dict[str, Any]:
+            return client.extract_info(video_url, download=True) or {}
+
+        video_info = self._with_client(download_opts, _download)
+        return DownloadedAudio(local_audio_path, video_info.get("duration"))
+
+    def upload_audio(
+        self, storage_client: Minio, video_id: str, downloaded: DownloadedAudio
+    ) -> None:
+        """Upload audio as parallel multipart parts tagged with integrity metadata."""
+        _, object_name, _ = build_audio_artifacts(video_id, self._settings)
+        storage_client.fput_object(
+            self._settings.MINIO_AUDIO_BUCKET,
+            object_name,
+            str(downloaded.path),
+            content_type="audio/ogg",
+            metadata=build_audio_metadata(downloaded, self._settings),
+            part_size=self._settings.MINIO_UPLOAD_PART_SIZE,
+            num_parallel_uploads=self._settings.MINIO_UPLOAD_PARALLEL_PARTS,
+        )
+
     def download_audio(
         self,
         storage_client: Minio,
@@ -91,32 +245,277 @@ class YoutubeDownloader:
         video_id: str,
     ) -> Path:
         """Download audio, leveraging object storage for caching."""
-        local_audio_path, object_name, local_audio_template = build_audio_artifacts(
-            video_id, self._settings
+        cached_path = self.fetch_cached_audio(storage_client, video_id)
+        if cached_path is not None:
+            return cached_path
+
+        downloaded = self.download_to_local(video_url, video_id)
+        self.upload_audio(storage_client, video_id, downloaded)
+        return downloaded.path
+
+
+@dataclass
+class DownloadMetrics:
+    """Throughput counters collected by AudioDownloadEngine."""
+
+    cache_hits: int = 0
+    downloads: int = 0
+    uploads: int = 0
+    bytes_downloaded: int = 0
+    bytes_uploaded: int = 0
+    download_seconds: float = 0.0
+    upload_seconds: float = 0.0
+    started_at: float = field(default_factory=time.perf_counter)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def record_download(self, size: int, seconds: float) -> None:
+        with self._lock:
+            self.downloads += 1
+            self.bytes_downloaded += size
+            self.download_seconds += seconds
+
+    def record_upload(self, size: int, seconds: float) -> None:
+        with self._lock:
+            self.uploads += 1
+            self.bytes_uploaded += size
+            self.upload_seconds += seconds
+
+    def record_cache_hit(self) -> None:
+        with self._lock:
+            self.cache_hits += 1
+
+    def as_dict(self) -> dict[str, float]:
+        elapsed = max(time.perf_counter() - self.started_at, 1e-9)
+        with self._lock:
+            return {
+                "cache_hits": self.cache_hits,
+                "downloads": self.downloads,
+                "uploads": self.uploads,
+                "bytes_downloaded": self.bytes_downloaded,
+                "bytes_uploaded": self.bytes_uploaded,
+                "download_seconds": round(self.download_seconds, 2),
+                "upload_seconds": round(self.upload_seconds, 2),
+                "elapsed_seconds": round(elapsed, 2),
+                "download_mbps": round(self.bytes_downloaded * 8 / elapsed / 1e6, 2),
+            }
+
+
+class AudioInventory:
+    """
+    Set of audio object names under MINIO_AUDIO_PATH, listed once per run.
+
+    Answers "is this video cached?" without a per-video MinIO round-trip.
+    Objects uploaded during the run are added as their uploads finish.
+    """
+
+    def __init__(self, storage_client: Minio, settings: Settings | None = None) -> None:
+        self._storage_client = storage_client
+        self._settings = settings or get_settings()
+        self._object_names: set[str] = set()
+        self._lock = threading.Lock()
+
+    @try_except_with_log("Listing cached audio in MinIO", suppress=True)
+    def refresh(self) -> int | None:
+        prefix = f"{self._settings.MINIO_AUDIO_PATH.rstrip('/')}/"
+        object_names = {
+            obj.object_name
+            for obj in self._storage_client.list_objects(
+                self._settings.MINIO_AUDIO_BUCKET, prefix=prefix, recursive=True
+            )
+            if obj.object_name
+        }
+        with self._lock:
+            self._object_names = object_names
+        logging.info("Audio inventory contains %s object(s)", len(object_names))
+        return len(object_names)
+
+    def has_audio(self, video_id: str) -> bool:
+        _, object_name, _ = build_audio_artifacts(video_id, self._settings)
+        with self._lock:
+            return object_name in self._object_names
+
+    def add_audio(self, video_id: str) -> None:
+        _, object_name, _ = build_audio_artifacts(video_id, self._settings)
+        with self._lock:
+            self._object_names.add(object_name)
+
+    def discard_audio(self, video_id: str) -> None:
+        _, object_name, _ = build_audio_artifacts(video_id, self._settings)
+        with self._lock:
+            self._object_names.discard(object_name)
+
+
+class AudioDownloadEngine:
+    """
+    Run bounded concurrent audio downloads and overlap them with MinIO uploads.
+
+    Downloads execute on a pool of ``max_workers`` threads; each finished file
+    is handed to a separate upload pool so the next download can start while
+    the previous one is still being pushed to storage. Callers receive the
+    local path as soon as the download finishes; ``release`` waits for the
+    pending upload before deleting the local file.
+    """
+
+    def __init__(
+        self,
+        downloader: YoutubeDownloader,
+        storage_client: Minio,
+        *,
+        max_workers: int | None = None,
+        upload_workers: int | None = None,
+        inventory: AudioInventory | None = None,
+        settings: Settings | None = None,
+    ) -> None:
+        resolved_settings = settings or get_settings()
+        self._settings = resolved_settings
+        self._downloader = downloader
+        self._storage_client = storage_client
+        self._inventory = inventory
+        self._download_pool = ThreadPoolExecutor(
+            max_workers=max_workers or resolved_settings.DOWNLOAD_WORKERS,
+            thread_name_prefix="audio-download",
         )
+        self._upload_pool = ThreadPoolExecutor(
+            max_workers=upload_workers or resolved_settings.UPLOAD_WORKERS,
+            thread_name_prefix="audio-upload",
+        )
+        self._downloads: dict[str, Future[Path]] = {}
+        self._uploads: dict[str, Future[None]] = {}
+        self._lock = threading.Lock()
+        self.metrics = DownloadMetrics()
 
-        try:
-            storage_client.stat_object(self._settings.MINIO_AUDIO_BUCKET, object_name)
-            if not local_audio_path.exists():
-                storage_client.fget_object(
-                    self._settings.MINIO_AUDIO_BUCKET,
-                    object_name,
-                    str(local_audio_path),
-                )
-            return local_audio_path
-        except S3Error as error:
-            if error.code != "NoSuchKey":
-                raise
+    @property
+    def storage_client(self) -> Minio:
+        return self._storage_client
 
-        download_opts = self._settings.YDL_DOWNLOAD_OPTS.copy()
-        download_opts["outtmpl"] = local_audio_template
+    def __enter__(self) -> "AudioDownloadEngine":
+        return self
 
-        def _download(client: yt_dlp.YoutubeDL) -> None:
-            client.download([video_url])
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
 
-        self._with_client(download_opts, _download)
+    def _may_be_cached(self, video_id: str) -> bool:
+        """Without an inventory every video has to be probed in MinIO."""
+        return self._inventory is None or self._inventory.has_audio(video_id)
 
-        storage_client.fput_object(
-            self._settings.MINIO_AUDIO_BUCKET, object_name, str(local_audio_path)
+    def _upload(self, video_id: str, downloaded: DownloadedAudio) -> None:
+        started = time.perf_counter()
+        self._downloader.upload_audio(self._storage_client, video_id, downloaded)
+        if self._inventory is not None:
+            self._inventory.add_audio(video_id)
+        self.metrics.record_upload(
+            downloaded.path.stat().st_size, time.perf_counter() - started
         )
-        return local_audio_path
+
+    def _fetch(self, video_url: str, video_id: str) -> Path:
+        cached_path = None
+        if self._may_be_cached(video_id):
+            cached_path = self._downloader.fetch_cached_audio(
+                self._storage_client, video_id
+            )
+        if cached_path is not None:
+            self.metrics.record_cache_hit()
+            return cached_path
+
+        started = time.perf_counter()
+        downloaded = self._downloader.download_to_local(video_url, video_id)
+        self.metrics.record_download(
+            downloaded.path.stat().st_size, time.perf_counter() - started
+        )
+        with self._lock:
+            self._uploads[video_id] = self._upload_pool.submit(
+                self._upload, video_id, downloaded
+            )
+        return downloaded.path
+
+    def submit(self, video_url: str, video_id: str) -> Future[Path]:
+        """Schedule an audio fetch; repeated calls reuse the pending future."""
+        with self._lock:
+            future = self._downloads.get(video_id)
+            if future is None:
+                future = self._download_pool.submit(self._fetch, video_url, video_id)
+                self._downloads[video_id] = future
+            return future
+
+    def prefetch(self, videos: Iterable[tuple[str, str]]) -> None:
+        """Queue ``(video_url, video_id)`` pairs ahead of processing."""
+        for video_url, video_id in videos:
+            self.submit(video_url, video_id)
+
+    def download_audio(self, video_url: str, video_id: str) -> Path:
+        return self.submit(video_url, video_id).result()
+
+    def replace_corrupt_audio(self, video_url: str, video_id: str) -> Path:
+        """
+        Drop a cached object that failed its checksum and download it again.
+
+        The object's metadata still looks valid, so without removing it every
+        retry would stream the same corrupt bytes.
+        """
+        self._downloader.discard_cached_audio(self._storage_client, video_id)
+        if self._inventory is not None:
+            self._inventory.discard_audio(video_id)
+        return self.download_audio(video_url, video_id)
+
+    @contextmanager
+    def open_audio(
+        self, video_url: str, video_id: str, *, require_file: bool
+    ) -> Iterator[AudioInput]:
+        """
+        Yield an audio input for the engines, streaming from MinIO when possible.
+
+        Cached objects are piped straight from ranged GETs into the decoder
+        unless an engine needs a seekable file (``require_file``) or the
+        audio is already local or being downloaded.
+        """
+        local_audio_path, _, _ = build_audio_artifacts(video_id, self._settings)
+        with self._lock:
+            scheduled = video_id in self._downloads
+
+        if not (
+            require_file
+            or scheduled
+            or local_audio_path.exists()
+            or not self._may_be_cached(video_id)
+        ):
+            reader = self._downloader.open_cached_audio(self._storage_client, video_id)
+            if reader.exists() and is_cached_audio_valid(
+                reader.metadata, self._settings
+            ):
+                self.metrics.record_cache_hit()
+                fifo_path = local_audio_path.with_suffix(".stream")
+                with stream_to_fifo(reader, fifo_path) as audio_input:
+                    yield audio_input
+                return
+
+        yield AudioInput(self.download_audio(video_url, video_id))
+
+    def wait_for_upload(self, video_id: str) -> None:
+        with self._lock:
+            upload = self._uploads.pop(video_id, None)
+        if upload is not None:
+            upload.result()
+
+    def release(self, video_id: str) -> None:
+        """Forget a fetched video and delete its local file once uploaded."""
+        with self._lock:
+            future = self._downloads.pop(video_id, None)
+        if future is None:
+            return
+        try:
+            local_audio_path = future.result()
+        except Exception as exc:  # noqa: BLE001
+            logging.debug("Skipping cleanup for %s: %s", video_id, exc)
+            return
+        try:
+            self.wait_for_upload(video_id)
+        except Exception as exc:  # noqa: BLE001
+            logging.warning("Failed to upload audio for %s: %s", video_id, exc)
+        local_audio_path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        self._download_pool.shutdown(wait=True, cancel_futures=True)
+        self._upload_pool.shutdown(wait=True)
+        logging.info("Audio download metrics: %s", self.metrics.as_dict())